@@ -3,6 +3,7 @@ import contextlib
 from sys import exception
 
 import aiohttp
+import discord
 from discord.errors import Forbidden
 from pydis_core import BotBase
 from pydis_core.utils.error_handling import handle_forbidden_from_block
@@ -10,6 +11,7 @@ from sentry_sdk import new_scope, start_transaction
 
 from bot import constants, exts
 from bot.log import get_logger
+from bot.utils.message_index import MessageIndex
 
 log = get_logger("bot")
 
@@ -29,11 +31,30 @@ class Bot(BotBase):
 
         super().__init__(*args, **kwargs)
 
+        # Index as many messages as discord.py caches, which is 1000 unless specified.
+        self.message_index = MessageIndex(kwargs.get("max_messages", 1000))
+        self.add_listener(self._index_message, "on_message")
+        self.add_listener(self._unindex_message, "on_raw_message_delete")
+        self.add_listener(self._unindex_messages, "on_raw_bulk_message_delete")
+
     async def load_extension(self, name: str, *args, **kwargs) -> None:
         """Extend D.py's load_extension function to also record sentry performance stats."""
         with start_transaction(op="cog-load", name=name):
             await super().load_extension(name, *args, **kwargs)
 
+    async def _index_message(self, message: discord.Message) -> None:
+        """Add a received message to the shared message index."""
+        self.message_index.add(message)
+
+    async def _unindex_message(self, event: discord.RawMessageDeleteEvent) -> None:
+        """Remove a deleted message from the shared message index."""
+        self.message_index.remove(event.message_id)
+
+    async def _unindex_messages(self, event: discord.RawBulkMessageDeleteEvent) -> None:
+        """Remove messages deleted in bulk from the shared message index."""
+        for message_id in event.message_ids:
+            self.message_index.remove(message_id)
+
     async def ping_services(self) -> None:
         """A helper to make sure all the services the bot relies on are available on startup."""
         # Connect Site/API
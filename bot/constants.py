@@ -397,11 +397,45 @@ Redis = _Redis()
 class _CleanMessages(EnvConfig, env_prefix="clean_"):
 
     message_limit: int = 10_000
+    # How many channel histories are searched at the same time.
+    history_concurrency: int = 5
+    # How many messages too old to be deleted in bulk are deleted at the same time.
+    delete_concurrency: int = 5
 
 
 CleanMessages = _CleanMessages()
 
 
+class _Filtering(EnvConfig, env_prefix="filtering_"):
+
+    # How long, in seconds, resolved invites are cached for.
+    invite_cache_ttl: int = 3600
+    # How long, in seconds, invite codes which couldn't be resolved are cached for.
+    invite_cache_not_found_ttl: int = 300
+    invite_cache_size: int = 2048
+    # How many bytes of text attachments may be downloaded to filter a single message.
+    attachment_read_budget: int = 64 * 1024
+    # How many display names which didn't trigger any filter are remembered, to skip filtering them again.
+    name_cache_size: int = 10_000
+    # How long, in seconds, a filter list which makes network requests may take before its result is discarded.
+    list_evaluation_timeout: float = 10.0
+    # The fraction of events in which the evaluation time of each filter is measured. Set to 0 to disable.
+    stats_sample_rate: float = 0.01
+    # How long, in seconds, searching for a token filter's pattern may take before it's abandoned.
+    token_search_timeout: float = 0.1
+    # How many times a token filter's search may time out before the filter is skipped.
+    token_timeout_limit: int = 3
+    # How long, in seconds, alerts without pings wait to be sent in the same message as other alerts.
+    alert_batch_delay: float = 1.0
+    # Where the filter lists are stored locally, to start filtering without waiting for the API after a restart.
+    snapshot_path: str = ".cache/filter_lists.json"
+    # Whether the message cache keeps compact snapshots of the messages instead of the messages themselves.
+    message_cache_compact: bool = False
+
+
+Filtering = _Filtering()
+
+
 class _Stats(EnvConfig, env_prefix="stats_"):
 
     presence_update_timeout: int = 30
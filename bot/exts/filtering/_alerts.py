@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass, field
+
+import discord
+from pydis_core.async_stats import AsyncStatsClient
+from pydis_core.utils import scheduling
+
+from bot.exts.filtering._ui.ui import AlertView, CombinedAlertView, PhishHandlingButton
+from bot.log import get_logger
+
+log = get_logger(__name__)
+
+# Discord's limits on a single webhook message.
+MAX_EMBEDS = 10
+MAX_EMBEDS_LENGTH = 6000
+MAX_CONTENT_LENGTH = 2000
+# A view has 5 rows, and each offender in a message takes a row.
+MAX_OFFENDERS = 5
+# The name used for messages holding alerts of different events.
+MIXED_USERNAME = "Filters"
+
+
+@dataclass
+class Alert:
+    """An alert waiting to be sent."""
+
+    username: str
+    content: str
+    embeds: list[discord.Embed]
+    view: AlertView
+    queued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def row_key(self) -> int:
+        """
+        The key of the row of buttons in the message the alert is sent in.
+
+        Alerts for the same offender share a row, unless the view offers to handle a phishing attempt.
+        """
+        if any(isinstance(item, PhishHandlingButton) for item in self.view.children):
+            return id(self)
+        return self.view.ctx.author.id
+
+
+class AlertDispatcher:
+    """
+    A queue of alerts, sent through the filtering webhook in as few messages as possible.
+
+    Alerts without pings wait for a short while, so that alerts triggered close together, for example during a raid,
+    are sent together. Up to 10 embeds go in each message, with the alerts for the same offender next to each other.
+    Alerts with pings are sent first, and without waiting.
+    """
+
+    def __init__(self, stats: AsyncStatsClient, batch_delay: float):
+        self.stats = stats
+        self.batch_delay = batch_delay
+        self.webhook: discord.Webhook | None = None
+
+        self._pinged: deque[Alert] = deque()
+        self._unpinged: deque[Alert] = deque()
+        self._queued = asyncio.Event()
+        self._ping_queued = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._pinged) + len(self._unpinged)
+
+    def start(self) -> None:
+        """Start sending the queued alerts."""
+        self._task = scheduling.create_task(self._send_alerts())
+
+    def stop(self) -> None:
+        """Stop sending alerts."""
+        if self._task:
+            self._task.cancel()
+        if self:
+            log.warning(f"The alert dispatcher was stopped with {len(self)} alerts left unsent.")
+
+    def put(self, username: str, content: str, embeds: list[discord.Embed], view: AlertView) -> None:
+        """Queue an alert to be sent."""
+        alert = Alert(username, content, embeds[:MAX_EMBEDS], view)
+        if content.strip():
+            self._pinged.append(alert)
+            self._ping_queued.set()
+        else:
+            self._unpinged.append(alert)
+        self._queued.set()
+        self.stats.gauge("filters.alerts.queue_depth", len(self))
+
+    def next_batch(self) -> list[Alert]:
+        """
+        Take the alerts to send in the next message out of the queue.
+
+        The alerts are taken in order, pinged alerts first, skipping any that would exceed the limits of the message.
+        """
+        batch = []
+        rows = set()
+        embeds = embeds_length = 0
+        for queue in (self._pinged, self._unpinged):
+            for alert in list(queue):
+                alert_length = sum(len(embed) for embed in alert.embeds)
+                if batch and (
+                    embeds + len(alert.embeds) > MAX_EMBEDS
+                    or embeds_length + alert_length > MAX_EMBEDS_LENGTH
+                    or (alert.row_key not in rows and len(rows) == MAX_OFFENDERS)
+                ):
+                    continue
+                queue.remove(alert)
+                batch.append(alert)
+                rows.add(alert.row_key)
+                embeds += len(alert.embeds)
+                embeds_length += alert_length
+
+        if not self._pinged:
+            self._ping_queued.clear()
+        if not self:
+            self._queued.clear()
+        return batch
+
+    def fills_a_message(self) -> bool:
+        """Return whether the queued alerts are enough to fill a message, in which case there's no point waiting."""
+        rows = set()
+        embeds = embeds_length = 0
+        for queue in (self._pinged, self._unpinged):
+            for alert in queue:
+                rows.add(alert.row_key)
+                embeds += len(alert.embeds)
+                embeds_length += sum(len(embed) for embed in alert.embeds)
+                if embeds >= MAX_EMBEDS or embeds_length >= MAX_EMBEDS_LENGTH or len(rows) >= MAX_OFFENDERS:
+                    return True
+        return False
+
+    async def _send_alerts(self) -> None:
+        """Send the queued alerts for as long as the dispatcher runs."""
+        while True:
+            await self._queued.wait()
+            if not self._pinged and not self.fills_a_message():
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self._ping_queued.wait(), self.batch_delay)
+
+            batch = self.next_batch()
+            self.stats.gauge("filters.alerts.queue_depth", len(self))
+            if not self.webhook:
+                continue
+            try:
+                await self._send_batch(batch)
+            except discord.HTTPException:
+                if len(batch) == 1:
+                    log.exception("Failed to send an alert.")
+                    continue
+                log.exception(f"Failed to send a batch of {len(batch)} alerts, sending them one by one instead.")
+                batch = await self._send_individually(batch)
+                if not batch:
+                    continue
+            self.stats.timing("filters.alerts.lag", (time.monotonic() - batch[0].queued_at) * 1000)
+
+    async def _send_individually(self, alerts: list[Alert]) -> list[Alert]:
+        """Send each of the alerts in a message of its own, and return the ones which were sent."""
+        sent = []
+        for alert in alerts:
+            try:
+                await self._send_batch([alert])
+            except discord.HTTPException:
+                log.exception("Failed to send an alert.")
+            else:
+                sent.append(alert)
+        return sent
+
+    async def _send_batch(self, batch: list[Alert]) -> None:
+        """Send the alerts in a single message, grouping the alerts for each offender together."""
+        rows: dict[int, list[Alert]] = {}
+        for alert in batch:
+            rows.setdefault(alert.row_key, []).append(alert)
+
+        usernames = {alert.username for alert in batch}
+        username = usernames.pop() if len(usernames) == 1 else MIXED_USERNAME
+        # Each ping only needs to appear once.
+        content = " ".join(dict.fromkeys(mention for alert in batch for mention in alert.content.split()))
+        embeds = [embed for alerts in rows.values() for alert in alerts for embed in alert.embeds]
+        if len(rows) == 1:
+            view = batch[0].view
+        else:
+            view = CombinedAlertView([alerts[0].view for alerts in rows.values()])
+
+        await self.webhook.send(username=username, content=content[:MAX_CONTENT_LENGTH], embeds=embeds, view=view)
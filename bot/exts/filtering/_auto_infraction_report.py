@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import asdict, dataclass
+
+import arrow
+from async_rediscache import RedisCache
+
+# How many ISO weeks of auto-infraction filters are kept, including the current one.
+REPORT_WEEKS = 5
+
+
+def iso_week(time: arrow.Arrow) -> str:
+    """Return the ISO week of the time, such as `2024-W07`."""
+    year, week, _ = time.isocalendar()
+    return f"{year}-W{week:02}"
+
+
+def recent_weeks(now: arrow.Arrow, count: int = REPORT_WEEKS) -> list[str]:
+    """Return the ISO weeks ending with the one of the given time, from the earliest."""
+    return [iso_week(now.shift(weeks=-i)) for i in reversed(range(count))]
+
+
+def earliest_recorded(now: arrow.Arrow) -> arrow.Arrow:
+    """Return the start of the earliest week in the report, before which filters aren't kept."""
+    return now.shift(weeks=-(REPORT_WEEKS - 1)).floor("week")
+
+
+@dataclass(frozen=True)
+class RecordedFilter:
+    """What the report shows of an auto-infraction filter, as of the last time it was added or edited."""
+
+    changed_at: float
+    list_label: str
+    filter_text: str
+    infraction: str
+
+    @classmethod
+    def from_json(cls, data: str) -> RecordedFilter:
+        """Load the record as it's stored in the cache."""
+        return cls(**json.loads(data))
+
+    def to_json(self) -> str:
+        """Return the record as it's stored in the cache."""
+        return json.dumps(asdict(self))
+
+
+class AutoInfractionReport:
+    """
+    The auto-infraction filters added or edited in the recent ISO weeks.
+
+    The cache maps the IDs of the filters to a record of when they were last added or edited, along with the rest of
+    what the report shows of them, so that the report is built from the cache alone. A filter is only counted in the
+    week it was last changed in. Filters last changed before the weeks in the report are pruned.
+    """
+
+    def __init__(self, cache: RedisCache):
+        self.cache = cache
+        # Syncing lists reads the cache and writes it back, so the other changes must not be made in the meantime.
+        self._lock = asyncio.Lock()
+
+    async def record(self, filter_id: int, record: RecordedFilter) -> None:
+        """Record that the auto-infraction filter was added or edited."""
+        async with self._lock:
+            await self.cache.set(filter_id, record.to_json())
+
+    async def forget(self, filter_id: int) -> None:
+        """Forget the filter, such as when it was deleted or no longer applies an auto-infraction."""
+        async with self._lock:
+            await self.cache.delete(filter_id)
+
+    async def sync_lists(self, records: dict[str, dict[int, RecordedFilter]]) -> None:
+        """
+        Replace the records of each of the given lists by their labels, and prune the filters which are too old.
+
+        The recorded filters of the lists which aren't in the new records are forgotten. The cache is read once, and
+        then written to in a single request if filters were only added, or in two if any have to be forgotten.
+        """
+        earliest = earliest_recorded(arrow.utcnow()).timestamp()
+        async with self._lock:
+            current = await self._records()
+            synced = {
+                filter_id: record for filter_id, record in current.items() if record.list_label not in records
+            }
+            for list_records in records.values():
+                synced.update(list_records)
+            synced = {filter_id: record for filter_id, record in synced.items() if record.changed_at >= earliest}
+
+            if current.keys() - synced.keys():
+                # The cache can't delete several keys in one request, so it's written again from scratch.
+                await self.cache.clear()
+                changed = synced
+            else:
+                changed = {
+                    filter_id: record for filter_id, record in synced.items() if current.get(filter_id) != record
+                }
+            if changed:
+                await self.cache.update({filter_id: record.to_json() for filter_id, record in changed.items()})
+
+    async def prune(self) -> None:
+        """Forget the filters which were last changed before the earliest week in the report."""
+        await self.sync_lists({})
+
+    async def records_since(self, since: arrow.Arrow) -> dict[int, RecordedFilter]:
+        """Return the records of the auto-infraction filters added or edited since the given time, by their IDs."""
+        return {
+            filter_id: record
+            for filter_id, record in (await self._records()).items()
+            if record.changed_at >= since.timestamp()
+        }
+
+    async def weekly_counts(self) -> list[tuple[str, int]]:
+        """Return the number of auto-infraction filters added or edited in each of the recent ISO weeks."""
+        counts = dict.fromkeys(recent_weeks(arrow.utcnow()), 0)
+        for record in (await self._records()).values():
+            week = iso_week(arrow.get(record.changed_at))
+            if week in counts:
+                counts[week] += 1
+        return list(counts.items())
+
+    async def _records(self) -> dict[int, RecordedFilter]:
+        """Return all the records in the cache."""
+        return {filter_id: RecordedFilter.from_json(data) for filter_id, data in await self.cache.items()}
@@ -2,16 +2,18 @@ from __future__ import annotations
 
 import typing
 from collections.abc import Callable, Coroutine, Iterable
-from dataclasses import dataclass, field, replace
+from dataclasses import dataclass, field, fields, replace
 from enum import Enum, auto
 
 import discord
 from discord import DMChannel, Embed, Member, Message, StageChannel, TextChannel, Thread, User, VoiceChannel
 
+from bot.exts.filtering._utils import SPOILER_RE, clean_input, expand_spoilers as _expand_spoilers
 from bot.utils.message_cache import MessageCache
 
 if typing.TYPE_CHECKING:
     from bot.exts.filtering._filter_lists import FilterList
+    from bot.exts.filtering._filter_stats import FilterStats
     from bot.exts.filtering._filters.filter import Filter
     from bot.exts.utils.snekbox._io import FileAttachment
 
@@ -40,6 +42,7 @@ class FilterContext:
     attachments: list[discord.Attachment | FileAttachment] = field(default_factory=list)  # Any attachments sent.
     before_message: Message | None = None
     message_cache: MessageCache | None = None
+    filter_stats: FilterStats | None = None  # Set when the evaluation of the filters in this event should be measured.
     # Output context
     dm_content: str = ""  # The content to DM the invoker
     dm_embed: str = ""  # The embed description to DM the invoker
@@ -59,6 +62,9 @@ class FilterContext:
     related_channels: set[TextChannel | Thread | DMChannel] = field(default_factory=set)
     uploaded_attachments: dict[int, list[str]] = field(default_factory=dict)  # Message ID to attachment URLs.
     upload_deletion_logs: bool = True  # Whether it's allowed to upload deletion logs.
+    # Normalized variants of the content, keyed by the content they were created from and the variant.
+    # The same object is shared by contexts created with `replace`, so each variant is computed once per event.
+    _normalized_content: dict[tuple[str, bool, bool], str] = field(default_factory=dict, repr=False)
 
     def __post_init__(self):
         # If it's in the context of a DM channel, self.channel won't be None, but self.channel.guild will.
@@ -81,6 +87,69 @@ class FilterContext:
             cache
         )
 
+    def normalized_content(self, *, keep_newlines: bool = False, expand_spoilers: bool = False) -> str:
+        """
+        Return the content after removing zalgo and invisible characters, computing it only once per variant.
+
+        If `expand_spoilers` is True, the content is expanded to all of its spoiler interpretations before it's cleaned.
+        """
+        content = self.content
+        key = (content, keep_newlines, expand_spoilers)
+        if key in self._normalized_content:
+            return self._normalized_content[key]
+
+        if expand_spoilers and SPOILER_RE.search(content):
+            normalized = clean_input(_expand_spoilers(content), keep_newlines=keep_newlines)
+        elif expand_spoilers:
+            normalized = self.normalized_content(keep_newlines=keep_newlines)
+        elif not keep_newlines:
+            # Cleaning only removes characters, so dropping the newlines afterward gives the same result.
+            normalized = self.normalized_content(keep_newlines=True).replace("\n", "")
+        else:
+            normalized = clean_input(content, keep_newlines=True)
+
+        self._normalized_content[key] = normalized
+        return normalized
+
     def replace(self, **changes) -> FilterContext:
         """Return a new context object assigning new values to the specified fields."""
         return replace(self, **changes)
+
+    def fork(self) -> FilterContext:
+        """
+        Return a copy of the context with its own empty output collections.
+
+        This allows filter lists to be evaluated concurrently without interleaving their outputs.
+        The outputs of the copy can be added back to this context with `merge`.
+        """
+        return self.replace(**{name: type(getattr(self, name))() for name in _OUTPUT_COLLECTIONS})
+
+    def merge(self, fork: FilterContext) -> None:
+        """Add the outputs of a context created with `fork` to this context."""
+        for name in _OUTPUT_COLLECTIONS:
+            value = getattr(self, name)
+            if isinstance(value, list):
+                value.extend(getattr(fork, name))
+            elif isinstance(value, set):
+                value |= getattr(fork, name)
+            else:
+                value.update(getattr(fork, name))
+
+        for field_ in fields(self):
+            if field_.name not in _OUTPUT_COLLECTIONS and getattr(fork, field_.name) != getattr(self, field_.name):
+                setattr(self, field_.name, getattr(fork, field_.name))
+
+
+# The output fields which accumulate values from the different filter lists.
+_OUTPUT_COLLECTIONS = (
+    "alert_embeds",
+    "action_descriptions",
+    "matches",
+    "filter_info",
+    "blocked_exts",
+    "potential_phish",
+    "additional_actions",
+    "related_messages",
+    "related_channels",
+    "uploaded_attachments",
+)
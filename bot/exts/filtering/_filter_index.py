@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import bisect
+from collections import defaultdict
+from collections.abc import Hashable, ItemsView, Iterable, Iterator, KeysView, Mapping, MutableMapping, ValuesView
+from typing import Any
+
+from bot.exts.filtering._filters.filter import Filter
+
+# The text fields of a filter which can be searched.
+TEXT_FIELDS = ("content", "description")
+# The length of the substrings of the text fields which are indexed.
+NGRAM_SIZE = 3
+# Marks the start or end of a text query as open, for prefix and substring queries.
+WILDCARD = "*"
+
+
+def _ngrams(text: str) -> set[str]:
+    """Return the substrings of the text of the indexed length."""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def _text(filter_: Filter, field: str) -> str:
+    """Return the text of the field of the filter, as it's compared to queries."""
+    value = getattr(filter_, field)
+    # The content of some filters, such as invite filters, isn't a string.
+    return "" if value is None else str(value).casefold()
+
+
+def setting_key(value: Any) -> Hashable:
+    """
+    Return a key for the value of a setting override.
+
+    Overrides are compared by their representations, so values which compare as equal have the same key.
+    """
+    if isinstance(value, tuple | list | set):
+        return tuple, tuple(sorted({str(item) for item in value}))
+    return str(value)
+
+
+def filter_setting_key(value: Any) -> Hashable:
+    """Return a key for the value of a filter setting, such that values which are equal have the same key."""
+    if isinstance(value, Hashable):
+        return value
+    return repr(value)
+
+
+def parse_text_query(query: str) -> tuple[str, bool, bool]:
+    """
+    Parse a text query into the text to look for, and whether it may be preceded or followed by anything else.
+
+    A query of `foo` matches the text exactly, `foo*` matches texts starting with it, `*foo` ending with it, and
+    `*foo*` anywhere in the text. Queries are case-insensitive.
+    """
+    open_start = query.startswith(WILDCARD)
+    open_end = len(query) > open_start and query.endswith(WILDCARD)
+    text = query[open_start:len(query) - open_end]
+    return text.casefold(), open_start, open_end
+
+
+class IndexedFilters(MutableMapping[int, Filter]):
+    """
+    The filters of a list by their IDs, indexed by their text fields and setting overrides.
+
+    The filters are kept in a dictionary of their own, and every change goes through `__setitem__` and `__delitem__`,
+    so the index is updated whenever a filter is added or removed. Searching the filters then doesn't require going
+    over all of them:
+    - The text fields are indexed by their substrings of length `NGRAM_SIZE`, and kept sorted for prefix lookups.
+    - Setting overrides and filter settings are indexed by their values.
+    """
+
+    def __init__(self, filters: Mapping[int, Filter] | Iterable[tuple[int, Filter]] = ()):
+        self._filters: dict[int, Filter] = {}
+        self._ngrams = {field: defaultdict[str, set[int]](set) for field in TEXT_FIELDS}
+        self._sorted_texts: dict[str, list[tuple[str, int]]] = {field: [] for field in TEXT_FIELDS}
+        self._settings = defaultdict[tuple[str, Hashable], set[int]](set)
+        self._filter_settings = defaultdict[tuple[str, Hashable], set[int]](set)
+        self.update(filters)
+
+    def __getitem__(self, filter_id: int) -> Filter:
+        return self._filters[filter_id]
+
+    def __setitem__(self, filter_id: int, filter_: Filter) -> None:
+        if filter_id in self._filters:
+            self._unindex(filter_id, self._filters[filter_id])
+        self._filters[filter_id] = filter_
+        self._index(filter_id, filter_)
+
+    def __delitem__(self, filter_id: int) -> None:
+        self._unindex(filter_id, self._filters[filter_id])
+        del self._filters[filter_id]
+
+    def __contains__(self, filter_id: object) -> bool:
+        return filter_id in self._filters
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._filters)
+
+    def __len__(self) -> int:
+        return len(self._filters)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._filters!r})"
+
+    # The views of the dictionary are read-only, and are faster to go over than the generic ones of `Mapping`.
+    def keys(self) -> KeysView[int]:
+        """Return a view of the IDs of the filters."""
+        return self._filters.keys()
+
+    def values(self) -> ValuesView[Filter]:
+        """Return a view of the filters."""
+        return self._filters.values()
+
+    def items(self) -> ItemsView[int, Filter]:
+        """Return a view of the IDs of the filters along with the filters."""
+        return self._filters.items()
+
+    def __ior__(self, filters: Mapping[int, Filter] | Iterable[tuple[int, Filter]]) -> IndexedFilters:
+        self.update(filters)
+        return self
+
+    def copy(self) -> IndexedFilters:
+        """Return a copy of the filters, with an index of its own."""
+        return IndexedFilters(self._filters)
+
+    def _index(self, filter_id: int, filter_: Filter) -> None:
+        for field in TEXT_FIELDS:
+            text = _text(filter_, field)
+            for ngram in _ngrams(text):
+                self._ngrams[field][ngram].add(filter_id)
+            bisect.insort(self._sorted_texts[field], (text, filter_id))
+
+        settings, _ = filter_.overrides
+        for setting_name, value in settings.items():
+            self._settings[setting_name, setting_key(value)].add(filter_id)
+        if filter_.extra_fields:
+            for setting_name, value in filter_.extra_fields.model_dump().items():
+                self._filter_settings[setting_name, filter_setting_key(value)].add(filter_id)
+
+    def _unindex(self, filter_id: int, filter_: Filter) -> None:
+        for field in TEXT_FIELDS:
+            text = _text(filter_, field)
+            for ngram in _ngrams(text):
+                _discard(self._ngrams[field], ngram, filter_id)
+            sorted_texts = self._sorted_texts[field]
+            del sorted_texts[bisect.bisect_left(sorted_texts, (text, filter_id))]
+
+        settings, _ = filter_.overrides
+        for setting_name, value in settings.items():
+            _discard(self._settings, (setting_name, setting_key(value)), filter_id)
+        if filter_.extra_fields:
+            for setting_name, value in filter_.extra_fields.model_dump().items():
+                _discard(self._filter_settings, (setting_name, filter_setting_key(value)), filter_id)
+
+    def with_setting(self, setting_name: str, value: Any) -> set[int]:
+        """Return the IDs of the filters overriding the setting with the value, as compared by `repr_equals`."""
+        return self._settings.get((setting_name, setting_key(value)), set())
+
+    def with_filter_setting(self, setting_name: str, value: Any) -> set[int]:
+        """Return the IDs of the filters whose filter setting has the given value."""
+        return self._filter_settings.get((setting_name, filter_setting_key(value)), set())
+
+    def search_text(self, field: str, query: str) -> set[int]:
+        """Return the IDs of the filters whose text field matches the query, as described in `parse_text_query`."""
+        text, open_start, open_end = parse_text_query(query)
+        sorted_texts = self._sorted_texts[field]
+
+        if not open_start:
+            # The text is at the start, so the matches are in a contiguous range of the sorted texts.
+            matches = set()
+            for i in range(bisect.bisect_left(sorted_texts, (text,)), len(sorted_texts)):
+                other_text, filter_id = sorted_texts[i]
+                if not other_text.startswith(text):
+                    break
+                if open_end or other_text == text:
+                    matches.add(filter_id)
+            return matches
+
+        if len(text) < NGRAM_SIZE:
+            # Too short to be looked up in the index, but such a query is expected to match many of the filters anyway.
+            candidates = (filter_id for other_text, filter_id in sorted_texts if text in other_text)
+        else:
+            ngram_ids = sorted((self._ngrams[field].get(ngram, set()) for ngram in _ngrams(text)), key=len)
+            candidates = set.intersection(*ngram_ids)
+
+        matches = set()
+        for filter_id in candidates:
+            other_text = _text(self[filter_id], field)
+            if text in other_text and (open_end or other_text.endswith(text)):
+                matches.add(filter_id)
+        return matches
+
+
+def _discard(index: dict[Any, set[int]], key: Any, filter_id: int) -> None:
+    """Remove the filter ID from the index entry, and remove the entry if it's left empty."""
+    ids = index.get(key)
+    if ids is None:
+        return
+    ids.discard(filter_id)
+    if not ids:
+        del index[key]
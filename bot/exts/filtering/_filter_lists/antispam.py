@@ -5,11 +5,10 @@ from collections.abc import Callable, Coroutine
 from dataclasses import dataclass, field
 from datetime import timedelta
 from functools import reduce
-from itertools import takewhile
 from operator import add, or_
 
 import arrow
-from discord import Member
+from discord import Member, Message
 from pydis_core.utils import scheduling
 from pydis_core.utils.logging import get_logger
 
@@ -20,8 +19,10 @@ from bot.exts.filtering._filters.filter import Filter, UniqueFilter
 from bot.exts.filtering._settings import ActionSettings
 from bot.exts.filtering._settings_types.actions.infraction_and_notification import Infraction, InfractionAndNotification
 from bot.exts.filtering._ui.ui import AlertView, build_mod_alert
+from bot.utils.message_cache import CachedMessage, MessageSnapshot
 
 if typing.TYPE_CHECKING:
+    from bot.bot import Bot
     from bot.exts.filtering.filtering import Filtering
 
 log = get_logger(__name__)
@@ -33,7 +34,8 @@ class AntispamList(UniquesListBase):
     """
     A list of anti-spam rules.
 
-    Messages from the last X seconds are passed to each rule, which decides whether it triggers across those messages.
+    The author's messages from the last X seconds are passed to each rule, which decides whether it triggers across
+    those messages.
 
     The infraction reason is set dynamically.
     """
@@ -58,7 +60,7 @@ class AntispamList(UniquesListBase):
         self, ctx: FilterContext
     ) -> tuple[ActionSettings | None, list[str], dict[ListType, list[Filter]]]:
         """Dispatch the given event to the list's filters, and return actions to take and messages to relay to mods."""
-        if not ctx.message or not ctx.message_cache:
+        if not ctx.message or not ctx.message_cache or not ctx.author:
             return None, [], {}
 
         sublist: SubscribingAtomicList = self[ListType.DENY]
@@ -66,14 +68,16 @@ class AntispamList(UniquesListBase):
         max_interval = max(filter_.extra_fields.interval for filter_ in potential_filters)
 
         earliest_relevant_at = arrow.utcnow() - timedelta(seconds=max_interval)
-        relevant_messages = list(
-            takewhile(lambda msg: msg.created_at > earliest_relevant_at, ctx.message_cache)
-        )
+        relevant_messages = list(ctx.message_cache.since(earliest_relevant_at, author_id=ctx.author.id))
         new_ctx = ctx.replace(content=relevant_messages)
         triggers = await sublist.filter_list_result(new_ctx)
         if not triggers:
             return None, [], {}
 
+        if ctx.message_cache.compact:
+            # Deleting and logging the messages requires more than the cache's snapshots of them.
+            ctx.related_messages = await _fetch_snapshots(self.filtering_cog.bot, ctx.related_messages)
+
         if ctx.author not in self.message_deletion_queue:
             self.message_deletion_queue[ctx.author] = DeletionContext()
             ctx.additional_actions.append(self._create_deletion_context_handler(ctx.author))
@@ -135,6 +139,15 @@ class AntispamList(UniquesListBase):
         return schedule_processing
 
 
+async def _fetch_snapshots(bot: "Bot", messages: set[CachedMessage]) -> set[Message]:
+    """Replace the snapshots among the messages with the full messages, leaving out those which no longer exist."""
+    snapshots = {msg for msg in messages if isinstance(msg, MessageSnapshot)}
+    if not snapshots:
+        return messages
+    fetched = await asyncio.gather(*(snapshot.fetch(bot) for snapshot in snapshots))
+    return (messages - snapshots) | {msg for msg in fetched if msg is not None}
+
+
 @dataclass
 class DeletionContext:
     """Represents a Deletion Context for a single spam event."""
@@ -153,8 +166,7 @@ class DeletionContext:
         if not self.contexts or not self.rules:
             return
 
-        webhook = antispam_list.filtering_cog.webhook
-        if not webhook:
+        if not antispam_list.filtering_cog.webhook:
             return
 
         ctx, *other_contexts = self.contexts
@@ -194,4 +206,4 @@ class DeletionContext:
             embed.set_footer(
                 text="The list of actions taken includes actions from additional contexts after deletion began."
             )
-        await webhook.send(username="Anti-Spam", content=ctx.alert_content, embeds=[embed], view=AlertView(new_ctx))
+        antispam_list.filtering_cog.alert_dispatcher.put("Anti-Spam", ctx.alert_content, [embed], AlertView(new_ctx))
@@ -2,13 +2,15 @@ from __future__ import annotations
 
 import re
 import typing
+from collections.abc import Iterable
+from itertools import count
 
 from bot.exts.filtering._filter_context import Event, FilterContext
-from bot.exts.filtering._filter_lists.filter_list import FilterList, ListType
-from bot.exts.filtering._filters.domain import DomainFilter
+from bot.exts.filtering._filter_lists.filter_list import AtomicList, FilterList, ListType
+from bot.exts.filtering._filters.domain import DomainFilter, extract_url
 from bot.exts.filtering._filters.filter import Filter
 from bot.exts.filtering._settings import ActionSettings
-from bot.exts.filtering._utils import clean_input
+from bot.exts.filtering._utils import ScanHistory, changed_span
 
 if typing.TYPE_CHECKING:
     from bot.exts.filtering.filtering import Filtering
@@ -18,6 +20,67 @@ if typing.TYPE_CHECKING:
 URL_RE = re.compile(r"https?://(\S+)(?=\)|\b)", flags=re.IGNORECASE)
 
 
+def _urls_in(text: str, start: int = 0, end: int | None = None) -> list[tuple[int, int, str]]:
+    """Return the start, end, and URL of each URL in the given part of the text."""
+    return [
+        (match.start(), match.end(), match.group(1).lower().rstrip("/"))
+        for match in URL_RE.finditer(text, start, len(text) if end is None else end)
+    ]
+
+
+class DomainIndex:
+    """
+    An index of domain filters by the registered domain they target.
+
+    A domain filter can only trigger on a URL with the same registered domain (the domain without its subdomains),
+    so each URL only needs to be checked against the filters in its own bucket, instead of against the entire list.
+
+    The index is updated in place as filters are added or removed, and remembers the order the filters were inserted in,
+    so that the candidates are returned in the same order as in the filter list.
+    """
+
+    def __init__(self, filters: Iterable[DomainFilter] = ()):
+        self._buckets: dict[str, dict[int, DomainFilter]] = {}
+        self._domains: dict[int, str] = {}  # Filter ID to the registered domain it's indexed under.
+        self._positions: dict[int, int] = {}  # Filter ID to its position in the list.
+        self._counter = count()
+        for filter_ in filters:
+            self.add(filter_)
+
+    def add(self, filter_: DomainFilter) -> None:
+        """Add the filter to the index, replacing any filter with the same ID."""
+        domain = filter_.registered_domain
+        old_domain = self._domains.get(filter_.id)
+        if old_domain is None:
+            self._positions[filter_.id] = next(self._counter)
+        elif old_domain != domain:
+            self._remove_from_bucket(old_domain, filter_.id)
+
+        self._buckets.setdefault(domain, {})[filter_.id] = filter_
+        self._domains[filter_.id] = domain
+
+    def remove(self, filter_id: int) -> None:
+        """Remove the filter with the given ID from the index, if it's there."""
+        domain = self._domains.pop(filter_id, None)
+        if domain is None:
+            return
+        self._positions.pop(filter_id)
+        self._remove_from_bucket(domain, filter_id)
+
+    def _remove_from_bucket(self, domain: str, filter_id: int) -> None:
+        """Remove the filter from the bucket of the given domain, and drop the bucket if it becomes empty."""
+        bucket = self._buckets[domain]
+        bucket.pop(filter_id, None)
+        if not bucket:
+            del self._buckets[domain]
+
+    def candidates(self, urls: Iterable[str]) -> list[DomainFilter]:
+        """Return the filters which might trigger on any of the URLs, in the order they appear in the list."""
+        domains = {extract_url(url).registered_domain for url in urls}
+        found = [filter_ for domain in domains for filter_ in self._buckets.get(domain, {}).values()]
+        return sorted(found, key=lambda filter_: self._positions[filter_.id])
+
+
 class DomainsList(FilterList[DomainFilter]):
     """
     A list of filters, each looking for a specific domain given by URL.
@@ -27,12 +90,18 @@ class DomainsList(FilterList[DomainFilter]):
 
     Domains are found by looking for a URL schema (http or https).
     Filters will also trigger for subdomains.
+
+    When a message is edited, URLs are only searched for in the parts of the text which changed. Since a URL can't
+    contain whitespace, the URLs found elsewhere are the same as in the text last scanned for that message.
     """
 
     name = "domain"
 
     def __init__(self, filtering_cog: Filtering):
         super().__init__()
+        self._indexes: dict[ListType, DomainIndex] = {}
+        # Message ID to the text last scanned for the message, and the start, end, and URL of each URL found in it.
+        self._scans: ScanHistory[tuple[str, list[tuple[int, int, str]]]] = ScanHistory()
         filtering_cog.subscribe(self, Event.MESSAGE, Event.MESSAGE_EDIT, Event.SNEKBOX)
 
     def get_filter_type(self, content: str) -> type[Filter]:
@@ -44,19 +113,69 @@ class DomainsList(FilterList[DomainFilter]):
         """Return the types of filters used by this list."""
         return {DomainFilter}
 
+    def add_list(self, list_data: dict) -> AtomicList:
+        """Add a new type of list (such as a whitelist or a blacklist) this filter list."""
+        new_list = super().add_list(list_data)
+        self._indexes[new_list.list_type] = DomainIndex(new_list.filters.values())
+        return new_list
+
+    def add_filter(self, list_type: ListType, filter_data: dict) -> DomainFilter | None:
+        """Add a filter to the list of the specified type."""
+        new_filter = super().add_filter(list_type, filter_data)
+        if new_filter:
+            self._indexes[list_type].add(new_filter)
+        return new_filter
+
+    def remove_filter(self, list_type: ListType, filter_id: int) -> DomainFilter | None:
+        """Remove the filter with the given ID from the list of the specified type, and return it if it was found."""
+        removed_filter = super().remove_filter(list_type, filter_id)
+        self._indexes[list_type].remove(filter_id)
+        return removed_filter
+
+    def _find_urls(self, ctx: FilterContext, text: str) -> list[tuple[int, int, str]]:
+        """Return the start, end, and URL of each URL in the text, rescanning only what changed if it's an edit."""
+        scan = None
+        if ctx.event == Event.MESSAGE_EDIT and ctx.message:
+            scan = self._scans.get(ctx.message.id)
+
+        if not scan:
+            found_urls = _urls_in(text)
+        else:
+            old_text, old_urls = scan
+            start, old_end, new_end = changed_span(old_text, text)
+            # Rescan the entire runs of non-whitespace characters the edit touched, since URLs are found within them.
+            while start > 0 and not text[start - 1].isspace():
+                start -= 1
+            while old_end < len(old_text) and not old_text[old_end].isspace():
+                old_end += 1
+                new_end += 1
+            shift = new_end - old_end
+            found_urls = [
+                *(url for url in old_urls if url[1] <= start),
+                *_urls_in(text, start, new_end),
+                *((url_start + shift, url_end + shift, url) for url_start, url_end, url in old_urls
+                  if url_start >= old_end),
+            ]
+
+        if ctx.event in (Event.MESSAGE, Event.MESSAGE_EDIT) and ctx.message:
+            self._scans.set(ctx.message.id, (text, found_urls))
+        return found_urls
+
     async def actions_for(
         self, ctx: FilterContext
     ) -> tuple[ActionSettings | None, list[str], dict[ListType, list[Filter]]]:
         """Dispatch the given event to the list's filters, and return actions to take and messages to relay to mods."""
-        text = ctx.content
-        if not text:
+        if not ctx.content:
             return None, [], {}
 
-        text = clean_input(text)
-        urls = {match.group(1).lower().rstrip("/") for match in URL_RE.finditer(text)}
+        text = ctx.normalized_content()
+        found_urls = self._find_urls(ctx, text)
+        urls = {url for _, _, url in found_urls}
         new_ctx = ctx.replace(content=urls)
 
-        triggers = await self[ListType.DENY].filter_list_result(new_ctx)
+        deny_list = self[ListType.DENY]
+        candidates = self._indexes[ListType.DENY].candidates(urls)
+        triggers = await deny_list._create_filter_list_result(new_ctx, deny_list.defaults, candidates)
         ctx.notification_domain = new_ctx.notification_domain
         unknown_urls = urls - {filter_.content.lower() for filter_ in triggers}
         if unknown_urls:
@@ -65,6 +184,6 @@ class DomainsList(FilterList[DomainFilter]):
         actions = None
         messages = []
         if triggers:
-            actions = self[ListType.DENY].merge_actions(triggers)
-            messages = self[ListType.DENY].format_messages(triggers)
+            actions = deny_list.merge_actions(triggers)
+            messages = deny_list.format_messages(triggers)
         return actions, messages, {ListType.DENY: triggers}
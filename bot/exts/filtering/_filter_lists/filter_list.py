@@ -1,4 +1,5 @@
 import dataclasses
+import time
 import typing
 from abc import ABC, abstractmethod
 from collections import defaultdict
@@ -12,8 +13,10 @@ import arrow
 from discord.ext.commands import BadArgument, Context, Converter
 
 from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering._filter_index import IndexedFilters
 from bot.exts.filtering._filters.filter import Filter, UniqueFilter
 from bot.exts.filtering._settings import ActionSettings, Defaults, create_settings
+from bot.exts.filtering._settings_types.settings_entry import SettingsEntry
 from bot.exts.filtering._utils import FieldRequiring, past_tense
 from bot.log import get_logger
 
@@ -63,7 +66,11 @@ class AtomicList:
     name: str
     list_type: ListType
     defaults: Defaults
-    filters: dict[int, Filter]
+    filters: IndexedFilters
+
+    def __post_init__(self):
+        if not isinstance(self.filters, IndexedFilters):
+            object.__setattr__(self, "filters", IndexedFilters(self.filters))
 
     @property
     def label(self) -> str:
@@ -95,14 +102,14 @@ class AtomicList:
 
         relevant_filters = []
         for filter_ in filters:
-            if not filter_.validations:
-                if default_answer and await filter_.triggered_on(ctx):
-                    relevant_filters.append(filter_)
+            if ctx.filter_stats:
+                start = time.perf_counter()
+                triggered = await self._filter_triggered(ctx, filter_, default_answer, failed_by_default)
+                ctx.filter_stats.record_filter(self, filter_, time.perf_counter() - start, triggered)
             else:
-                passed, failed = filter_.validations.evaluate(ctx)
-                if not failed and failed_by_default < passed:
-                    if await filter_.triggered_on(ctx):
-                        relevant_filters.append(filter_)
+                triggered = await self._filter_triggered(ctx, filter_, default_answer, failed_by_default)
+            if triggered:
+                relevant_filters.append(filter_)
 
         if ctx.event == Event.MESSAGE_EDIT and ctx.message and self.list_type == ListType.DENY:
             previously_triggered = ctx.message_cache.get_message_metadata(ctx.message.id)
@@ -114,6 +121,38 @@ class AtomicList:
                 relevant_filters = [filter_ for filter_ in relevant_filters if filter_ not in ignore_filters]
         return relevant_filters
 
+    @staticmethod
+    async def _filter_triggered(
+        ctx: FilterContext, filter_: Filter, default_answer: bool, failed_by_default: set[str]
+    ) -> bool:
+        """Return whether the filter is relevant in the context, and if so whether it triggers."""
+        if not filter_.validations:
+            return default_answer and await filter_.triggered_on(ctx)
+
+        passed, failed = filter_.validations.evaluate(ctx)
+        return not failed and failed_by_default < passed and await filter_.triggered_on(ctx)
+
+    def update_defaults(self, list_data: dict) -> set[str]:
+        """
+        Update the default settings and stamp of the list in place, and return the names of the changed entries.
+
+        Only the changed entries are replaced, so that the rest keep anything they've already computed.
+        """
+        changed = set()
+        for current, new in zip(self.defaults, create_settings(list_data["settings"], keep_empty=True), strict=True):
+            for entry_name in current.keys() | new.keys():
+                current_entry, new_entry = current.get(entry_name), new.get(entry_name)
+                if _dump(current_entry) == _dump(new_entry):
+                    continue
+                changed.add(entry_name)
+                if new_entry is None:
+                    current.pop(entry_name)
+                else:
+                    current[entry_name] = new_entry
+        # The list is frozen so that its identity stays meaningful, but its stamp has to follow the database.
+        object.__setattr__(self, "updated_at", arrow.get(list_data["updated_at"]))
+        return changed
+
     def default(self, setting_name: str) -> Any:
         """Get the default value of a specific setting."""
         missing = object()
@@ -157,6 +196,11 @@ class AtomicList:
         return hash(id(self))
 
 
+def _dump(entry: SettingsEntry | None) -> dict | None:
+    """Return the values of the settings entry, ignoring anything it computed and cached."""
+    return None if entry is None else entry.model_dump()
+
+
 T = typing.TypeVar("T", bound=Filter)
 
 
@@ -166,8 +210,25 @@ class FilterList(dict[ListType, AtomicList], typing.Generic[T], FieldRequiring):
     # Each subclass must define a name matching the filter_list name we're expecting to receive from the database.
     # Names must be unique across all filter lists.
     name = FieldRequiring.MUST_SET_UNIQUE
+    # Whether evaluating the list involves network requests. Such lists are evaluated concurrently with each other,
+    # after the rest of the lists were evaluated.
+    io_bound: typing.ClassVar[bool] = False
+    # Incremented whenever a list or a filter is added, edited, or removed, so that cached verdicts can be discarded.
+    version: int = 0
 
     _already_warned = set()
+    # The union of all the actions the list could take, and the version of the list it was computed for.
+    _possible_actions: ActionSettings | None = None
+    _possible_actions_version: int = -1
+
+    def __setitem__(self, list_type: ListType, atomic_list: AtomicList) -> None:
+        self.version += 1
+        super().__setitem__(list_type, atomic_list)
+
+    def pop(self, list_type: ListType, *default: Any) -> AtomicList:
+        """Remove the list of the specified type and return it."""
+        self.version += 1
+        return super().pop(list_type, *default)
 
     def add_list(self, list_data: dict) -> AtomicList:
         """Add a new type of list (such as a whitelist or a blacklist) this filter list."""
@@ -192,13 +253,59 @@ class FilterList(dict[ListType, AtomicList], typing.Generic[T], FieldRequiring):
         )
         return self[list_type]
 
+    def update_list(self, list_data: dict) -> AtomicList:
+        """
+        Apply the data of an edited list to the list of its type, instead of recreating the list and all of its filters.
+
+        Filters only need to be recreated if they override part of a default settings entry which changed, since the
+        rest of the entry's values are copied from the defaults when the filter is created.
+        """
+        list_type = ListType(list_data["list_type"])
+        if list_type not in self:
+            return self.add_list(list_data)
+
+        atomic_list = self[list_type]
+        changed = atomic_list.update_defaults(list_data)
+        self.version += 1
+        if changed:
+            for filter_data in list_data["filters"]:
+                filter_ = atomic_list.filters.get(filter_data["id"])
+                if filter_ and any(
+                    entry_name in settings
+                    for settings in (filter_.actions, filter_.validations) if settings
+                    for entry_name in changed
+                ):
+                    self.add_filter(list_type, filter_data)
+        return atomic_list
+
     def add_filter(self, list_type: ListType, filter_data: dict) -> T | None:
         """Add a filter to the list of the specified type."""
         new_filter = self._create_filter(filter_data, self[list_type].defaults)
         if new_filter:
             self[list_type].filters[filter_data["id"]] = new_filter
+            self.version += 1
         return new_filter
 
+    def remove_filter(self, list_type: ListType, filter_id: int) -> T | None:
+        """Remove the filter with the given ID from the list of the specified type, and return it if it was found."""
+        self.version += 1
+        return self[list_type].filters.pop(filter_id, None)
+
+    def possible_actions(self) -> ActionSettings | None:
+        """
+        Return the union of the defaults and the overrides of every list type, which bounds the actions of any trigger.
+
+        It's only computed again when the list changes.
+        """
+        if self._possible_actions_version != self.version:
+            actions = []
+            for atomic_list in self.values():
+                actions.append(atomic_list.defaults.actions)
+                actions.extend(filter_.actions for filter_ in atomic_list.filters.values() if filter_.actions)
+            self._possible_actions = reduce(ActionSettings.union, actions) if actions else None
+            self._possible_actions_version = self.version
+        return self._possible_actions
+
     @abstractmethod
     def get_filter_type(self, content: str) -> type[T]:
         """Get a subclass of filter matching the filter list and the filter's content."""
@@ -1,19 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import re
 import typing
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import monotonic
 
 from discord import Embed, Invite
 from discord.errors import NotFound
+from pydis_core.utils import scheduling
 from pydis_core.utils.regex import DISCORD_INVITE
 
 import bot
+from bot import constants
 from bot.exts.filtering._filter_context import Event, FilterContext
 from bot.exts.filtering._filter_lists.filter_list import FilterList, ListType
 from bot.exts.filtering._filters.filter import Filter
 from bot.exts.filtering._filters.invite import InviteFilter
 from bot.exts.filtering._settings import ActionSettings
-from bot.exts.filtering._utils import clean_input
 
 if typing.TYPE_CHECKING:
     from bot.exts.filtering.filtering import Filtering
@@ -26,6 +31,113 @@ REFINED_INVITE_CODE = re.compile(
 )
 
 
+@dataclass(frozen=True, slots=True)
+class ResolvedInvite:
+    """
+    The parts of a resolved invite which the invite filters use.
+
+    Only these are cached instead of the whole invite, which keeps references to the guild, the channel and the inviter.
+    The guild's name and icon, and the member counts, are only used for the alert embed.
+    """
+
+    code: str
+    group_dm: bool
+    guild_id: int | None
+    features: frozenset[str]
+    guild_name: str | None = None
+    guild_icon_url: str | None = None
+    member_count: int | None = None
+    presence_count: int | None = None
+
+    @classmethod
+    def from_invite(cls, invite: Invite) -> ResolvedInvite:
+        """Take the parts of the invite used for filtering."""
+        guild = invite.guild
+        if guild is None:
+            return cls(
+                invite.code, group_dm=True, guild_id=None, features=frozenset(),
+                member_count=invite.approximate_member_count, presence_count=invite.approximate_presence_count
+            )
+        return cls(
+            invite.code,
+            group_dm=False,
+            guild_id=guild.id,
+            features=frozenset(guild.features),
+            guild_name=guild.name,
+            guild_icon_url=guild.icon.url if guild.icon is not None else None,
+            member_count=invite.approximate_member_count,
+            presence_count=invite.approximate_presence_count
+        )
+
+
+class InviteCache:
+    """
+    A cache of resolved invites, keyed by invite code.
+
+    Invites which resolve are kept for `ttl` seconds, and codes which don't resolve for `not_found_ttl` seconds, so that
+    repeated invites (such as during an invite spam raid) don't each cost an API request.
+    Concurrent lookups of the same code share a single request.
+
+    When the cache is full, the least recently used code is evicted.
+    """
+
+    def __init__(self, ttl: float, not_found_ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.not_found_ttl = not_found_ttl
+        self.maxsize = maxsize
+
+        # Invite code to the time the entry expires at and the invite (None if it doesn't resolve).
+        self._entries: OrderedDict[str, tuple[float, ResolvedInvite | None]] = OrderedDict()
+        self._pending: dict[str, asyncio.Future[ResolvedInvite | None]] = {}
+
+    async def fetch(self, invite_code: str) -> ResolvedInvite | None:
+        """Return the invite matching the code, or None if the invite couldn't be found."""
+        if entry := self._entries.get(invite_code):
+            expires_at, invite = entry
+            if expires_at > monotonic():
+                self._entries.move_to_end(invite_code)
+                bot.instance.stats.incr("filters.invite_cache.hit")
+                return invite
+            del self._entries[invite_code]
+
+        if not (future := self._pending.get(invite_code)):
+            bot.instance.stats.incr("filters.invite_cache.miss")
+            # The request is made in a separate task so that it's not cancelled along with the first caller.
+            # The task's own result is discarded by the scheduling wrapper, so it's passed on through a future instead.
+            future = asyncio.get_running_loop().create_future()
+            self._pending[invite_code] = future
+            scheduling.create_task(self._resolve(invite_code, future))
+        else:
+            bot.instance.stats.incr("filters.invite_cache.shared")
+        return await asyncio.shield(future)
+
+    async def _resolve(self, invite_code: str, future: asyncio.Future[ResolvedInvite | None]) -> None:
+        """Fetch the invite from Discord, cache the result, and pass it on to the lookups waiting for it."""
+        try:
+            try:
+                invite = ResolvedInvite.from_invite(await bot.instance.fetch_invite(invite_code))
+            except NotFound:
+                invite, ttl = None, self.not_found_ttl
+            except Exception as e:
+                future.set_exception(e)
+                return
+            else:
+                ttl = self.ttl
+            self._store(invite_code, invite, ttl)
+            future.set_result(invite)
+        finally:
+            del self._pending[invite_code]
+            if not future.done():
+                future.cancel()
+
+    def _store(self, invite_code: str, invite: ResolvedInvite | None, ttl: float) -> None:
+        """Cache the invite for `ttl` seconds, evicting the least recently used entry if the cache is full."""
+        self._entries[invite_code] = (monotonic() + ttl, invite)
+        self._entries.move_to_end(invite_code)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
 class InviteList(FilterList[InviteFilter]):
     """
     A list of filters, each looking for guild invites to a specific guild.
@@ -42,9 +154,15 @@ class InviteList(FilterList[InviteFilter]):
     """
 
     name = "invite"
+    io_bound = True
 
     def __init__(self, filtering_cog: Filtering):
         super().__init__()
+        self.invite_cache = InviteCache(
+            constants.Filtering.invite_cache_ttl,
+            constants.Filtering.invite_cache_not_found_ttl,
+            constants.Filtering.invite_cache_size,
+        )
         filtering_cog.subscribe(self, Event.MESSAGE, Event.MESSAGE_EDIT, Event.SNEKBOX)
 
     def get_filter_type(self, content: str) -> type[Filter]:
@@ -60,7 +178,7 @@ class InviteList(FilterList[InviteFilter]):
         self, ctx: FilterContext
     ) -> tuple[ActionSettings | None, list[str], dict[ListType, list[Filter]]]:
         """Dispatch the given event to the list's filters, and return actions to take and messages to relay to mods."""
-        text = clean_input(ctx.content, keep_newlines=True)
+        text = ctx.normalized_content(keep_newlines=True)
 
         matches = list(DISCORD_INVITE.finditer(text))
         invite_codes = {m.group("invite") for m in matches}
@@ -84,35 +202,31 @@ class InviteList(FilterList[InviteFilter]):
         # Sort the invites into two categories:
         invites_for_inspection = dict()  # Found guild invites requiring further inspection.
         unknown_invites = dict()  # Either don't resolve or group DMs.
-        for invite_code in refined_invites.values():
-            try:
-                invite = await bot.instance.fetch_invite(invite_code)
-            except NotFound:
-                if check_if_allowed:
-                    unknown_invites[invite_code] = None
-            else:
-                if invite.guild:
-                    invites_for_inspection[invite_code] = invite
-                elif check_if_allowed:  # Group DM
-                    unknown_invites[invite_code] = invite
+        codes_to_resolve = list(dict.fromkeys(refined_invites.values()))
+        resolved = await asyncio.gather(*(self.invite_cache.fetch(code) for code in codes_to_resolve))
+        for invite_code, invite in zip(codes_to_resolve, resolved, strict=True):
+            if invite and not invite.group_dm:
+                invites_for_inspection[invite_code] = invite
+            elif check_if_allowed:  # Either doesn't resolve or a group DM.
+                unknown_invites[invite_code] = invite
 
         # Find any blocked invites
-        new_ctx = ctx.replace(content={invite.guild.id for invite in invites_for_inspection.values()})
+        new_ctx = ctx.replace(content={invite.guild_id for invite in invites_for_inspection.values()})
         triggered = await self[ListType.DENY].filter_list_result(new_ctx)
         blocked_guilds = {filter_.content for filter_ in triggered}
         blocked_invites = {
-            code: invite for code, invite in invites_for_inspection.items() if invite.guild.id in blocked_guilds
+            code: invite for code, invite in invites_for_inspection.items() if invite.guild_id in blocked_guilds
         }
 
         # Remove the ones which are already confirmed as blocked, or otherwise ones which are partnered or verified.
         invites_for_inspection = {
             code: invite for code, invite in invites_for_inspection.items()
-            if invite.guild.id not in blocked_guilds
-            and "PARTNERED" not in invite.guild.features and "VERIFIED" not in invite.guild.features
+            if invite.guild_id not in blocked_guilds
+            and "PARTNERED" not in invite.features and "VERIFIED" not in invite.features
         }
 
         # Remove any remaining invites which are allowed
-        guilds_for_inspection = {invite.guild.id for invite in invites_for_inspection.values()}
+        guilds_for_inspection = {invite.guild_id for invite in invites_for_inspection.values()}
 
         if check_if_allowed:  # Whether unknown invites need to be checked.
             new_ctx = ctx.replace(content=guilds_for_inspection)
@@ -122,7 +236,7 @@ class InviteList(FilterList[InviteFilter]):
             ]
             allowed = {filter_.content for filter_ in all_triggers[ListType.ALLOW]}
             unknown_invites.update({
-                code: invite for code, invite in invites_for_inspection.items() if invite.guild.id not in allowed
+                code: invite for code, invite in invites_for_inspection.items() if invite.guild_id not in allowed
             })
 
         if not triggered and not unknown_invites:
@@ -147,26 +261,26 @@ class InviteList(FilterList[InviteFilter]):
 
         messages = self[ListType.DENY].format_messages(triggered)
         messages += [
-            f"`{code} - {invite.guild.id}`" if invite else f"`{code}`" for code, invite in unknown_invites.items()
+            f"`{code} - {invite.guild_id}`" if invite else f"`{code}`" for code, invite in unknown_invites.items()
         ]
         return actions, messages, all_triggers
 
     @staticmethod
-    def _guild_embed(invite: Invite) -> Embed:
+    def _guild_embed(invite: ResolvedInvite) -> Embed:
         """Return an embed representing the guild invites to."""
         embed = Embed()
-        if invite.guild:
-            embed.title = invite.guild.name
-            embed.set_footer(text=f"Guild ID: {invite.guild.id}")
-            if invite.guild.icon is not None:
-                embed.set_thumbnail(url=invite.guild.icon.url)
+        if not invite.group_dm:
+            embed.title = invite.guild_name
+            embed.set_footer(text=f"Guild ID: {invite.guild_id}")
+            if invite.guild_icon_url is not None:
+                embed.set_thumbnail(url=invite.guild_icon_url)
         else:
             embed.title = "Group DM"
 
         embed.description = (
             f"**Invite Code:** {invite.code}\n"
-            f"**Members:** {invite.approximate_member_count}\n"
-            f"**Active:** {invite.approximate_presence_count}"
+            f"**Members:** {invite.member_count}\n"
+            f"**Active:** {invite.presence_count}"
         )
 
         return embed
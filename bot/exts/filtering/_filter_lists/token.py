@@ -2,18 +2,207 @@ from __future__ import annotations
 
 import re
 import typing
+from collections.abc import Iterable
+from contextlib import suppress
 
+import regex
+
+from bot import constants
 from bot.exts.filtering._filter_context import Event, FilterContext
-from bot.exts.filtering._filter_lists.filter_list import FilterList, ListType
+from bot.exts.filtering._filter_lists.filter_list import AtomicList, FilterList, ListType
 from bot.exts.filtering._filters.filter import Filter
-from bot.exts.filtering._filters.token import TokenFilter
+from bot.exts.filtering._filters.token import TokenFilter, is_pathological, match_bounds
 from bot.exts.filtering._settings import ActionSettings
-from bot.exts.filtering._utils import clean_input
+from bot.exts.filtering._utils import ScanHistory, changed_span
 
 if typing.TYPE_CHECKING:
     from bot.exts.filtering.filtering import Filtering
 
-SPOILER_RE = re.compile(r"(\|\|.+?\|\|)", re.DOTALL)
+
+class TokenMatcher:
+    """
+    A compiled view of a list of token filters, used to quickly rule out the filters which can't trigger.
+
+    The patterns which can be safely combined are joined into alternations. If an alternation finds nothing in the
+    content, none of its patterns can match it either, and only the remaining patterns need to be searched for
+    individually. This covers the vast majority of messages, which don't trigger any filter.
+
+    Patterns are left out of the alternations if they contain groups (which could collide or change the meaning of
+    backreferences once combined), if they can't be compiled by themselves, or if they're likely to be slow, so that a
+    single slow pattern is searched for with its own time limit and doesn't slow down the rest.
+
+    The patterns whose matches have a bounded length, and which only look a bounded distance around their matches, are
+    combined into a separate "local" alternation. If none of them matched a text before it was edited, then any match
+    after the edit must be close to the edit, so only the surroundings of the edit need to be searched. The rest of the
+    patterns are "global", and are always searched for in the entire text.
+
+    The matcher is updated in place as filters are added, edited, or removed. The alternations are only recompiled when
+    the combinable patterns changed, and only once the matcher is next used, so a burst of edits costs a single compile.
+    """
+
+    def __init__(self, filters: Iterable[TokenFilter] = ()):
+        self._filters: dict[int, TokenFilter] = {}
+        # Filter ID to the wrapped pattern, for each of the alternations.
+        self._local: dict[int, str] = {}
+        self._global: dict[int, str] = {}
+        # Filter ID to the longest match of the pattern and how far around it it looks, for the local patterns.
+        self._bounds: dict[int, tuple[int, int]] = {}
+        self.local_pattern: regex.Pattern | None = None
+        self.global_pattern: regex.Pattern | None = None
+        self._width = 0
+        self._reach = 0
+        # The candidates for each combination of whether the local and the global alternations found anything.
+        self._candidates: dict[tuple[bool, bool], list[TokenFilter]] = {}
+        self._stale = True
+        self._pattern_stale = False
+        for filter_ in filters:
+            self.add(filter_)
+
+    def add(self, filter_: TokenFilter) -> None:
+        """Add the filter to the matcher, replacing any filter with the same ID."""
+        old_filter = self._filters.get(filter_.id)
+        self._filters[filter_.id] = filter_
+        self._stale = True
+        if old_filter and old_filter.content == filter_.content:
+            return
+
+        self._discard_pattern(filter_.id)
+        if self._is_combinable(filter_.content):
+            if bounds := match_bounds(filter_.content):
+                self._local[filter_.id] = f"(?:{filter_.content})"
+                self._bounds[filter_.id] = bounds
+            else:
+                self._global[filter_.id] = f"(?:{filter_.content})"
+        self._pattern_stale = True
+
+    def remove(self, filter_id: int) -> None:
+        """Remove the filter with the given ID from the matcher, if it's there."""
+        if self._filters.pop(filter_id, None) is None:
+            return
+        self._stale = True
+        self._pattern_stale = True
+        self._discard_pattern(filter_id)
+
+    def _discard_pattern(self, filter_id: int) -> None:
+        """Remove the pattern of the filter with the given ID from the alternations."""
+        self._local.pop(filter_id, None)
+        self._global.pop(filter_id, None)
+        self._bounds.pop(filter_id, None)
+
+    @staticmethod
+    def _compile(alternatives: dict[int, str]) -> regex.Pattern | None:
+        """Compile the patterns into an alternation, or return None if there are none or if it fails."""
+        if alternatives:
+            # Shouldn't fail, but don't let a single pattern break the whole list.
+            with suppress(regex.error):
+                return regex.compile("|".join(alternatives.values()), flags=regex.IGNORECASE)
+        return None
+
+    def _refresh(self) -> None:
+        """Bring the candidates, and the alternations if their patterns changed, up to date with the added filters."""
+        if self._pattern_stale:
+            self.local_pattern = self._compile(self._local)
+            self.global_pattern = self._compile(self._global)
+            self._width = max((width for width, _ in self._bounds.values()), default=0)
+            self._reach = max((reach for _, reach in self._bounds.values()), default=0)
+            self._pattern_stale = False
+
+        for local_found in (False, True):
+            for global_found in (False, True):
+                self._candidates[local_found, global_found] = [
+                    filter_ for id_, filter_ in self._filters.items()
+                    if (local_found or id_ not in self._local) and (global_found or id_ not in self._global)
+                ]
+        self._stale = False
+
+    @property
+    def filters(self) -> list[TokenFilter]:
+        """All filters in the matcher, in the order they were added."""
+        if self._stale:
+            self._refresh()
+        return self._candidates[True, True]
+
+    @property
+    def fallback(self) -> list[TokenFilter]:
+        """The filters which aren't part of an alternation, and so always need to be searched for individually."""
+        if self._stale:
+            self._refresh()
+        return self._candidates[False, False]
+
+    @staticmethod
+    def _is_combinable(pattern: str) -> bool:
+        """Return whether the pattern can be embedded in an alternation without changing its meaning."""
+        try:
+            # Wrapping the pattern fails if it has global flags which aren't at the start of the expression.
+            if re.compile(pattern).groups != 0 or re.compile(f"(?:{pattern})").groups != 0:
+                return False
+        except re.error:
+            return False
+        return not is_pathological(pattern)
+
+    def candidates(self, text: str) -> list[TokenFilter]:
+        """Return the filters which might trigger on the text, in the order they appear in the list."""
+        return self.search(text)[0]
+
+    def search(self, text: str, edit: tuple[int, int] | None = None) -> tuple[list[TokenFilter], bool]:
+        """
+        Return the filters which might trigger on the text in list order, and whether any local pattern might match it.
+
+        If `edit` is given, it's the span of the text which changed since a previous version of it, in which no local
+        pattern matched. The local patterns are then only searched for around the edit.
+        """
+        if self._stale:
+            self._refresh()
+
+        if not self._local:
+            local_found = False
+        elif not self.local_pattern:
+            local_found = True
+        elif edit:
+            local_found = self._search_around_edit(text, *edit)
+        else:
+            local_found = self._found(self.local_pattern, text)
+
+        if not self._global:
+            global_found = False
+        elif not self.global_pattern:
+            global_found = True
+        else:
+            global_found = self._found(self.global_pattern, text)
+
+        return self._candidates[local_found, global_found], local_found
+
+    def _search_around_edit(self, text: str, edit_start: int, edit_end: int) -> bool:
+        """
+        Return whether a local pattern might match the text close enough to the edit to be affected by it.
+
+        A match which reads (including the lookarounds) only characters before the edit, or only characters after it,
+        would have matched the text before the edit as well. So a new match must start within the longest match and
+        the lookaround reach before the edit, or the lookaround reach after it. Those starting positions are searched
+        within a window large enough for each of them to see everything it would in the entire text.
+        """
+        width, reach = self._width, self._reach
+        first_start = max(0, edit_start - width - reach)
+        last_start = edit_end + reach  # Exclusive.
+        window_start = max(0, first_start - reach)
+        window = text[window_start:last_start + width + reach]
+        # Unlike slicing, searching from a position doesn't pretend the string starts there.
+        return self._found(
+            self.local_pattern, window, first_start - window_start, last_start - window_start
+        )
+
+    @staticmethod
+    def _found(pattern: regex.Pattern, text: str, pos: int = 0, end: int | None = None) -> bool:
+        """
+        Return whether the pattern is found in the text, starting at `pos` or later and before `end`.
+
+        If the search times out, it's assumed the pattern was found.
+        """
+        try:
+            match = pattern.search(text, pos, timeout=constants.Filtering.token_search_timeout)
+        except TimeoutError:
+            return True
+        return match is not None and (end is None or match.start() < end)
 
 
 class TokensList(FilterList[TokenFilter]):
@@ -26,12 +215,18 @@ class TokensList(FilterList[TokenFilter]):
     Usually, if blocking literal strings, the literals themselves can be specified as the filter's value.
     But since this is a list of regex patterns, be careful of the items added. For example, a dot needs to be escaped
     to function as a literal dot.
+
+    When a message is edited, the local patterns (see `TokenMatcher`) are only searched for around the edit, if none of
+    them matched the text the list last scanned for that message. The result is the same as scanning the entire text.
     """
 
     name = "token"
 
     def __init__(self, filtering_cog: Filtering):
         super().__init__()
+        self._matchers: dict[ListType, TokenMatcher] = {}
+        # Message ID to the list version and the text last scanned for the message, if no local pattern matched it.
+        self._clean_scans: ScanHistory[tuple[int, str]] = ScanHistory()
         filtering_cog.subscribe(
             self, Event.MESSAGE, Event.MESSAGE_EDIT, Event.NICKNAME, Event.THREAD_NAME, Event.SNEKBOX
         )
@@ -45,30 +240,57 @@ class TokensList(FilterList[TokenFilter]):
         """Return the types of filters used by this list."""
         return {TokenFilter}
 
+    def add_list(self, list_data: dict) -> AtomicList:
+        """Add a new type of list (such as a whitelist or a blacklist) this filter list."""
+        new_list = super().add_list(list_data)
+        self._matchers[new_list.list_type] = TokenMatcher(new_list.filters.values())
+        return new_list
+
+    def add_filter(self, list_type: ListType, filter_data: dict) -> TokenFilter | None:
+        """Add a filter to the list of the specified type."""
+        new_filter = super().add_filter(list_type, filter_data)
+        if new_filter:
+            self._matchers[list_type].add(new_filter)
+        return new_filter
+
+    def remove_filter(self, list_type: ListType, filter_id: int) -> TokenFilter | None:
+        """Remove the filter with the given ID from the list of the specified type, and return it if it was found."""
+        removed_filter = super().remove_filter(list_type, filter_id)
+        self._matchers[list_type].remove(filter_id)
+        return removed_filter
+
     async def actions_for(
         self, ctx: FilterContext
     ) -> tuple[ActionSettings | None, list[str], dict[ListType, list[Filter]]]:
         """Dispatch the given event to the list's filters, and return actions to take and messages to relay to mods."""
-        text = ctx.content
-        if not text:
+        if not ctx.content:
             return None, [], {}
-        if SPOILER_RE.search(text):
-            text = self._expand_spoilers(text)
-        text = clean_input(text)
+        text = ctx.normalized_content(expand_spoilers=True)
         ctx = ctx.replace(content=text)
 
-        triggers = await self[ListType.DENY].filter_list_result(ctx)
+        deny_list = self[ListType.DENY]
+        candidates, local_found = self._matchers[ListType.DENY].search(text, self._edit_span(ctx, text))
+        if ctx.event in (Event.MESSAGE, Event.MESSAGE_EDIT) and ctx.message:
+            if local_found:
+                self._clean_scans.discard(ctx.message.id)
+            else:
+                self._clean_scans.set(ctx.message.id, (self.version, text))
+
+        triggers = await deny_list._create_filter_list_result(ctx, deny_list.defaults, candidates)
         actions = None
         messages = []
         if triggers:
-            actions = self[ListType.DENY].merge_actions(triggers)
-            messages = self[ListType.DENY].format_messages(triggers)
+            actions = deny_list.merge_actions(triggers)
+            messages = deny_list.format_messages(triggers)
         return actions, messages, {ListType.DENY: triggers}
 
-    @staticmethod
-    def _expand_spoilers(text: str) -> str:
-        """Return a string containing all interpretations of a spoilered message."""
-        split_text = SPOILER_RE.split(text)
-        return "".join(
-            split_text[0::2] + split_text[1::2] + split_text
-        )
+    def _edit_span(self, ctx: FilterContext, text: str) -> tuple[int, int] | None:
+        """Return the span of the text which changed since the edited message was last scanned clean, if it was."""
+        if ctx.event != Event.MESSAGE_EDIT or not ctx.message:
+            return None
+        scan = self._clean_scans.get(ctx.message.id)
+        # If the list changed since, the scan doesn't say anything about the current patterns.
+        if not scan or scan[0] != self.version:
+            return None
+        start, _, end = changed_span(scan[1], text)
+        return start, end
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import random
+import typing
+from dataclasses import dataclass
+
+if typing.TYPE_CHECKING:
+    from pydis_core.async_stats import AsyncStatsClient
+
+    from bot.exts.filtering._filter_lists.filter_list import AtomicList
+    from bot.exts.filtering._filters.filter import Filter
+
+
+@dataclass
+class EvaluationStats:
+    """The accumulated evaluation measurements of a filter or a filter list."""
+
+    label: str
+    calls: int = 0
+    hits: int = 0
+    total_time: float = 0.0  # In seconds.
+
+    @property
+    def mean_time(self) -> float:
+        """The mean evaluation time in seconds."""
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def record(self, elapsed: float, hit: bool) -> None:
+        """Add a single evaluation to the stats."""
+        self.calls += 1
+        self.hits += hit
+        self.total_time += elapsed
+
+
+class FilterStats:
+    """
+    Evaluation time, call count, and hit count of each filter and filter list.
+
+    Only a sample of the events is measured, to keep the overhead on the filtering hot path low.
+    The measurements are additionally sent to statsd.
+    """
+
+    def __init__(self, stats: AsyncStatsClient, sample_rate: float):
+        self.stats = stats
+        self.sample_rate = sample_rate
+        self.sampled_events = 0
+        self.filters: dict[int, EvaluationStats] = {}
+        self.lists: dict[str, EvaluationStats] = {}
+
+    def sample(self) -> bool:
+        """Return whether the current event should be measured."""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return False
+        self.sampled_events += 1
+        return True
+
+    def record_filter(self, atomic_list: AtomicList, filter_: Filter, elapsed: float, hit: bool) -> None:
+        """Record the evaluation of a single filter, including its validations."""
+        if filter_.id not in self.filters:
+            self.filters[filter_.id] = EvaluationStats(f"{atomic_list.label} `{filter_.content}`")
+        self.filters[filter_.id].record(elapsed, hit)
+
+        self.stats.timing(f"filters.timing.{atomic_list.name}.{filter_.id}", elapsed * 1000)
+        if hit:
+            self.stats.incr(f"filters.hits.{atomic_list.name}.{filter_.id}")
+
+    def record_list(self, list_name: str, elapsed: float, hit: bool) -> None:
+        """Record the evaluation of a filter list."""
+        self.lists.setdefault(list_name, EvaluationStats(list_name)).record(elapsed, hit)
+        self.stats.timing(f"filters.timing.{list_name}", elapsed * 1000)
+
+    def slowest(self, count: int) -> list[tuple[int, EvaluationStats]]:
+        """Return the IDs and stats of the filters which took the longest to evaluate in total."""
+        return sorted(self.filters.items(), key=lambda item: item[1].total_time, reverse=True)[:count]
+
+    def noisiest(self, count: int) -> list[tuple[int, EvaluationStats]]:
+        """Return the IDs and stats of the filters which were triggered the most times."""
+        noisy = [item for item in self.filters.items() if item[1].hits]
+        return sorted(noisy, key=lambda item: item[1].hits, reverse=True)[:count]
@@ -1,12 +1,10 @@
-from datetime import timedelta
-from itertools import takewhile
 from typing import ClassVar
 
-import arrow
 from pydantic import BaseModel
 
 from bot.exts.filtering._filter_context import Event, FilterContext
 from bot.exts.filtering._filters.filter import UniqueFilter
+from bot.exts.filtering._message_features import get_features, get_recent_messages
 
 
 class ExtraCharsSettings(BaseModel):
@@ -30,11 +28,10 @@ class CharsFilter(UniqueFilter):
 
     async def triggered_on(self, ctx: FilterContext) -> bool:
         """Search for the filter's content within a given context."""
-        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=self.extra_fields.interval)
-        relevant_messages = list(takewhile(lambda msg: msg.created_at > earliest_relevant_at, ctx.content))
+        relevant_messages = get_recent_messages(ctx, self.extra_fields.interval)
 
-        detected_messages = {msg for msg in relevant_messages if msg.author == ctx.author}
-        total_recent_chars = sum(len(msg.content) for msg in detected_messages)
+        detected_messages = set(relevant_messages)
+        total_recent_chars = sum(get_features(ctx, msg).chars for msg in detected_messages)
 
         if total_recent_chars > self.extra_fields.threshold:
             ctx.related_messages |= detected_messages
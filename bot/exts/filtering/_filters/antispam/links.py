@@ -1,15 +1,10 @@
-import re
-from datetime import timedelta
-from itertools import takewhile
 from typing import ClassVar
 
-import arrow
 from pydantic import BaseModel
 
 from bot.exts.filtering._filter_context import Event, FilterContext
 from bot.exts.filtering._filters.filter import UniqueFilter
-
-LINK_RE = re.compile(r"(https?://\S+)")
+from bot.exts.filtering._message_features import get_features, get_recent_messages
 
 
 class ExtraLinksSettings(BaseModel):
@@ -33,14 +28,13 @@ class LinksFilter(UniqueFilter):
 
     async def triggered_on(self, ctx: FilterContext) -> bool:
         """Search for the filter's content within a given context."""
-        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=self.extra_fields.interval)
-        relevant_messages = list(takewhile(lambda msg: msg.created_at > earliest_relevant_at, ctx.content))
-        detected_messages = {msg for msg in relevant_messages if msg.author == ctx.author}
+        relevant_messages = get_recent_messages(ctx, self.extra_fields.interval)
+        detected_messages = set(relevant_messages)
 
         total_links = 0
         messages_with_links = 0
         for msg in detected_messages:
-            total_matches = len(LINK_RE.findall(msg.content))
+            total_matches = get_features(ctx, msg).links
             if total_matches:
                 messages_with_links += 1
                 total_links += total_matches
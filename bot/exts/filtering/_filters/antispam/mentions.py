@@ -1,15 +1,14 @@
-from datetime import timedelta
-from itertools import takewhile
 from typing import ClassVar
 
-import arrow
-from discord import DeletedReferencedMessage, MessageType, NotFound
+from discord import DeletedReferencedMessage, Message, MessageType, NotFound
 from pydantic import BaseModel
 from pydis_core.utils.logging import get_logger
 
 import bot
 from bot.exts.filtering._filter_context import Event, FilterContext
 from bot.exts.filtering._filters.filter import UniqueFilter
+from bot.exts.filtering._message_features import get_features, get_recent_messages
+from bot.utils.message_cache import MessageSnapshot
 
 log = get_logger(__name__)
 
@@ -42,9 +41,8 @@ class MentionsFilter(UniqueFilter):
 
     async def triggered_on(self, ctx: FilterContext) -> bool:
         """Search for the filter's content within a given context."""
-        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=self.extra_fields.interval)
-        relevant_messages = list(takewhile(lambda msg: msg.created_at > earliest_relevant_at, ctx.content))
-        detected_messages = {msg for msg in relevant_messages if msg.author == ctx.author}
+        relevant_messages = get_recent_messages(ctx, self.extra_fields.interval)
+        detected_messages = set(relevant_messages)
 
         # We use `msg.mentions` here as that is supplied by the api itself, to determine who was mentioned.
         # Additionally, `msg.mentions` includes the user replied to, even if the mention doesn't occur in the body.
@@ -56,35 +54,44 @@ class MentionsFilter(UniqueFilter):
         # our implementation and discord's Markdown parser which would cause false positives or false negatives.
         total_recent_mentions = 0
         for msg in detected_messages:
+            mentions = get_features(ctx, msg).mentions
+            if not mentions:
+                continue
             # We check if the message is a reply, and if it is try to get the author
-            # since we ignore mentions of a user that we're replying to
-            reply_author = None
-
-            if msg.type == MessageType.reply:
-                ref = msg.reference
-
-                if not (resolved := ref.resolved):
-                    # It is possible, in a very unusual situation, for a message to have a reference
-                    # that is both not in the cache, and deleted while running this function.
-                    # In such a situation, this will throw an error which we catch.
-                    try:
-                        resolved = await bot.instance.get_partial_messageable(resolved.channel_id).fetch_message(
-                            resolved.message_id
-                        )
-                    except NotFound:
-                        log.info("Could not fetch the reference message as it has been deleted.")
-
-                if resolved and not isinstance(resolved, DeletedReferencedMessage):
-                    reply_author = resolved.author
-
-            for user in msg.mentions:
-                # Don't count bot or self mentions, or the user being replied to (if applicable)
-                if user.bot or user in {msg.author, reply_author}:
-                    continue
-                total_recent_mentions += 1
+            # since we ignore mentions of a user that we're replying to.
+            # A compact snapshot of a message from the cache already holds the author of the message replied to.
+            if isinstance(msg, MessageSnapshot):
+                reply_author_id = msg.reply_author_id
+            else:
+                reply_author_id = await self._reply_author_id(msg)
+
+            # Bot and self mentions are already excluded. Don't count the user being replied to (if applicable).
+            total_recent_mentions += sum(
+                1 for user_id in mentions if reply_author_id is None or user_id != reply_author_id
+            )
 
         if total_recent_mentions > self.extra_fields.threshold:
             ctx.related_messages |= detected_messages
             ctx.filter_info[self] = f"sent {total_recent_mentions} mentions"
             return True
         return False
+
+    @staticmethod
+    async def _reply_author_id(msg: Message) -> int | None:
+        """Return the ID of the author of the message replied to, if the message is a reply and it can be found."""
+        if msg.type != MessageType.reply:
+            return None
+
+        ref = msg.reference
+        if not (resolved := ref.resolved):
+            # It is possible, in a very unusual situation, for a message to have a reference
+            # that is both not in the cache, and deleted while running this function.
+            # In such a situation, this will throw an error which we catch.
+            try:
+                resolved = await bot.instance.get_partial_messageable(ref.channel_id).fetch_message(ref.message_id)
+            except NotFound:
+                log.info("Could not fetch the reference message as it has been deleted.")
+
+        if resolved and not isinstance(resolved, DeletedReferencedMessage):
+            return resolved.author.id
+        return None
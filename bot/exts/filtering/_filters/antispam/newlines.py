@@ -1,15 +1,10 @@
-import re
-from datetime import timedelta
-from itertools import takewhile
 from typing import ClassVar
 
-import arrow
 from pydantic import BaseModel
 
 from bot.exts.filtering._filter_context import Event, FilterContext
 from bot.exts.filtering._filters.filter import UniqueFilter
-
-NEWLINES = re.compile(r"(\n+)")
+from bot.exts.filtering._message_features import get_features, get_recent_messages
 
 
 class ExtraNewlinesSettings(BaseModel):
@@ -37,17 +32,13 @@ class NewlinesFilter(UniqueFilter):
 
     async def triggered_on(self, ctx: FilterContext) -> bool:
         """Search for the filter's content within a given context."""
-        earliest_relevant_at = arrow.utcnow() - timedelta(seconds=self.extra_fields.interval)
-        relevant_messages = list(takewhile(lambda msg: msg.created_at > earliest_relevant_at, ctx.content))
-        detected_messages = {msg for msg in relevant_messages if msg.author == ctx.author}
-
-        # Identify groups of newline characters and get group & total counts
-        newline_counts = []
-        for msg in detected_messages:
-            newline_counts += [len(group) for group in NEWLINES.findall(msg.content)]
-        total_recent_newlines = sum(newline_counts)
-        # Get maximum newline group size
-        max_newline_group = max(newline_counts, default=0)
+        relevant_messages = get_recent_messages(ctx, self.extra_fields.interval)
+        detected_messages = set(relevant_messages)
+
+        # Get the total newline count, and the maximum newline group size
+        features = [get_features(ctx, msg) for msg in detected_messages]
+        total_recent_newlines = sum(msg_features.newlines for msg_features in features)
+        max_newline_group = max((msg_features.max_consecutive_newlines for msg_features in features), default=0)
 
         # Check first for total newlines, if this passes then check for large groupings
         if total_recent_newlines > self.extra_fields.threshold:
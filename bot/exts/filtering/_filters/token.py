@@ -1,9 +1,121 @@
+from __future__ import annotations
+
 import re
+import warnings
+from functools import cached_property
 
+import regex
 from discord.ext.commands import BadArgument
+from pydis_core.utils import scheduling
+from pydis_core.utils.logging import get_logger
 
+import bot
+from bot import constants
+from bot.constants import Channels
 from bot.exts.filtering._filter_context import FilterContext
 from bot.exts.filtering._filters.filter import Filter
+from bot.exts.filtering._settings import Defaults
+
+log = get_logger(__name__)
+
+# The patterns are analyzed with the parser of `re`, whose public modules are deprecated.
+# If they're no longer available, the analysis is skipped, and only the search time limit guards against slow patterns.
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import sre_constants
+        import sre_parse
+except ImportError:
+    sre_constants = sre_parse = None
+    _REPEATS = ()
+else:
+    _REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+
+def _has_nested_unbounded_repeats(parsed: sre_parse.SubPattern, in_unbounded_repeat: bool = False) -> bool:
+    """Return whether the parsed pattern has an unbounded repeat nested within another unbounded repeat."""
+    for op, av in parsed:
+        if op in _REPEATS:
+            _, max_, subpattern = av
+            unbounded = max_ == sre_constants.MAXREPEAT
+            if unbounded and in_unbounded_repeat:
+                return True
+            if _has_nested_unbounded_repeats(subpattern, in_unbounded_repeat or unbounded):
+                return True
+        elif op == sre_constants.SUBPATTERN:
+            if _has_nested_unbounded_repeats(av[-1], in_unbounded_repeat):
+                return True
+        elif op == sre_constants.BRANCH:
+            if any(_has_nested_unbounded_repeats(branch, in_unbounded_repeat) for branch in av[1]):
+                return True
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            if _has_nested_unbounded_repeats(av[1], in_unbounded_repeat):
+                return True
+        elif op == sre_constants.GROUPREF_EXISTS:
+            if any(
+                branch and _has_nested_unbounded_repeats(branch, in_unbounded_repeat) for branch in av[1:]
+            ):
+                return True
+    return False
+
+
+def is_pathological(pattern: str) -> bool:
+    """
+    Return whether the pattern is likely to take exponential time to match on some inputs.
+
+    This is a static check for nested unbounded quantifiers, such as `(a+)+` or `(\\w+\\s?)*`. It doesn't catch every
+    slow pattern, which is why the patterns are additionally matched with a time limit.
+    """
+    if sre_parse is None:
+        return False
+    try:
+        return _has_nested_unbounded_repeats(sre_parse.parse(pattern))
+    except Exception:
+        # Besides invalid patterns, the parser's output may change between Python versions.
+        log.debug(f"Couldn't check whether the pattern {pattern!r} is pathological.", exc_info=True)
+        return False
+
+
+def _lookaround_reach(parsed: sre_parse.SubPattern) -> int:
+    """Return how many characters outside of a match the parsed pattern may inspect, assuming its width is bounded."""
+    reach = 0
+    for op, av in parsed:
+        if op == sre_constants.AT:
+            # Anchors and word boundaries look at the characters next to them. `$` also matches before a final newline,
+            # so it depends on whether there's a character after the next one.
+            reach = max(reach, 2)
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            reach = max(reach, av[1].getwidth()[1] + _lookaround_reach(av[1]))
+        elif op in (*_REPEATS, sre_constants.POSSESSIVE_REPEAT):
+            reach = max(reach, _lookaround_reach(av[2]))
+        elif op in (sre_constants.SUBPATTERN, sre_constants.ATOMIC_GROUP):
+            reach = max(reach, _lookaround_reach(av[-1]))
+        elif op == sre_constants.BRANCH:
+            reach = max(reach, *(_lookaround_reach(branch) for branch in av[1]))
+    return reach
+
+
+def match_bounds(pattern: str) -> tuple[int, int] | None:
+    """
+    Return the longest possible match of the pattern, and how far around a match the pattern may look.
+
+    None is returned if either is unbounded, or if the pattern can't be analyzed.
+    """
+    if sre_parse is None:
+        return None
+    try:
+        parsed = sre_parse.parse(pattern)
+        width = parsed.getwidth()[1]
+        if width >= sre_constants.MAXREPEAT:
+            return None
+        reach = _lookaround_reach(parsed)
+    except Exception:
+        # Besides invalid patterns, the parser's output may change between Python versions.
+        log.debug(f"Couldn't find the match bounds of the pattern {pattern!r}.", exc_info=True)
+        return None
+    if reach >= sre_constants.MAXREPEAT:
+        return None
+    return width, reach
 
 
 class TokenFilter(Filter):
@@ -11,16 +123,52 @@ class TokenFilter(Filter):
 
     name = "token"
 
+    def __init__(self, filter_data: dict, defaults: Defaults | None = None):
+        super().__init__(filter_data, defaults)
+        # The number of times searching for the pattern timed out. Once it reaches the limit, the filter is skipped.
+        self.timeouts = 0
+
+    @cached_property
+    def pattern(self) -> regex.Pattern:
+        """The compiled regex pattern of the filter."""
+        return regex.compile(self.content, flags=regex.IGNORECASE)
+
+    @property
+    def skipped(self) -> bool:
+        """Whether the filter is skipped because its pattern timed out too many times."""
+        return self.timeouts >= constants.Filtering.token_timeout_limit
+
     async def triggered_on(self, ctx: FilterContext) -> bool:
         """Searches for a regex pattern within a given context."""
-        pattern = self.content
+        if self.skipped:
+            return False
+
+        try:
+            match = self.pattern.search(ctx.content, timeout=constants.Filtering.token_search_timeout)
+        except TimeoutError:
+            self._register_timeout()
+            return False
 
-        match = re.search(pattern, ctx.content, flags=re.IGNORECASE)
         if match:
             ctx.matches.append(match[0])
             return True
         return False
 
+    def _register_timeout(self) -> None:
+        """Count a timed out search, and report the filter to the moderators once it's skipped."""
+        self.timeouts += 1
+        log.warning(f"Searching for the pattern of token filter #{self.id} timed out ({self.timeouts} times so far).")
+        bot.instance.stats.incr("filters.token_timeouts")
+        if not self.skipped:
+            return
+
+        alerts_channel = bot.instance.get_channel(Channels.mod_alerts)
+        if alerts_channel:
+            scheduling.create_task(alerts_channel.send(
+                f":warning: Token filter #{self.id} (`{self.content}`) is now skipped, because searching for it "
+                f"timed out {self.timeouts} times. Edit its pattern to enable it again."
+            ))
+
     @classmethod
     async def process_input(cls, content: str, description: str) -> tuple[str, str]:
         """
@@ -30,6 +178,12 @@ class TokenFilter(Filter):
         """
         try:
             re.compile(content)
-        except re.error as e:
+            regex.compile(content)
+        except (re.error, regex.error) as e:
             raise BadArgument(str(e))
+        if is_pathological(content):
+            raise BadArgument(
+                "The pattern has nested unbounded quantifiers (such as `(a+)+`), "
+                "which can take exponential time to match."
+            )
         return content, description
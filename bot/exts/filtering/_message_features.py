@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import bisect
+import re
+from dataclasses import dataclass
+
+import arrow
+from discord import Message
+from emoji import demojize
+
+from bot.exts.filtering._filter_context import FilterContext
+
+DISCORD_EMOJI_RE = re.compile(r"<:\w+:\d+>|:\w+:")
+CODE_BLOCK_RE = re.compile(r"```.*?```", flags=re.DOTALL)
+LINK_RE = re.compile(r"(https?://\S+)")
+NEWLINES = re.compile(r"(\n+)")
+
+
+@dataclass(frozen=True, slots=True)
+class MessageFeatures:
+    """
+    The properties of a message which the antispam rules aggregate over.
+
+    These are extracted once when the message enters the filtering message cache (and again if it's edited), so that
+    the rules only need to sum up numbers across the messages in their interval instead of re-scanning each message.
+    """
+
+    chars: int
+    attachments: int
+    emojis: int
+    links: int
+    newlines: int
+    max_consecutive_newlines: int
+    # IDs of the mentioned users, excluding bots and the author. A replied-to user is excluded by the rule itself.
+    mentions: tuple[int, ...]
+    role_mentions: int
+    content_hash: int
+
+    @classmethod
+    def from_message(cls, message: Message) -> MessageFeatures:
+        """Extract the features of the given message."""
+        content = message.content
+        newline_groups = [len(group) for group in NEWLINES.findall(content)]
+        return cls(
+            chars=len(content),
+            attachments=len(message.attachments),
+            # Get rid of code blocks in the message before searching for emojis.
+            # Convert Unicode emojis to :emoji: format to get their count.
+            emojis=len(DISCORD_EMOJI_RE.findall(demojize(CODE_BLOCK_RE.sub("", content)))),
+            links=len(LINK_RE.findall(content)),
+            newlines=sum(newline_groups),
+            max_consecutive_newlines=max(newline_groups, default=0),
+            mentions=tuple(user.id for user in message.mentions if not user.bot and user != message.author),
+            role_mentions=len(message.role_mentions),
+            content_hash=hash(content),
+        )
+
+
+def get_features(ctx: FilterContext, message: Message) -> MessageFeatures:
+    """Return the features of the message from the context's message cache, or extract them if they're missing."""
+    features = ctx.message_cache.get_message_features(message.id) if ctx.message_cache else None
+    return features or MessageFeatures.from_message(message)
+
+
+def get_timestamp(ctx: FilterContext, message: Message) -> float:
+    """Return the creation time of the message as a timestamp, from the context's message cache if it's there."""
+    timestamp = ctx.message_cache.get_message_timestamp(message.id) if ctx.message_cache else None
+    return message.created_at.timestamp() if timestamp is None else timestamp
+
+
+def get_recent_messages(ctx: FilterContext, interval: int) -> list[Message]:
+    """
+    Return the messages of the context's content which were sent in the last `interval` seconds.
+
+    The content is expected to be the messages of the author from the newest, so the oldest relevant message is found
+    with a binary search on their creation times.
+    """
+    cutoff = arrow.utcnow().timestamp() - interval
+    stop = bisect.bisect_left(ctx.content, -cutoff, key=lambda msg: -get_timestamp(ctx, msg))
+    return ctx.content[:stop]
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import heapq
+from collections import defaultdict
+from collections.abc import Iterable
+from contextlib import suppress
+from typing import NamedTuple
+
+import arrow
+import discord
+from discord import HTTPException
+from pydis_core.utils import scheduling
+
+from bot.bot import Bot
+from bot.log import get_logger
+
+log = get_logger(__name__)
+
+# Messages due within this long of each other are deleted together.
+DELETION_WINDOW = datetime.timedelta(minutes=1)
+# Discord only bulk deletes messages younger than 14 days. A margin is kept in case the request takes a while.
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)
+BULK_DELETE_MAX_MESSAGES = 100
+# How many offensive message records are deleted from the site concurrently.
+API_DELETE_BATCH_SIZE = 20
+
+
+class OffensiveMessage(NamedTuple):
+    """An offensive message waiting for its deletion date."""
+
+    delete_at: datetime.datetime
+    id: int
+    channel_id: int
+
+    @classmethod
+    def from_record(cls, record: dict) -> OffensiveMessage:
+        """Create the entry from a record of the `bot/offensive-messages` endpoint."""
+        return cls(arrow.get(record["delete_date"]).datetime, record["id"], record["channel_id"])
+
+
+class OffensiveMessageDeleter:
+    """
+    Deletes offensive messages once their deletion date is reached.
+
+    The messages are kept in a heap ordered by deletion date, with a single timer waiting for the earliest one.
+    Messages which are due together are bulk deleted in each channel, and then removed from the site.
+    """
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+        self._heap: list[OffensiveMessage] = []
+        self._scheduled: set[int] = set()
+        self._changed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def start(self) -> None:
+        """Start deleting the messages as they become due."""
+        self._task = scheduling.create_task(self._delete_due_messages())
+
+    def stop(self) -> None:
+        """Stop deleting messages."""
+        if self._task:
+            self._task.cancel()
+
+    def schedule(self, record: dict) -> None:
+        """Schedule the message in the record from the `bot/offensive-messages` endpoint for deletion."""
+        if record["id"] in self._scheduled:
+            return
+        message = OffensiveMessage.from_record(record)
+        self._scheduled.add(message.id)
+        heapq.heappush(self._heap, message)
+        if self._heap[0] is message:
+            # The timer is waiting for a later message.
+            self._changed.set()
+
+    def pop_due(self, now: datetime.datetime) -> list[OffensiveMessage]:
+        """Remove and return the messages due by the given time, along with the ones due shortly after them."""
+        due = []
+        while self._heap and self._heap[0].delete_at <= now + DELETION_WINDOW:
+            due.append(heapq.heappop(self._heap))
+            self._scheduled.discard(due[-1].id)
+        return due
+
+    async def _delete_due_messages(self) -> None:
+        """Wait for the earliest message to become due, and delete it along with any other messages due by then."""
+        while True:
+            self._changed.clear()
+            if not self._heap:
+                await self._changed.wait()
+                continue
+
+            delay = (self._heap[0].delete_at - arrow.utcnow().datetime).total_seconds()
+            if delay > 0:
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self._changed.wait(), delay)
+                continue
+
+            due = self.pop_due(arrow.utcnow().datetime)
+            try:
+                await self.delete(due)
+            except Exception:
+                log.exception(f"Failed to delete {len(due)} offensive messages.")
+
+    async def delete(self, messages: Iterable[OffensiveMessage]) -> None:
+        """Delete the messages from Discord, and then from the site."""
+        by_channel = defaultdict[int, list[int]](list)
+        for message in messages:
+            by_channel[message.channel_id].append(message.id)
+
+        await asyncio.gather(*(
+            self._delete_from_channel(channel_id, message_ids) for channel_id, message_ids in by_channel.items()
+        ))
+
+        message_ids = [message_id for message_ids in by_channel.values() for message_id in message_ids]
+        for i in range(0, len(message_ids), API_DELETE_BATCH_SIZE):
+            batch = message_ids[i:i + API_DELETE_BATCH_SIZE]
+            results = await asyncio.gather(
+                *(self.bot.api_client.delete(f"bot/offensive-messages/{message_id}") for message_id in batch),
+                return_exceptions=True
+            )
+            for message_id, result in zip(batch, results, strict=True):
+                if isinstance(result, Exception):
+                    log.error(f"Failed to delete the offensive message record {message_id}: {result}")
+        log.info(f"Deleted {len(message_ids)} offensive messages in {len(by_channel)} channels.")
+
+    async def _delete_from_channel(self, channel_id: int, message_ids: list[int]) -> None:
+        """Bulk delete the messages which are recent enough, and delete the rest one by one."""
+        channel = self.bot.get_channel(channel_id)
+        if not channel:
+            return
+
+        bulk_deletable_after = arrow.utcnow().datetime - BULK_DELETE_MAX_AGE
+        recent, old = [], []
+        for message_id in message_ids:
+            if discord.utils.snowflake_time(message_id) > bulk_deletable_after:
+                recent.append(discord.Object(message_id))
+            else:
+                old.append(message_id)
+
+        for i in range(0, len(recent), BULK_DELETE_MAX_MESSAGES):
+            batch = recent[i:i + BULK_DELETE_MAX_MESSAGES]
+            try:
+                await channel.delete_messages(batch)
+            except HTTPException as e:
+                log.warning(f"Failed to bulk delete {len(batch)} messages in channel {channel_id}: status {e.status}")
+
+        for message_id in old:
+            try:
+                await channel.get_partial_message(message_id).delete()
+            except discord.NotFound:
+                log.info(
+                    f"Tried to delete message {message_id}, but the message can't be found "
+                    f"(it has been probably already deleted)."
+                )
+            except HTTPException as e:
+                log.warning(f"Failed to delete message {message_id}: status {e.status}")
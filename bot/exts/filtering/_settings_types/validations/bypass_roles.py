@@ -2,7 +2,7 @@ from collections.abc import Sequence
 from typing import ClassVar
 
 from discord import Member
-from pydantic import field_validator
+from pydantic import PrivateAttr, field_validator
 
 from bot.exts.filtering._filter_context import FilterContext
 from bot.exts.filtering._settings_types.settings_entry import ValidationEntry
@@ -16,6 +16,10 @@ class RoleBypass(ValidationEntry):
 
     bypass_roles: set[int | str]
 
+    # The bypass roles split into IDs and names, so that each lookup is a single set membership check.
+    _role_ids: frozenset[int] = PrivateAttr()
+    _role_names: frozenset[str] = PrivateAttr()
+
     @field_validator("bypass_roles", mode="before")
     @classmethod
     def init_if_bypass_roles_none(cls, bypass_roles: Sequence[int | str] | None) -> Sequence[int | str]:
@@ -35,11 +39,16 @@ class RoleBypass(ValidationEntry):
 
         return map(_coerce_to_int, bypass_roles)
 
+    def model_post_init(self, __context: object) -> None:
+        """Compile the bypass roles into sets of IDs and names."""
+        self._role_ids = frozenset(role for role in self.bypass_roles if isinstance(role, int))
+        self._role_names = frozenset(role for role in self.bypass_roles if isinstance(role, str))
+
     def triggers_on(self, ctx: FilterContext) -> bool:
         """Return whether the filter should be triggered on this user given their roles."""
-        if not isinstance(ctx.author, Member):
+        if not isinstance(ctx.author, Member) or not self.bypass_roles:
             return True
         return all(
-            member_role.id not in self.bypass_roles and member_role.name not in self.bypass_roles
+            member_role.id not in self._role_ids and member_role.name not in self._role_names
             for member_role in ctx.author.roles
         )
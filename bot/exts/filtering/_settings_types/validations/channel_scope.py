@@ -1,11 +1,29 @@
 from collections.abc import Sequence
 from typing import ClassVar
 
-from pydantic import field_validator
+from discord.abc import GuildChannel
+from pydantic import PrivateAttr, field_validator
 
 from bot.exts.filtering._filter_context import FilterContext
 from bot.exts.filtering._settings_types.settings_entry import ValidationEntry
 
+# Incremented whenever a channel or a category changes, which invalidates the verdicts memoized by each scope.
+_channels_version = 0
+
+
+def invalidate_channel_verdicts() -> None:
+    """Make every channel scope re-evaluate the channels it has already seen, for example after a channel moved."""
+    global _channels_version
+    _channels_version += 1
+
+
+def _split_ids_and_names(values: set[int | str]) -> tuple[frozenset[int], frozenset[str]]:
+    """Split the values into a frozenset of IDs and a frozenset of names."""
+    return (
+        frozenset(value for value in values if isinstance(value, int)),
+        frozenset(value for value in values if isinstance(value, str))
+    )
+
 
 class ChannelScope(ValidationEntry):
     """A setting entry which tells whether the filter was invoked in a whitelisted channel or category."""
@@ -35,6 +53,15 @@ class ChannelScope(ValidationEntry):
     enabled_channels: set[int | str]
     enabled_categories: set[int | str]
 
+    # The fields split into IDs and names, so that each lookup is a single set membership check.
+    _disabled_channels: tuple[frozenset[int], frozenset[str]] = PrivateAttr()
+    _disabled_categories: tuple[frozenset[int], frozenset[str]] = PrivateAttr()
+    _enabled_channels: tuple[frozenset[int], frozenset[str]] = PrivateAttr()
+    _enabled_categories: tuple[frozenset[int], frozenset[str]] = PrivateAttr()
+    # The verdicts for the channels seen so far, valid as long as no channel changed since.
+    _verdicts: dict[int, bool] = PrivateAttr(default_factory=dict)
+    _verdicts_version: int = PrivateAttr(default=0)
+
     @field_validator("*", mode="before")
     @classmethod
     def init_if_sequence_none(cls, sequence: Sequence[int | str] | None) -> Sequence[int | str]:
@@ -54,6 +81,13 @@ class ChannelScope(ValidationEntry):
 
         return map(_coerce_to_int, sequence)
 
+    def model_post_init(self, __context: object) -> None:
+        """Compile the fields into sets of IDs and names."""
+        self._disabled_channels = _split_ids_and_names(self.disabled_channels)
+        self._disabled_categories = _split_ids_and_names(self.disabled_categories)
+        self._enabled_channels = _split_ids_and_names(self.enabled_channels)
+        self._enabled_categories = _split_ids_and_names(self.enabled_categories)
+
     def triggers_on(self, ctx: FilterContext) -> bool:
         """
         Return whether the filter should be triggered in the given channel.
@@ -70,13 +104,27 @@ class ChannelScope(ValidationEntry):
         if hasattr(channel, "parent"):
             channel = channel.parent
 
-        enabled_channel = channel.id in self.enabled_channels or channel.name in self.enabled_channels
-        disabled_channel = channel.id in self.disabled_channels or channel.name in self.disabled_channels
-        enabled_category = channel.category and (not self.enabled_categories or (
-                channel.category.id in self.enabled_categories or channel.category.name in self.enabled_categories
-        ))
-        disabled_category = channel.category and (
-            channel.category.id in self.disabled_categories or channel.category.name in self.disabled_categories
+        if self._verdicts_version != _channels_version:
+            self._verdicts.clear()
+            self._verdicts_version = _channels_version
+        if channel.id not in self._verdicts:
+            self._verdicts[channel.id] = self._channel_verdict(channel)
+        return self._verdicts[channel.id]
+
+    def _channel_verdict(self, channel: GuildChannel) -> bool:
+        """Return whether the filter should be triggered in the given guild channel."""
+        category = channel.category
+        enabled_channel = _contains(self._enabled_channels, channel)
+        disabled_channel = _contains(self._disabled_channels, channel)
+        enabled_category = category and (
+            not self.enabled_categories or _contains(self._enabled_categories, category)
         )
+        disabled_category = category and _contains(self._disabled_categories, category)
+
+        return bool(enabled_channel or (enabled_category and not disabled_channel and not disabled_category))
+
 
-        return enabled_channel or (enabled_category and not disabled_channel and not disabled_category)
+def _contains(ids_and_names: tuple[frozenset[int], frozenset[str]], channel: GuildChannel) -> bool:
+    """Return whether the channel's ID or name is in the given sets."""
+    ids, names = ids_and_names
+    return channel.id in ids or channel.name in names
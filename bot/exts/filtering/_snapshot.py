@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+import os
+import typing
+from pathlib import Path
+from typing import Any
+
+import arrow
+
+from bot.log import get_logger
+
+if typing.TYPE_CHECKING:
+    from bot.exts.filtering._filter_lists.filter_list import AtomicList
+
+log = get_logger(__name__)
+
+# Increment when the format of the snapshot changes, so that snapshots in the old format are ignored.
+SNAPSHOT_VERSION = 1
+
+
+def read_snapshot(path: Path) -> list[dict[str, Any]] | None:
+    """
+    Return the raw filter lists stored in the snapshot, or None if there isn't a usable snapshot.
+
+    The lists are in the same format as the `bot/filter/filter_lists` API response.
+    """
+    try:
+        snapshot = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        log.exception(f"Failed to read the filter lists snapshot at {path}.")
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        log.info(f"Ignoring the filter lists snapshot at {path}, since it's in an outdated format.")
+        return None
+    return snapshot["filter_lists"]
+
+
+def write_snapshot(path: Path, raw_filter_lists: list[dict[str, Any]]) -> None:
+    """Store the raw filter lists in the snapshot, replacing it only once the new one is fully written."""
+    snapshot = {"version": SNAPSHOT_VERSION, "created_at": arrow.utcnow().isoformat(), "filter_lists": raw_filter_lists}
+    temp_path = path.with_name(f"{path.name}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_text(json.dumps(snapshot), encoding="utf-8")
+        os.replace(temp_path, path)
+    except OSError:
+        log.exception(f"Failed to write the filter lists snapshot to {path}.")
+
+
+def is_list_changed(raw_filter_list: dict[str, Any], loaded_list: AtomicList) -> bool:
+    """
+    Return whether the raw filter list differs from the loaded list, judging by the `updated_at` stamps.
+
+    The list's stamp doesn't change when only its filters do, so the filters' stamps are compared as well.
+    """
+    if arrow.get(raw_filter_list["updated_at"]) != loaded_list.updated_at:
+        return True
+    raw_stamps = {filter_data["id"]: arrow.get(filter_data["updated_at"]) for filter_data in raw_filter_list["filters"]}
+    loaded_stamps = {filter_id: filter_.updated_at for filter_id, filter_ in loaded_list.filters.items()}
+    return raw_stamps != loaded_stamps
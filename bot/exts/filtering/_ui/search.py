@@ -7,6 +7,7 @@ import discord
 from discord import Interaction, SelectOption
 from discord.ext.commands import BadArgument
 
+from bot.exts.filtering._filter_index import TEXT_FIELDS
 from bot.exts.filtering._filter_lists import FilterList, ListType
 from bot.exts.filtering._filters.filter import Filter
 from bot.exts.filtering._settings_types.settings_entry import SettingsEntry
@@ -49,6 +50,8 @@ def search_criteria_converter(
 
     filter_settings = {}
     for setting, _ in list(settings.items()):
+        if setting in TEXT_FIELDS:  # It's a text query, which is matched as is.
+            continue
         if setting in loaded_settings:  # It's a filter list setting
             type_ = loaded_settings[setting][2]
             try:
@@ -174,6 +177,7 @@ class SearchEditView(EditBaseView):
         populate_embed_from_dict(embed, settings_repr_dict)
 
         self.type_per_setting_name = {setting: info[2] for setting, info in loaded_settings.items()}
+        self.type_per_setting_name.update({field: str for field in TEXT_FIELDS})
         if filter_type:
             self.type_per_setting_name.update({
                 f"{filter_type.name}/{name}": type_
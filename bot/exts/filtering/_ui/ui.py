@@ -5,7 +5,7 @@ from abc import ABC, abstractmethod
 from collections.abc import Callable, Coroutine
 from enum import EnumMeta
 from functools import partial
-from typing import Any, TypeVar, get_origin
+from typing import Any, TYPE_CHECKING, TypeVar, get_origin
 
 import discord
 from discord import Embed, Interaction, Member, User
@@ -21,11 +21,14 @@ from pydis_core.utils.regex import DISCORD_INVITE
 import bot
 from bot.constants import Colours
 from bot.exts.filtering._filter_context import Event, FilterContext
-from bot.exts.filtering._filter_lists import FilterList
 from bot.exts.filtering._utils import FakeContext, normalize_type
 from bot.utils.lock import lock_arg
 from bot.utils.messages import format_channel, format_user, upload_log
 
+if TYPE_CHECKING:
+    # Only imported for type checking, since the filter lists import the alert view.
+    from bot.exts.filtering._filter_lists import FilterList
+
 log = get_logger(__name__)
 
 
@@ -588,13 +591,15 @@ class PhishHandlingButton(discord.ui.Button):
     If confirmed, comp-ban the offending user, and add the appropriate domain or invite as an auto-ban filter.
     """
 
-    def __init__(self, offender: User | Member | None, phishing_content: str, target_filter_list: FilterList):
+    def __init__(self, ctx: FilterContext, phishing_content: str, target_filter_list: FilterList):
         super().__init__(emoji="🎣")
-        self.offender = offender
+        self.ctx = ctx
+        self.offender = ctx.author
         self.phishing_content = phishing_content
         self.target_filter_list = target_filter_list
 
-    @lock_arg("phishing", "interaction", lambda interaction: interaction.message.id)
+    # The lock is keyed on the alert rather than the message, since a message can hold the alerts of several offenders.
+    @lock_arg("phishing", "self", lambda button: id(button.ctx))
     async def callback(self, interaction: Interaction) -> Any:
         """Ask for confirmation for handling the phish."""
         message_content = f"{interaction.user.mention} Is this a phishing attempt? "
@@ -624,7 +629,7 @@ class AlertView(discord.ui.View):
             return
         phishing_content, target_filter_list =  self._extract_potential_phish(triggered_filters)
         if phishing_content:
-            self.add_item(PhishHandlingButton(ctx.author, phishing_content, target_filter_list))
+            self.add_item(PhishHandlingButton(ctx, phishing_content, target_filter_list))
 
     @discord.ui.button(label="ID")
     async def user_id(self, interaction: Interaction, button: discord.ui.Button) -> None:
@@ -699,3 +704,17 @@ class AlertView(discord.ui.View):
         if encountered:
             return content, target_filter_list
         return "", None
+
+
+class CombinedAlertView(discord.ui.View):
+    """The alert views of several offenders, each taking its own row."""
+
+    def __init__(self, views: list[AlertView]):
+        super().__init__(timeout=ALERT_VIEW_TIMEOUT)
+        for row, view in enumerate(views):
+            # The ID button is labelled with the offender's name, to tell the rows apart.
+            view.user_id.label = f"ID: {view.ctx.author.name}"[:80]
+            for item in list(view.children):
+                view.remove_item(item)
+                item.row = row
+                self.add_item(item)
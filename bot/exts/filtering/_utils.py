@@ -4,15 +4,16 @@ import importlib
 import importlib.util
 import inspect
 import pkgutil
+import re
 import types
 import urllib.parse
 import warnings
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from functools import cache
-from typing import Any, Self, TypeVar, Union, get_args, get_origin
+from typing import Any, Generic, Self, TypeVar, Union, get_args, get_origin
 
 import discord
 import regex
@@ -27,6 +28,7 @@ from bot.constants import Guild
 VARIATION_SELECTORS = r"\uFE00-\uFE0F\U000E0100-\U000E01EF"
 INVISIBLE_RE = regex.compile(rf"[{VARIATION_SELECTORS}\p{{UNASSIGNED}}\p{{FORMAT}}\p{{CONTROL}}--\s]", regex.V1)
 ZALGO_RE = regex.compile(rf"[\p{{NONSPACING MARK}}\p{{ENCLOSING MARK}}--[{VARIATION_SELECTORS}]]", regex.V1)
+SPOILER_RE = re.compile(r"(\|\|.+?\|\|)", re.DOTALL)
 
 
 T = TypeVar("T")
@@ -68,6 +70,68 @@ def clean_input(string: str, *, keep_newlines: bool = False) -> str:
     return INVISIBLE_RE.sub("", content)
 
 
+def expand_spoilers(text: str) -> str:
+    """Return a string containing all interpretations of a spoilered message."""
+    split_text = SPOILER_RE.split(text)
+    return "".join(
+        split_text[0::2] + split_text[1::2] + split_text
+    )
+
+
+def changed_span(old: str, new: str) -> tuple[int, int, int]:
+    """
+    Return where the new string differs from the old one: the start of the difference, and its end in each string.
+
+    Everything before the start, and everything after the respective ends, is identical in both strings.
+    """
+    # Binary search over the slices, since comparing them is much faster than comparing one character at a time.
+    limit = min(len(old), len(new))
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[:mid] == new[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    prefix = low
+
+    low, high = 0, limit - prefix
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            low = mid
+        else:
+            high = mid - 1
+    return prefix, len(old) - low, len(new) - low
+
+
+class ScanHistory(Generic[T]):
+    """
+    The latest scan a filter list made of each recent message, so that only what changed is scanned after an edit.
+
+    The oldest scans are discarded once the history is full.
+    """
+
+    def __init__(self, size: int = 1000):  # The size of the filtering cog's message cache.
+        self.size = size
+        self._scans: OrderedDict[int, T] = OrderedDict()
+
+    def get(self, message_id: int) -> T | None:
+        """Return the latest scan of the message, if it's still remembered."""
+        return self._scans.get(message_id)
+
+    def set(self, message_id: int, scan: T) -> None:
+        """Remember the latest scan of the message."""
+        self._scans[message_id] = scan
+        self._scans.move_to_end(message_id)
+        if len(self._scans) > self.size:
+            self._scans.popitem(last=False)
+
+    def discard(self, message_id: int) -> None:
+        """Forget the scan of the message."""
+        self._scans.pop(message_id, None)
+
+
 def past_tense(word: str) -> str:
     """Return the past tense form of the input word."""
     if not word:
@@ -137,9 +201,8 @@ def repr_equals(override: Any, default: Any) -> bool:
     if override_is_sequence != default_is_sequence:  # One is a sequence and the other isn't.
         return False
     if override_is_sequence:
-        if len(override) != len(default):
-            return False
-        return all(str(item1) == str(item2) for item1, item2 in zip(set(override), set(default), strict=True))
+        # The items are compared regardless of their order.
+        return {str(item) for item in override} == {str(item) for item in default}
     return str(override) == str(default)
 
 
@@ -1,17 +1,22 @@
+import asyncio
+import codecs
 import datetime
 import io
 import json
 import re
+import time
 import unicodedata
-from collections import defaultdict
-from collections.abc import Iterable, Mapping
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable
 from functools import partial, reduce
 from io import BytesIO
 from operator import attrgetter
+from pathlib import Path
 from typing import Literal, get_type_hints
 
 import arrow
 import discord
+from aiohttp import ClientSession
 from async_rediscache import RedisCache
 from discord import Colour, Embed, HTTPException, Message, MessageType, Thread
 from discord.ext import commands, tasks
@@ -26,12 +31,20 @@ from bot import constants
 from bot.bot import Bot
 from bot.constants import BaseURLs, Channels, Guild, MODERATION_ROLES, Roles
 from bot.exts.backend.branding._repository import HEADERS, PARAMS
+from bot.exts.filtering._alerts import AlertDispatcher
+from bot.exts.filtering._auto_infraction_report import AutoInfractionReport, RecordedFilter, earliest_recorded
 from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering._filter_index import TEXT_FIELDS
 from bot.exts.filtering._filter_lists import FilterList, ListType, ListTypeConverter, filter_list_types
 from bot.exts.filtering._filter_lists.filter_list import AtomicList
+from bot.exts.filtering._filter_stats import FilterStats
 from bot.exts.filtering._filters.filter import Filter, UniqueFilter
+from bot.exts.filtering._message_features import MessageFeatures
+from bot.exts.filtering._offensive_messages import OffensiveMessageDeleter
 from bot.exts.filtering._settings import ActionSettings
 from bot.exts.filtering._settings_types.actions.infraction_and_notification import Infraction
+from bot.exts.filtering._settings_types.validations.channel_scope import invalidate_channel_verdicts
+from bot.exts.filtering._snapshot import is_list_changed, read_snapshot, write_snapshot
 from bot.exts.filtering._ui.filter import (
     build_filter_repr_dict,
     description_and_settings_converter,
@@ -64,15 +77,55 @@ CACHE_SIZE = 1000
 HOURS_BETWEEN_NICKNAME_ALERTS = 1
 OFFENSIVE_MSG_DELETE_TIME = datetime.timedelta(days=7)
 WEEKLY_REPORT_ISO_DAY = 3  # 1=Monday, 7=Sunday
+SNAPSHOT_PATH = Path(constants.Filtering.snapshot_path)
 
+MAX_ATTACHMENT_LINES = 30
+MAX_ATTACHMENT_CHARS = 2_000
+# The most bytes the excerpt of a text attachment can take: 4 bytes per character in the widest encodings, including a
+# byte order mark and the carriage returns of the line breaks.
+MAX_ATTACHMENT_BYTES = (MAX_ATTACHMENT_CHARS + MAX_ATTACHMENT_LINES + 1) * 4
+ATTACHMENT_CHUNK_SIZE = 4096
 
-async def _extract_text_file_content(att: discord.Attachment) -> str:
-    """Extract up to the first 30 lines or first 2000 characters (whichever is shorter) of an attachment."""
+
+def _text_file_excerpt(text: str) -> tuple[str, bool]:
+    """
+    Return up to the first 30 lines or first 2000 characters (whichever is shorter) of the text.
+
+    Additionally return whether the excerpt is final, meaning it wouldn't change if more text were appended.
+    """
+    lines = text.splitlines()
+    excerpt = "\n".join(lines[:MAX_ATTACHMENT_LINES])[:MAX_ATTACHMENT_CHARS]
+    return excerpt, len(lines) > MAX_ATTACHMENT_LINES or len(excerpt) >= MAX_ATTACHMENT_CHARS
+
+
+async def _extract_text_file_content(att: discord.Attachment, session: ClientSession, max_bytes: int) -> str:
+    """
+    Extract up to the first 30 lines or first 2000 characters (whichever is shorter) of an attachment.
+
+    Only the start of the file is requested, and it's read until the excerpt is complete, or `max_bytes` were read.
+    Bytes which can't be decoded are replaced, rather than failing the extraction.
+    """
     file_encoding = re.search(r"charset=(\S+)", att.content_type).group(1)
-    file_content_bytes = await att.read()
-    file_lines = file_content_bytes.decode(file_encoding).splitlines()
-    first_n_lines = "\n".join(file_lines[:30])[:2_000]
-    return f"{att.filename}: {first_n_lines}"
+    try:
+        decoder = codecs.getincrementaldecoder(file_encoding)(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    text = ""
+    if max_bytes > 0:
+        headers = {"Range": f"bytes=0-{max_bytes - 1}"}
+        async with session.get(att.url, headers=headers, raise_for_status=True) as response:
+            received = 0
+            async for chunk in response.content.iter_chunked(ATTACHMENT_CHUNK_SIZE):
+                # The server might ignore the range and send the entire file.
+                chunk = chunk[:max_bytes - received]
+                received += len(chunk)
+                text += decoder.decode(chunk)
+                if received >= max_bytes or _text_file_excerpt(text)[1]:
+                    break
+
+    excerpt, _ = _text_file_excerpt(text)
+    return f"{att.filename}: {excerpt}"
 
 
 class Filtering(Cog):
@@ -83,6 +136,8 @@ class Filtering(Cog):
 
     # Redis cache mapping a user ID to the last timestamp a bad nickname alert was sent.
     name_alerts = RedisCache()
+    # Redis cache mapping the IDs of recently added or edited auto-infraction filters to when they last were.
+    auto_infraction_filters = RedisCache()
 
     # region: init
 
@@ -90,38 +145,112 @@ class Filtering(Cog):
         self.bot = bot
         self.filter_lists: dict[str, FilterList] = {}
         self._subscriptions = defaultdict[Event, list[FilterList]](list)
-        self.delete_scheduler = scheduling.Scheduler(self.__class__.__name__)
+        self.offensive_message_deleter = OffensiveMessageDeleter(bot)
         self.webhook: discord.Webhook | None = None
+        self.alert_dispatcher = AlertDispatcher(self.bot.stats, constants.Filtering.alert_batch_delay)
+        self.auto_infraction_report = AutoInfractionReport(self.auto_infraction_filters)
 
         self.loaded_settings = {}
         self.loaded_filters = {}
         self.loaded_filter_settings = {}
 
-        self.message_cache = MessageCache(CACHE_SIZE, newest_first=True)
+        self.message_cache = MessageCache(
+            CACHE_SIZE,
+            newest_first=True,
+            feature_extractor=MessageFeatures.from_message,
+            compact=constants.Filtering.message_cache_compact
+        )
+        self.filter_stats = FilterStats(self.bot.stats, constants.Filtering.stats_sample_rate)
+        self._reconcile_task: asyncio.Task | None = None
+        # Display names which didn't trigger any filter, keyed along with anything else the verdict depends on.
+        self._clean_names: OrderedDict[tuple, None] = OrderedDict()
 
     async def cog_load(self) -> None:
         """
-        Fetch the filter data from the API, parse it, and load it to the appropriate data structures.
+        Load the filter lists, and fetch the alerting webhook.
 
-        Additionally, fetch the alerting webhook.
+        If there's a local snapshot of the filter lists, it's loaded first so that filtering can start right away, and
+        then reconciled with the API in the background. Otherwise, the filter data is fetched from the API.
         """
+        start = time.perf_counter()
         await self.bot.wait_until_guild_available()
 
-        log.trace("Loading filtering information from the database.")
-        raw_filter_lists = await self.bot.api_client.get("bot/filter/filter_lists")
+        raw_filter_lists = read_snapshot(SNAPSHOT_PATH)
+        from_snapshot = raw_filter_lists is not None
+        if from_snapshot:
+            log.trace("Loading filtering information from the local snapshot.")
+        else:
+            log.trace("Loading filtering information from the database.")
+            raw_filter_lists = await self.bot.api_client.get("bot/filter/filter_lists")
+            write_snapshot(SNAPSHOT_PATH, raw_filter_lists)
+
         example_list = None
+        loaded_lists = []
         for raw_filter_list in raw_filter_lists:
             loaded_list = self._load_raw_filter_list(raw_filter_list)
+            if loaded_list:
+                loaded_lists.append(loaded_list)
             if not example_list and loaded_list:
                 example_list = loaded_list
 
+        self.collect_loaded_types(example_list)
+        elapsed = time.perf_counter() - start
+        log.info(f"Loaded the filter lists from the {'snapshot' if from_snapshot else 'API'} in {elapsed:.2f} seconds.")
+        self.bot.stats.timing(f"filters.startup.{'snapshot' if from_snapshot else 'api'}", elapsed * 1000)
+        if from_snapshot:
+            self._reconcile_task = scheduling.create_task(self._reconcile_filter_lists())
+
         # The webhook must be generated by the bot to send messages with components through it.
         self.webhook = await self._fetch_or_generate_filtering_webhook()
+        self.alert_dispatcher.webhook = self.webhook
+        self.alert_dispatcher.start()
 
-        self.collect_loaded_types(example_list)
         await self.schedule_offending_messages_deletion()
+        # The lists in the snapshot were already recorded when they were fetched from the API.
+        await self._record_recent_auto_infraction_filters([] if from_snapshot else loaded_lists)
         self.weekly_auto_infraction_report_task.start()
 
+    async def _reconcile_filter_lists(self) -> None:
+        """Fetch the filter lists from the API, and rebuild the loaded lists which changed since the snapshot."""
+        delay = 1
+        while True:
+            try:
+                raw_filter_lists = await self.bot.api_client.get("bot/filter/filter_lists")
+                break
+            except Exception:
+                log.warning(f"Failed to fetch the filter lists for reconciliation, retrying in {delay} seconds.")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 300)
+
+        start = time.perf_counter()
+        fetched = set()
+        rebuilt_lists = []
+        removed_lists = []
+        for raw_filter_list in raw_filter_lists:
+            list_type = ListType(raw_filter_list["list_type"])
+            fetched.add((raw_filter_list["name"], list_type))
+            loaded_list = self.filter_lists.get(raw_filter_list["name"], {}).get(list_type)
+            if loaded_list and not is_list_changed(raw_filter_list, loaded_list):
+                continue
+            if rebuilt_list := self._load_raw_filter_list(raw_filter_list):
+                rebuilt_lists.append(rebuilt_list)
+
+        # Unload the lists which were deleted since the snapshot was taken.
+        for filter_list in list(self.filter_lists.values()):
+            for list_type in list(filter_list):
+                if (filter_list.name, list_type) not in fetched:
+                    removed_lists.append(filter_list.pop(list_type))
+            if not filter_list:
+                self.filter_lists.pop(filter_list.name)
+                self.unsubscribe(filter_list)
+
+        write_snapshot(SNAPSHOT_PATH, raw_filter_lists)
+        elapsed = time.perf_counter() - start
+        rebuilt = len(rebuilt_lists) + len(removed_lists)
+        log.info(f"Reconciled the filter lists with the API in {elapsed:.2f} seconds, {rebuilt} lists changed.")
+        self.bot.stats.timing("filters.startup.reconcile", elapsed * 1000)
+        await self._record_recent_auto_infraction_filters(rebuilt_lists, removed_lists)
+
     def subscribe(self, filter_list: FilterList, *events: Event) -> None:
         """
         Subscribe a filter list to the given events.
@@ -201,16 +330,12 @@ class Filtering(Cog):
             }
 
     async def schedule_offending_messages_deletion(self) -> None:
-        """Load the messages that need to be scheduled for deletion from the database."""
+        """Load the messages that need to be scheduled for deletion from the database, and start deleting them."""
         response = await self.bot.api_client.get("bot/offensive-messages")
 
-        now = arrow.utcnow()
         for msg in response:
-            delete_at = arrow.get(msg["delete_date"])
-            if delete_at < now:
-                await self._delete_offensive_msg(msg)
-            else:
-                self._schedule_msg_delete(msg)
+            self.offensive_message_deleter.schedule(msg)
+        self.offensive_message_deleter.start()
 
     async def cog_check(self, ctx: Context) -> bool:
         """Only allow moderators to invoke the commands in this cog."""
@@ -233,16 +358,12 @@ class Filtering(Cog):
 
         ctx = FilterContext.from_message(Event.MESSAGE, msg, None, self.message_cache)
 
-        text_contents = [
-            await _extract_text_file_content(a)
-            for a in msg.attachments if "charset" in a.content_type
-        ]
-
+        text_contents = await self._extract_attachments_content(msg.attachments)
         if text_contents:
             attachment_content = "\n\n".join(text_contents)
             ctx = ctx.replace(content=f"{ctx.content}\n\n{attachment_content}")
 
-        result_actions, list_messages, triggers = await self._resolve_action(ctx)
+        result_actions, list_messages, triggers = await self._resolve_action(ctx, short_circuit=True)
         self.message_cache.update(msg, metadata=triggers)
         if result_actions:
             await result_actions.action(ctx)
@@ -256,6 +377,35 @@ class Filtering(Cog):
         await self._maybe_schedule_msg_delete(ctx, result_actions)
         self._increment_stats(triggers)
 
+    async def _extract_attachments_content(self, attachments: list[discord.Attachment]) -> list[str]:
+        """
+        Extract the start of each text attachment, downloading them concurrently.
+
+        The attachments share a budget of bytes to download, allocated in order. Attachments which can't be
+        downloaded are left out.
+        """
+        text_attachments = []
+        reads = []
+        budget = constants.Filtering.attachment_read_budget
+        for attachment in attachments:
+            if not attachment.content_type or "charset" not in attachment.content_type:
+                continue
+            if budget <= 0:
+                break
+            max_bytes = min(MAX_ATTACHMENT_BYTES, budget, attachment.size)
+            budget -= max_bytes
+            text_attachments.append(attachment)
+            reads.append(_extract_text_file_content(attachment, self.bot.http_session, max_bytes))
+
+        text_contents = []
+        results = await asyncio.gather(*reads, return_exceptions=True)
+        for attachment, result in zip(text_attachments, results, strict=True):
+            if isinstance(result, Exception):
+                log.warning(f"Failed to read the attachment {attachment.filename} ({attachment.url}) for filtering.")
+                continue
+            text_contents.append(result)
+        return text_contents
+
     @Cog.listener()
     async def on_message_edit(self, before: discord.Message, after: discord.Message) -> None:
         """Filter the contents of an edited message. Don't reinvoke filters already invoked on the `before` version."""
@@ -282,6 +432,12 @@ class Filtering(Cog):
         await self._maybe_schedule_msg_delete(ctx, result_actions)
         self._increment_stats(triggers)
 
+    @Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel) -> None:
+        """Channel scopes memoize their verdict for each channel, which changes if a channel is moved or renamed."""
+        if before.name != after.name or before.category_id != after.category_id:
+            invalidate_channel_verdicts()
+
     @Cog.listener()
     async def on_voice_state_update(self, member: discord.Member, *_) -> None:
         """Checks for bad words in usernames when users join, switch or leave a voice channel."""
@@ -597,7 +753,8 @@ class Filtering(Cog):
             """The actual removal routine."""
             await bot.instance.api_client.delete(f"bot/filter/filters/{filter_id}")
             log.info(f"Successfully deleted filter with ID {filter_id}.")
-            filter_list[list_type].filters.pop(filter_id)
+            filter_list.remove_filter(list_type, filter_id)
+            await self.auto_infraction_report.forget(filter_id)
             await ctx.reply(f"✅ Deleted filter: {filter_}")
 
         result = self._get_filter_by_id(filter_id)
@@ -639,6 +796,42 @@ class Filtering(Cog):
             embed.set_author(name=f"Description of the {setting_name} setting")
             await ctx.send(embed=embed)
 
+    @filter.command(name="stats")
+    async def f_stats(self, ctx: Context, count: int = 10) -> None:
+        """
+        Show the filters which took the longest to evaluate, and the filters which were triggered most often.
+
+        Only a sample of the events is measured, so the numbers are relative rather than totals.
+        """
+        stats = self.filter_stats
+        if not stats.sampled_events:
+            if stats.sample_rate <= 0:
+                await ctx.send(":x: Filter evaluation stats are disabled.")
+            else:
+                await ctx.send(":x: No events have been sampled yet.")
+            return
+
+        lines = ["**Slowest filters**"]
+        for filter_id, filter_stats in stats.slowest(count):
+            lines.append(
+                f"#{filter_id} {filter_stats.label} - {filter_stats.total_time * 1000:.2f} ms total, "
+                f"{filter_stats.mean_time * 1_000_000:.1f} µs mean over {filter_stats.calls} calls"
+            )
+        lines.extend(["", "**Noisiest filters**"])
+        for filter_id, filter_stats in stats.noisiest(count):
+            lines.append(f"#{filter_id} {filter_stats.label} - {filter_stats.hits} hits in {filter_stats.calls} calls")
+        lines.extend(["", "**Filter lists**"])
+        for list_stats in sorted(stats.lists.values(), key=attrgetter("total_time"), reverse=True):
+            lines.append(
+                f"{list_stats.label} - {list_stats.total_time * 1000:.2f} ms total, "
+                f"{list_stats.mean_time * 1000:.3f} ms mean, {list_stats.hits} hits in {list_stats.calls} calls"
+            )
+
+        embed = Embed(colour=Colour.blue())
+        embed.set_author(name="Filter evaluation stats")
+        embed.set_footer(text=f"Sampled {stats.sampled_events} events at a rate of {stats.sample_rate:.2%}.")
+        await LinePaginator.paginate(lines, ctx, embed, max_lines=2 * count + 5, empty=False)
+
     @filter.command(name="match")
     async def f_match(
         self, ctx: Context, no_user: bool | None, message: Message | None, *, string: str | None
@@ -686,6 +879,10 @@ class Filtering(Cog):
 
         If a list type and/or a list name are provided, the search will be limited to those parameters. A list name must
         be provided in order to search by filter-specific settings.
+
+        Filters can also be searched by their `content` and `description`, case-insensitively. Add a `*` at the end of
+        the text to find filters starting with it, at the start to find filters ending with it, or at both ends to find
+        filters containing it. For example: `content=*discord*`.
         """
         filter_type = None
         if filter_type_name:
@@ -883,7 +1080,7 @@ class Filtering(Cog):
             file = discord.File(BytesIO(json.dumps(list_data, indent=4).encode("utf-8")), f"{list_description}.json")
             message = await ctx.send("⏳ Annihilation in progress, please hold...", file=file)
             # Unload the filter list.
-            filter_list.pop(list_type)
+            await self._record_recent_auto_infraction_filters([], [filter_list.pop(list_type)])
             if not filter_list:  # There's nothing left, remove from the cog.
                 self.filter_lists.pop(filter_list.name)
                 self.unsubscribe(filter_list)
@@ -956,19 +1153,61 @@ class Filtering(Cog):
             return None
 
     async def _resolve_action(
-        self, ctx: FilterContext
+        self, ctx: FilterContext, *, short_circuit: bool = False
     ) -> tuple[ActionSettings | None, dict[FilterList, list[str]], dict[AtomicList, list[Filter]]]:
         """
         Return the actions that should be taken for all filter lists in the given context.
 
         Additionally, a message is possibly provided from each filter list describing the triggers,
         which should be relayed to the moderators.
+
+        Filter lists which don't make network requests are evaluated first, one after the other. The lists which do are
+        then evaluated concurrently, each on a fork of the context which is merged back in subscription order, so the
+        result doesn't depend on which list finished first.
+        This means the changes lists make to the context (such as `filter_info` and `additional_actions`) are made in
+        subscription order among the lists which don't make network requests, and then among the ones that do, rather
+        than in subscription order across all lists.
+
+        If `short_circuit` is True and the message is already going to be deleted, the network bound lists which
+        couldn't add anything to the actions already found are skipped.
         """
+        if self.filter_stats.sample():
+            ctx.filter_stats = self.filter_stats
+        subscribed = self._subscriptions[ctx.event]
+        results = {}
+        for filter_list in subscribed:
+            if not filter_list.io_bound:
+                results[filter_list] = await self._evaluate_list(filter_list, ctx)
+
+        io_lists = [filter_list for filter_list in subscribed if filter_list.io_bound]
+        if io_lists and short_circuit and self._removes_context(results.values()):
+            current_actions = reduce(ActionSettings.union, (result[0] for result in results.values() if result[0]))
+            io_lists = [filter_list for filter_list in io_lists if self._could_add_to(current_actions, filter_list)]
+        if io_lists:
+            forks = [ctx.fork() for _ in io_lists]
+            io_results = await asyncio.gather(*(
+                asyncio.wait_for(self._evaluate_list(filter_list, fork), constants.Filtering.list_evaluation_timeout)
+                for filter_list, fork in zip(io_lists, forks, strict=True)
+            ), return_exceptions=True)
+            for filter_list, fork, result in zip(io_lists, forks, io_results, strict=True):
+                if isinstance(result, TimeoutError):
+                    log.warning(f"Evaluating the {filter_list.name} filter list timed out.")
+                    bot.instance.stats.incr(f"filters.timeouts.{filter_list.name}")
+                    continue
+                if isinstance(result, BaseException):
+                    # Such as the evaluation being cancelled, which isn't caught along with the other errors.
+                    log.error(f"Failed to evaluate the {filter_list.name} filter list.", exc_info=result)
+                    continue
+                ctx.merge(fork)
+                results[filter_list] = result
+
         actions = []
         messages = {}
         triggers = {}
-        for filter_list in self._subscriptions[ctx.event]:
-            list_actions, list_message, list_triggers = await filter_list.actions_for(ctx)
+        for filter_list in subscribed:
+            if filter_list not in results:
+                continue
+            list_actions, list_message, list_triggers = results[filter_list]
             triggers.update({filter_list[list_type]: filters for list_type, filters in list_triggers.items()})
             if list_actions:
                 actions.append(list_actions)
@@ -981,17 +1220,60 @@ class Filtering(Cog):
 
         return result_actions, messages, triggers
 
+    @staticmethod
+    async def _evaluate_list(
+        filter_list: FilterList, ctx: FilterContext
+    ) -> tuple[ActionSettings | None, list[str], dict[ListType, list[Filter]]]:
+        """Return the result of the filter list for the context. An error in one list shouldn't prevent the others."""
+        start = time.perf_counter()
+        try:
+            result = await filter_list.actions_for(ctx)
+        except Exception:
+            log.exception(f"Failed to evaluate the {filter_list.name} filter list.")
+            return None, [], {}
+
+        if ctx.filter_stats:
+            ctx.filter_stats.record_list(filter_list.name, time.perf_counter() - start, any(result[2].values()))
+        return result
+
+    @staticmethod
+    def _removes_context(results: Iterable[tuple[ActionSettings | None, list[str], dict]]) -> bool:
+        """Return whether any of the filter list results already requires removing the context."""
+        for list_actions, _, _ in results:
+            remove_context = list_actions and list_actions.get("remove_context")
+            if remove_context and remove_context.remove_context:
+                return True
+        return False
+
+    @staticmethod
+    def _could_add_to(actions: ActionSettings, filter_list: FilterList) -> bool:
+        """
+        Return whether the filter list could add anything to the given actions if it were triggered.
+
+        That's the case if any of its possible actions is missing or more significant, such as a more severe infraction
+        or other pings. A list which could send an alert always could, since its triggers would be described in it.
+        """
+        possible_actions = filter_list.possible_actions()
+        if not possible_actions:
+            return False
+        send_alert = possible_actions.get("send_alert")
+        if send_alert and send_alert.send_alert:
+            return True
+        merged_actions = actions.union(possible_actions)
+        return any(
+            name not in actions or entry.model_dump() != actions[name].model_dump()
+            for name, entry in merged_actions.items()
+        )
+
     async def _send_alert(self, ctx: FilterContext, triggered_filters: dict[FilterList, Iterable[str]]) -> None:
-        """Build an alert message from the filter context, and send it via the alert webhook."""
+        """Build an alert message from the filter context, and queue it to be sent via the alert webhook."""
         if not self.webhook:
             return
 
         name = f"{ctx.event.name.replace('_', ' ').title()} Filter"
         embed = await build_mod_alert(ctx, triggered_filters)
         # There shouldn't be more than 10, but if there are it's not very useful to send them all.
-        await self.webhook.send(
-            username=name, content=ctx.alert_content, embeds=[embed, *ctx.alert_embeds][:10], view=AlertView(ctx)
-        )
+        self.alert_dispatcher.put(name, ctx.alert_content, [embed, *ctx.alert_embeds], AlertView(ctx))
 
     def _increment_stats(self, triggered_filters: dict[AtomicList, list[Filter]]) -> None:
         """Increment the stats for every filter triggered."""
@@ -1010,18 +1292,49 @@ class Filtering(Cog):
 
         return False
 
+    def _name_verdict_key(self, ctx: FilterContext) -> tuple:
+        """
+        Return the key of the verdict on the display name in the context.
+
+        Besides the name itself, the verdict depends on the author's roles (which can bypass filters), on the channel
+        the name was seen in (which filters may be enabled or disabled in), and on the state of the lists filtering
+        names.
+        """
+        roles = frozenset(role.id for role in getattr(ctx.author, "roles", ()))
+        channel = None
+        if ctx.channel:
+            parent = getattr(ctx.channel, "parent", None)
+            category = getattr(ctx.channel, "category", None)
+            channel = (ctx.channel.id, parent and parent.id, category and category.id, ctx.in_guild)
+        versions = tuple((filter_list.name, filter_list.version) for filter_list in self._subscriptions[ctx.event])
+        return ctx.content, roles, channel, versions
+
     @lock_arg("filtering.check_bad_name", "ctx", attrgetter("author.id"))
     async def _check_bad_display_name(self, ctx: FilterContext) -> None:
         """Check filter triggers in the passed context - a member's display name."""
+        key = self._name_verdict_key(ctx)
+        if key in self._clean_names:
+            self._clean_names.move_to_end(key)
+            return
         if await self._recently_alerted_name(ctx.author):
             return
-        new_ctx = await self._check_bad_name(ctx)
+        new_ctx, triggers = await self._check_bad_name(ctx)
         if new_ctx.send_alert:
             # Update time when alert sent
             await self.name_alerts.set(ctx.author.id, arrow.utcnow().timestamp())
+        elif not any(triggers.values()):
+            self._clean_names[key] = None
+            if len(self._clean_names) > constants.Filtering.name_cache_size:
+                self._clean_names.popitem(last=False)
+
+    async def _check_bad_name(
+        self, ctx: FilterContext
+    ) -> tuple[FilterContext, dict[AtomicList, list[Filter]]]:
+        """
+        Check filter triggers for some given name (thread name, a member's display name).
 
-    async def _check_bad_name(self, ctx: FilterContext) -> FilterContext:
-        """Check filter triggers for some given name (thread name, a member's display name)."""
+        Return the context after filtering, and the triggered filters.
+        """
         name = ctx.content
         normalised_name = unicodedata.normalize("NFKC", name)
         cleaned_normalised_name = "".join([c for c in normalised_name if not unicodedata.combining(c)])
@@ -1038,7 +1351,7 @@ class Filtering(Cog):
         if new_ctx.send_alert:
             await self._send_alert(new_ctx, list_messages)
         self._increment_stats(triggers)
-        return new_ctx
+        return new_ctx, triggers
 
     async def _resolve_list_type_and_name(
         self, ctx: Context, list_type: ListType | None = None, list_name: str | None = None, *, exclude: str = ""
@@ -1185,19 +1498,35 @@ class Filtering(Cog):
         return msg
 
     @staticmethod
+    def _auto_infraction_type(atomic_list: AtomicList, filter_: Filter) -> Infraction:
+        """Return the type of infraction the filter applies, taking the list's default if it doesn't override it."""
+        return filter_.overrides[0].get("infraction_type") or atomic_list.default("infraction_type")
+
+    @classmethod
+    def _auto_infraction_record(cls, atomic_list: AtomicList, filter_: Filter) -> RecordedFilter | None:
+        """Return what the weekly report shows of the filter, or None if it doesn't apply an auto-infraction."""
+        infraction_type = cls._auto_infraction_type(atomic_list, filter_)
+        if infraction_type == Infraction.NONE:
+            return None
+        changed_at = max(filter_.created_at, filter_.updated_at)
+        return RecordedFilter(changed_at.timestamp(), atomic_list.label, str(filter_), str(infraction_type))
+
     async def _maybe_alert_auto_infraction(
-        filter_list: FilterList, list_type: ListType, filter_: Filter, old_filter: Filter | None = None
+        self, filter_list: FilterList, list_type: ListType, filter_: Filter, old_filter: Filter | None = None
     ) -> None:
-        """If the filter is new and applies an auto-infraction, or was edited to apply a different one, log it."""
-        infraction_type = filter_.overrides[0].get("infraction_type")
-        if not infraction_type:
-            infraction_type = filter_list[list_type].default("infraction_type")
-        if old_filter:
-            old_infraction_type = old_filter.overrides[0].get("infraction_type")
-            if not old_infraction_type:
-                old_infraction_type = filter_list[list_type].default("infraction_type")
-            if infraction_type == old_infraction_type:
-                return
+        """
+        If the filter is new and applies an auto-infraction, or was edited to apply a different one, log it.
+
+        Any new or edited filter which applies an auto-infraction is also recorded for the weekly report, and an edited
+        filter which no longer does is forgotten.
+        """
+        infraction_type = self._auto_infraction_type(filter_list[list_type], filter_)
+        if record := self._auto_infraction_record(filter_list[list_type], filter_):
+            await self.auto_infraction_report.record(filter_.id, record)
+        elif old_filter:
+            await self.auto_infraction_report.forget(filter_.id)
+        if old_filter and infraction_type == self._auto_infraction_type(filter_list[list_type], old_filter):
+            return
 
         if infraction_type != Infraction.NONE:
             filter_log = bot.instance.get_channel(Channels.filter_log)
@@ -1299,16 +1628,17 @@ class Filtering(Cog):
         self._load_raw_filter_list(response)
         await msg.reply(f"✅ Added a new filter list: {filterlist_name}")
 
-    @staticmethod
-    async def _patch_filter_list(msg: Message, filter_list: FilterList, list_type: ListType, settings: dict) -> None:
+    async def _patch_filter_list(
+        self, msg: Message, filter_list: FilterList, list_type: ListType, settings: dict
+    ) -> None:
         """PATCH the new data of the filter list to the site API."""
         list_id = filter_list[list_type].id
         response = await bot.instance.api_client.patch(
             f"bot/filter/filter_lists/{list_id}", json=to_serializable(settings)
         )
-        log.info(f"Successfully patched the {filter_list[list_type].label} filterlist, reloading...")
-        filter_list.pop(list_type, None)
-        filter_list.add_list(response)
+        log.info(f"Successfully patched the {filter_list[list_type].label} filterlist, updating...")
+        # The list's default infraction might have changed.
+        await self._record_recent_auto_infraction_filters([filter_list.update_list(response)])
         await msg.reply(f"✅ Edited filter list: {filter_list[list_type].label}")
 
     def _filter_match_query(
@@ -1332,9 +1662,14 @@ class Filtering(Cog):
         return (filter_settings | filter_settings_query) == filter_settings
 
     def _search_filter_list(
-        self, atomic_list: AtomicList, filter_type: type[Filter] | None, settings: dict, filter_settings: dict
+        self,
+        atomic_list: AtomicList,
+        filter_type: type[Filter] | None,
+        settings: dict,
+        filter_settings: dict,
+        text_query: dict[str, str]
     ) -> list[Filter]:
-        """Find all filters in the filter list which match the settings."""
+        """Find all filters in the filter list which match the settings and the text query."""
         # If the default answers are known, only the overrides need to be checked for each filter.
         all_defaults = atomic_list.defaults.dict()
         match_by_default = set()
@@ -1345,8 +1680,20 @@ class Filtering(Cog):
             else:
                 differ_by_default.add(setting_name)
 
+        # Narrow down the filters using the index, and then check the candidates fully.
+        filters = atomic_list.filters
+        candidate_sets = [
+            *(filters.with_setting(setting_name, settings[setting_name]) for setting_name in differ_by_default),
+            *(filters.with_filter_setting(name, value) for name, value in filter_settings.items()),
+            *(filters.search_text(field, query) for field, query in text_query.items()),
+        ]
+        if candidate_sets:
+            candidates = [filters[id_] for id_ in sorted(set.intersection(*sorted(candidate_sets, key=len)))]
+        else:
+            candidates = filters.values()
+
         result_filters = []
-        for filter_ in atomic_list.filters.values():
+        for filter_ in candidates:
             if filter_type and not isinstance(filter_, filter_type):
                 continue
             if self._filter_match_query(filter_, settings, filter_settings, differ_by_default):
@@ -1358,13 +1705,17 @@ class Filtering(Cog):
         self, message: Message, filter_type: type[Filter] | None, settings: dict, filter_settings: dict
     ) -> None:
         """Find all filters which match the settings and display them."""
+        text_query = {field: settings[field] for field in TEXT_FIELDS if field in settings}
+        settings = {setting: value for setting, value in settings.items() if setting not in TEXT_FIELDS}
         lines = []
         result_count = 0
         for filter_list in self.filter_lists.values():
             if filter_type and filter_type not in filter_list.filter_types:
                 continue
             for atomic_list in filter_list.values():
-                list_results = self._search_filter_list(atomic_list, filter_type, settings, filter_settings)
+                list_results = self._search_filter_list(
+                    atomic_list, filter_type, settings, filter_settings, text_query
+                )
                 if list_results:
                     lines.append(f"**{atomic_list.label.title()}**")
                     lines.extend(map(str, list_results))
@@ -1376,29 +1727,6 @@ class Filtering(Cog):
         ctx = await bot.instance.get_context(message)
         await LinePaginator.paginate(lines, ctx, embed, max_lines=15, empty=False, reply=True)
 
-    async def _delete_offensive_msg(self, msg: Mapping[str, int]) -> None:
-        """Delete an offensive message, and then delete it from the DB."""
-        try:
-            channel = self.bot.get_channel(msg["channel_id"])
-            if channel:
-                msg_obj = await channel.fetch_message(msg["id"])
-                await msg_obj.delete()
-        except discord.NotFound:
-            log.info(
-                f"Tried to delete message {msg['id']}, but the message can't be found "
-                f"(it has been probably already deleted)."
-            )
-        except HTTPException as e:
-            log.warning(f"Failed to delete message {msg['id']}: status {e.status}")
-
-        await self.bot.api_client.delete(f'bot/offensive-messages/{msg["id"]}')
-        log.info(f"Deleted the offensive message with id {msg['id']}.")
-
-    def _schedule_msg_delete(self, msg: dict) -> None:
-        """Delete an offensive message once its deletion date is reached."""
-        delete_at = arrow.get(msg["delete_date"]).datetime
-        self.delete_scheduler.schedule_at(delete_at, msg["id"], self._delete_offensive_msg(msg))
-
     async def _maybe_schedule_msg_delete(self, ctx: FilterContext, actions: ActionSettings | None) -> None:
         """Post the message to the database and schedule it for deletion if it's not set to be deleted already."""
         msg = ctx.message
@@ -1420,7 +1748,7 @@ class Filtering(Cog):
             else:
                 log.error(f"Offensive message {msg.id} failed to post: {e}")
         else:
-            self._schedule_msg_delete(data)
+            self.offensive_message_deleter.schedule(data)
             log.trace(f"Offensive message {msg.id} will be deleted on {delete_date}")
 
     # endregion
@@ -1434,6 +1762,27 @@ class Filtering(Cog):
 
         await self.send_weekly_auto_infraction_report()
 
+    async def _record_recent_auto_infraction_filters(
+        self, atomic_lists: Iterable[AtomicList], removed_lists: Iterable[AtomicList] = ()
+    ) -> None:
+        """
+        Replace the weekly report's records of the given lists with their recently changed auto-infraction filters.
+
+        Filters are recorded as they're added or edited through the bot, but they may also be changed directly in the
+        site while the bot is offline, so the lists are recorded again whenever they're loaded from the API. Only the
+        lists which were loaded are gone over. The records of the removed lists are forgotten.
+        """
+        earliest = earliest_recorded(arrow.utcnow())
+        records = {removed_list.label: {} for removed_list in removed_lists}
+        for atomic_list in atomic_lists:
+            records[atomic_list.label] = {
+                filter_.id: record
+                for filter_ in atomic_list.filters.values()
+                if max(filter_.created_at, filter_.updated_at) >= earliest
+                and (record := self._auto_infraction_record(atomic_list, filter_))
+            }
+        await self.auto_infraction_report.sync_lists(records)
+
     async def send_weekly_auto_infraction_report(
         self,
         channel: discord.TextChannel | discord.Thread | None = None,
@@ -1454,28 +1803,26 @@ class Filtering(Cog):
             return
 
         found_filters = defaultdict(list)
-        # Extract all auto-infraction filters added in the past 7 days from each filter type
-        for filter_list in self.filter_lists.values():
-            for sublist in filter_list.values():
-                default_infraction_type = sublist.default("infraction_type")
-                for filter_ in sublist.filters.values():
-                    if max(filter_.created_at, filter_.updated_at) < seven_days_ago:
-                        continue
-                    infraction_type = filter_.overrides[0].get("infraction_type")
-                    if (
-                        (infraction_type and infraction_type != Infraction.NONE)
-                        or (not infraction_type and default_infraction_type != Infraction.NONE)
-                    ):
-                        found_filters[sublist.label].append((filter_, infraction_type or default_infraction_type))
+        recorded = await self.auto_infraction_report.records_since(seven_days_ago)
+        for record in sorted(recorded.values(), key=attrgetter("changed_at")):
+            found_filters[record.list_label].append(record)
 
         # Nicely format the output so each filter list type is grouped
         lines = [f"**Auto-infraction filters added since {seven_days_ago.format('YYYY-MM-DD')}**"]
-        for list_label, filters in found_filters.items():
-            lines.append("\n".join([f"**{list_label.title()}**"]+[f"{filter_} ({infr})" for filter_, infr in filters]))
+        for list_label, records in found_filters.items():
+            lines.append("\n".join(
+                [f"**{list_label.title()}**"] + [f"{record.filter_text} ({record.infraction})" for record in records]
+            ))
 
         if len(lines) == 1:
             lines.append("Nothing to show")
 
+        weekly_counts = await self.auto_infraction_report.weekly_counts()
+        lines.append(
+            "**Auto-infraction filters added or edited per week**\n"
+            + "\n".join(f"{week}: {count}" for week, count in weekly_counts)
+        )
+
         report = "\n\n".join(lines)
         try:
             await channel.send(report)
@@ -1503,9 +1850,12 @@ class Filtering(Cog):
     # endregion
 
     async def cog_unload(self) -> None:
-        """Cancel the weekly auto-infraction filter report and deletion scheduling on cog unload."""
+        """Cancel the weekly auto-infraction report, deletion scheduling, reconciliation, and alerting on cog unload."""
         self.weekly_auto_infraction_report_task.cancel()
-        self.delete_scheduler.cancel_all()
+        self.alert_dispatcher.stop()
+        self.offensive_message_deleter.stop()
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
 
 
 async def setup(bot: Bot) -> None:
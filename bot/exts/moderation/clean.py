@@ -1,4 +1,4 @@
-import contextlib
+import asyncio
 import itertools
 import re
 import time
@@ -6,10 +6,10 @@ from collections import defaultdict
 from collections.abc import Callable, Iterable
 from contextlib import suppress
 from datetime import datetime
-from itertools import takewhile
 from typing import Literal, TYPE_CHECKING
 
 from discord import Colour, Message, NotFound, TextChannel, Thread, User, errors
+from discord.abc import Messageable
 from discord.ext.commands import Cog, Context, Converter, Greedy, command, group, has_any_role
 from discord.ext.commands.converter import TextChannelConverter
 from discord.ext.commands.errors import BadArgument
@@ -27,6 +27,10 @@ log = get_logger(__name__)
 
 # Number of seconds before command invocations and responses are deleted in non-moderation channels.
 MESSAGE_DELETE_DELAY = 5
+# Minimum number of seconds between updates to the progress of searching channel histories.
+PROGRESS_UPDATE_INTERVAL = 5
+# The maximum number of messages which can be deleted in bulk at once.
+BULK_DELETE_LIMIT = 100
 
 # Type alias for checks for whether a message should be deleted.
 Predicate = Callable[[Message], bool]
@@ -34,6 +38,46 @@ Predicate = Callable[[Message], bool]
 CleanLimit = Message | Age | ISODateTime
 
 
+class CollectionProgress:
+    """Reports the progress of searching channel histories for messages to clean, in a message which is kept updated."""
+
+    def __init__(self, channel: Messageable, total_channels: int):
+        self.channel = channel
+        self.total_channels = total_channels
+        self.searched_channels = 0
+        self.found_messages = 0
+
+        self._message: Message | None = None
+        self._last_update = 0.0
+
+    async def channel_searched(self, found_messages: int) -> None:
+        """Count another channel as searched, and update the progress message if it wasn't updated recently."""
+        self.searched_channels += 1
+        self.found_messages += found_messages
+
+        now = time.monotonic()
+        if now - self._last_update < PROGRESS_UPDATE_INTERVAL or self.searched_channels == self.total_channels:
+            return
+        self._last_update = now
+        content = (
+            f":hourglass: Searched {self.searched_channels}/{self.total_channels} channels, "
+            f"found {self.found_messages} messages to clean."
+        )
+        try:
+            if self._message:
+                await self._message.edit(content=content)
+            else:
+                self._message = await self.channel.send(content)
+        except errors.HTTPException:
+            log.info("Couldn't update the progress of the clean.", exc_info=True)
+
+    async def finish(self) -> None:
+        """Delete the progress message, if one was sent."""
+        if self._message:
+            with suppress(errors.HTTPException):
+                await self._message.delete()
+
+
 class CleanChannels(Converter):
     """A converter to turn the string into a list of channels to clean, or the literal `*` for all public channels."""
 
@@ -79,6 +123,8 @@ class Clean(Cog):
     def __init__(self, bot: Bot):
         self.bot = bot
         self.cleaning = False
+        self._history_searches: list[asyncio.Task] = []
+        self._individual_deletes = asyncio.Semaphore(CleanMessages.delete_concurrency)
 
     @property
     def mod_log(self) -> ModLog:
@@ -219,26 +265,46 @@ class Clean(Cog):
 
     def _use_cache(self, limit: datetime) -> bool:
         """Tell whether all messages to be cleaned can be found in the cache."""
-        return self.bot.cached_messages[0].created_at <= limit
+        return self.bot.message_index.covers(limit)
 
     def _get_messages_from_cache(
         self,
         channels: set[TextChannel],
         to_delete: Predicate,
-        lower_limit: datetime
+        lower_limit: datetime,
+        users: list[User] | None = None
     ) -> tuple[defaultdict[TextChannel, list], list[int]]:
-        """Helper function for getting messages from the cache."""
+        """
+        Helper function for getting messages from the cache.
+
+        If specific users are cleaned, only their messages are looked up. Otherwise, only the messages of the channels.
+        """
         message_mappings = defaultdict(list)
         message_ids = []
-        for message in takewhile(lambda m: m.created_at > lower_limit, reversed(self.bot.cached_messages)):
+        if users:
+            channel_ids = {channel.id for channel in channels}
+            candidates = itertools.chain.from_iterable(
+                self.bot.message_index.author_messages(user.id, after=lower_limit) for user in users
+            )
+        else:
+            channel_ids = None
+            candidates = itertools.chain.from_iterable(
+                self.bot.message_index.channel_messages(channel.id, after=lower_limit) for channel in channels
+            )
+
+        for message in candidates:
             if not self.cleaning:
                 # Cleaning was canceled
                 return message_mappings, message_ids
 
-            if message.channel in channels and to_delete(message):
+            if (channel_ids is None or message.channel.id in channel_ids) and to_delete(message):
                 message_mappings[message.channel].append(message)
                 message_ids.append(message.id)
 
+        if users:
+            # The messages of each channel are expected from the newest, but they were found per user.
+            for messages in message_mappings.values():
+                messages.sort(key=lambda message: message.id, reverse=True)
         return message_mappings, message_ids
 
     async def _get_messages_from_channels(
@@ -246,27 +312,63 @@ class Clean(Cog):
         channels: Iterable[TextChannel],
         to_delete: Predicate,
         after: datetime,
-        before: datetime | None = None
+        before: datetime | None = None,
+        progress: CollectionProgress | None = None,
+        found_batches: asyncio.Queue | None = None
     ) -> tuple[defaultdict[TextChannel, list], list]:
         """
         Collect the messages for deletion by iterating over the histories of the appropriate channels.
 
+        Up to `CleanMessages.history_concurrency` channels are searched at a time. Each channel's history is a separate
+        rate limit bucket, which discord.py waits on as needed, so searching channels concurrently doesn't run into the
+        rate limits of the others. The messages found in each channel are added once its search is done.
+
+        If `found_batches` is given, the messages found in each channel are also put in it as soon as there are enough
+        for a bulk deletion, so that they can be deleted while the search goes on.
+
         The clean cog enforces an upper limit on message age through `_validate_input`.
         """
         message_mappings = defaultdict(list)
         message_ids = []
+        semaphore = asyncio.Semaphore(CleanMessages.history_concurrency)
 
-        for channel in channels:
-            async for message in channel.history(limit=CleanMessages.message_limit, before=before, after=after):
-
+        async def search_channel(channel: TextChannel) -> None:
+            async with semaphore:
                 if not self.cleaning:
-                    # Cleaning was canceled, return empty containers.
-                    return defaultdict(list), []
+                    return
+                found = []
+                async for message in channel.history(limit=CleanMessages.message_limit, before=before, after=after):
+                    if not self.cleaning:
+                        return
+                    if to_delete(message):
+                        found.append(message)
+                        if found_batches is not None and len(found) % BULK_DELETE_LIMIT == 0:
+                            found_batches.put_nowait((channel, found[-BULK_DELETE_LIMIT:]))
+                if found_batches is not None and len(found) % BULK_DELETE_LIMIT:
+                    found_batches.put_nowait((channel, found[-(len(found) % BULK_DELETE_LIMIT):]))
+
+            for message in found:
+                message_mappings[message.channel].append(message)
+                message_ids.append(message.id)
+            if progress:
+                await progress.channel_searched(len(found))
 
-                if to_delete(message):
-                    message_mappings[message.channel].append(message)
-                    message_ids.append(message.id)
+        self._history_searches = [asyncio.create_task(search_channel(channel)) for channel in channels]
+        try:
+            await asyncio.gather(*self._history_searches)
+        except asyncio.CancelledError:
+            # The searches are cancelled along with the cleaning, unless it's this task which is being cancelled.
+            if asyncio.current_task().cancelling():
+                raise
+        finally:
+            # Stop the rest of the searches if one of them failed.
+            for search in self._history_searches:
+                search.cancel()
+            self._history_searches = []
 
+        if not self.cleaning:
+            # Cleaning was canceled, return empty containers.
+            return defaultdict(list), []
         return message_mappings, message_ids
 
     @staticmethod
@@ -282,63 +384,127 @@ class Clean(Cog):
         return message.id < two_weeks_old_snowflake
 
     async def _delete_messages_individually(self, messages: list[Message]) -> list[Message]:
-        """Delete each message in the list unless cleaning is cancelled. Return the deleted messages."""
-        deleted = []
-        for message in messages:
-            # Ensure that deletion was not canceled
-            if not self.cleaning:
-                return deleted
-            with contextlib.suppress(NotFound):  # Message doesn't exist or was already deleted
-                await message.delete()
-                deleted.append(message)
-        return deleted
+        """
+        Delete each message in the list unless cleaning is cancelled. Return the deleted messages.
 
-    async def _delete_found(self, message_mappings: dict[TextChannel, list[Message]]) -> list[Message]:
+        Up to `CleanMessages.delete_concurrency` messages are deleted at a time, across all the channels being cleaned.
         """
-        Delete the detected messages.
+        async def delete(message: Message) -> bool:
+            async with self._individual_deletes:
+                # Ensure that deletion was not canceled
+                if not self.cleaning:
+                    return False
+                try:
+                    await message.delete()
+                except NotFound:  # Message doesn't exist or was already deleted
+                    return False
+                return True
 
-        Deletion is made in bulk per channel for messages less than 14d old.
-        The function returns the deleted messages.
-        If cleaning was cancelled in the middle, return messages already deleted.
+        results = await asyncio.gather(*(delete(message) for message in messages))
+        return [message for message, deleted in zip(messages, results, strict=True) if deleted]
+
+    async def _delete_batch(self, channel: TextChannel, messages: list[Message]) -> list[Message]:
         """
-        deleted = []
-        for channel, messages in message_mappings.items():
-            to_delete = []
+        Delete a batch of up to 100 messages from the channel, and return the deleted messages.
 
-            delete_old = False
-            for current_index, message in enumerate(messages):  # noqa: B007
-                if not self.cleaning:
-                    # Means that the cleaning was canceled
-                    return deleted
+        Messages less than 14d old are deleted in bulk, and the rest individually.
+        """
+        if not self.cleaning:
+            return []
+        self.mod_log.ignore(Event.message_delete, *(message.id for message in messages))
 
-                if self.is_older_than_14d(message):
-                    # Further messages are too old to be deleted in bulk
-                    delete_old = True
-                    break
+        deleted = []
+        recent = [message for message in messages if not self.is_older_than_14d(message)]
+        if recent:
+            with suppress(NotFound):
+                await channel.delete_messages(recent)
+            deleted.extend(recent)
+
+        old = [message for message in messages if self.is_older_than_14d(message)]
+        if old and self.cleaning:
+            deleted.extend(await self._delete_messages_individually(old))
+        return deleted
 
-                to_delete.append(message)
+    async def _delete_found(self, found_batches: asyncio.Queue, deleted: list[Message] | None = None) -> list[Message]:
+        """
+        Delete the batches of messages put in the queue as they're found, until it's given None.
 
-                if len(to_delete) == 100:
-                    # Only up to 100 messages can be deleted in a bulk
-                    await channel.delete_messages(to_delete)
-                    deleted.extend(to_delete)
-                    to_delete.clear()
+        Each batch is a channel and up to 100 of its messages. A channel's batches are deleted in order by a worker of
+        its own, so the requests for a channel are sent one after the other within its rate limit bucket, while several
+        channels are cleaned at once.
+        The function returns the deleted messages, from the oldest.
+        If cleaning was cancelled in the middle, return messages already deleted.
+        If a `deleted` list is given, the messages are also added to it as they're deleted, so that they're known even
+        if deleting the rest fails.
+        """
+        if deleted is None:
+            deleted = []
+        channel_batches: dict[TextChannel, asyncio.Queue] = {}
+        workers = []
 
-            if not self.cleaning:
-                return deleted
-            if len(to_delete) > 0:
-                # Deleting any leftover messages if there are any
-                with suppress(NotFound):
-                    await channel.delete_messages(to_delete)
-                deleted.extend(to_delete)
+        async def delete_channel_batches(channel: TextChannel, batches: asyncio.Queue) -> None:
+            while (batch := await batches.get()) is not None:
+                deleted.extend(await self._delete_batch(channel, batch))
 
-            if not self.cleaning:
-                return deleted
-            if delete_old:
-                old_deleted = await self._delete_messages_individually(messages[current_index:])
-                deleted.extend(old_deleted)
+        try:
+            while (found := await found_batches.get()) is not None:
+                channel, batch = found
+                if channel not in channel_batches:
+                    channel_batches[channel] = asyncio.Queue()
+                    workers.append(asyncio.create_task(delete_channel_batches(channel, channel_batches[channel])))
+                channel_batches[channel].put_nowait(batch)
+
+            for batches in channel_batches.values():
+                batches.put_nowait(None)
+            await asyncio.gather(*workers)
+        finally:
+            # Stop the rest of the deletions if one of them failed.
+            for worker in workers:
+                worker.cancel()
+
+        return sorted(deleted, key=lambda message: message.id)
+
+    async def _find_messages(
+        self,
+        ctx: Context,
+        channels: set[TextChannel],
+        to_delete: Predicate,
+        first_limit: datetime | None,
+        second_limit: datetime | None,
+        users: list[User] | None,
+        found_batches: asyncio.Queue
+    ) -> None:
+        """Put the messages to delete in the queue in batches per channel, as they're found, and then None."""
+        try:
+            if self._use_cache(first_limit):
+                log.trace(f"Messages for cleaning by {ctx.author.id} will be searched in the cache.")
+                message_mappings, _ = self._get_messages_from_cache(
+                    channels=channels, to_delete=to_delete, lower_limit=first_limit, users=users
+                )
+                for channel, messages in message_mappings.items():
+                    for start in range(0, len(messages), BULK_DELETE_LIMIT):
+                        found_batches.put_nowait((channel, messages[start:start + BULK_DELETE_LIMIT]))
+                return
 
-        return deleted
+            log.trace(f"Messages for cleaning by {ctx.author.id} will be searched in channel histories.")
+            # The progress message isn't posted in a channel being cleaned, where it could be found for deletion.
+            progress = None
+            if len(channels) > 1 and ctx.channel not in channels:
+                progress = CollectionProgress(ctx.channel, len(channels))
+            try:
+                await self._get_messages_from_channels(
+                    channels=channels,
+                    to_delete=to_delete,
+                    after=first_limit,  # Remember first is the earlier datetime (the "older" time).
+                    before=second_limit,
+                    progress=progress,
+                    found_batches=found_batches
+                )
+            finally:
+                if progress:
+                    await progress.finish()
+        finally:
+            found_batches.put_nowait(None)
 
     async def _modlog_cleaned_messages(
         self,
@@ -420,29 +586,32 @@ class Clean(Cog):
             # Delete the invocation first
             await self._delete_invocation(ctx)
 
-        if self._use_cache(first_limit):
-            log.trace(f"Messages for cleaning by {ctx.author.id} will be searched in the cache.")
-            message_mappings, message_ids = self._get_messages_from_cache(
-                channels=deletion_channels, to_delete=predicate, lower_limit=first_limit
-            )
-        else:
-            log.trace(f"Messages for cleaning by {ctx.author.id} will be searched in channel histories.")
-            message_mappings, message_ids = await self._get_messages_from_channels(
-                channels=deletion_channels,
-                to_delete=predicate,
-                after=first_limit,  # Remember first is the earlier datetime (the "older" time).
-                before=second_limit
-            )
-
-        if not self.cleaning:
-            # Means that the cleaning was canceled
+        # The messages are deleted in batches while the rest are still being searched for.
+        found_batches = asyncio.Queue()
+        search = asyncio.create_task(self._find_messages(
+            ctx, deletion_channels, predicate, first_limit, second_limit, users, found_batches
+        ))
+        deleted_messages = []
+        try:
+            try:
+                deleted_messages = await self._delete_found(found_batches, deleted_messages)
+            except BaseException:
+                search.cancel()
+                raise
+            await search
+        except BaseException:
+            if deleted_messages:
+                # Whatever was deleted before the failure is still logged, before the error propagates.
+                deleted_messages.sort(key=lambda message: message.id)
+                await self._modlog_cleaned_messages(deleted_messages, channels or deletion_channels, ctx)
+            raise
+        finally:
+            cancelled = not self.cleaning
+            self.cleaning = False
+        if cancelled and not deleted_messages:
+            # Means that the cleaning was canceled before anything was deleted
             return None
 
-        # Now let's delete the actual messages with purge.
-        self.mod_log.ignore(Event.message_delete, *message_ids)
-        deleted_messages = await self._delete_found(message_mappings)
-        self.cleaning = False
-
         if not channels:
             channels = deletion_channels
         log_url = await self._modlog_cleaned_messages(deleted_messages, channels, ctx)
@@ -631,6 +800,9 @@ class Clean(Cog):
             message = ":question: There's no cleaning going on."
         else:
             self.cleaning = False
+            # Stop waiting on the requests for the channel histories.
+            for search in self._history_searches:
+                search.cancel()
             message = f"{Emojis.check_mark} Clean interrupted."
 
         await self._send_expiring_message(ctx, message)
@@ -1,4 +1,3 @@
-import asyncio
 import difflib
 import itertools
 from datetime import UTC, datetime
@@ -41,8 +40,6 @@ class ModLog(Cog, name="ModLog"):
         self.bot = bot
         self._ignored = {event: [] for event in Event}
 
-        self._cached_edits = []
-
     def ignore(self, event: Event, *items: int) -> None:
         """Add event to ignored events to suppress log emission."""
         for item in items:
@@ -630,8 +627,6 @@ class ModLog(Cog, name="ModLog"):
         if self.is_message_blacklisted(msg_before):
             return
 
-        self._cached_edits.append(msg_before.id)
-
         if msg_before.content == msg_after.content:
             return
 
@@ -706,6 +701,9 @@ class ModLog(Cog, name="ModLog"):
         """Log raw message edit event to message change log."""
         if event.guild_id is None:
             return  # ignore DM edits
+        if event.message_id in self.bot.message_index:
+            # The message is cached, so the edit is logged by `on_message_edit`.
+            return
 
         await self.bot.wait_until_guild_available()
         try:
@@ -717,13 +715,6 @@ class ModLog(Cog, name="ModLog"):
         if self.is_message_blacklisted(message):
             return
 
-        await asyncio.sleep(1)  # Wait here in case the normal event was fired
-
-        if event.message_id in self._cached_edits:
-            # It was in the cache and the normal event was fired, so we can just ignore it
-            self._cached_edits.remove(event.message_id)
-            return
-
         channel = message.channel
         channel_name = f"{channel.category}/#{channel.name}" if channel.category else f"#{channel.name}"
 
@@ -1,7 +1,101 @@
+from __future__ import annotations
+
+import bisect
 import typing as t
+from collections import deque
+from dataclasses import dataclass
+from datetime import UTC, datetime
 from math import ceil
 
-from discord import Message
+from discord import Message, MessageType, NotFound, PartialMessage
+
+if t.TYPE_CHECKING:
+    from arrow import Arrow
+
+    from bot.bot import Bot
+
+
+@dataclass(frozen=True, slots=True)
+class MessageSnapshot:
+    """
+    A compact record of the parts of a message which are read from the cache.
+
+    Unlike a `discord.Message`, it doesn't keep references to the author, channel, embeds, attachments or reactions,
+    so caching it holds on to a fraction of the memory. The full message can be resolved again with `resolve` or `fetch`
+    when it's needed, such as to delete it.
+
+    The mentions are kept in full, along with the author of the message replied to, so that filtering the mentions of
+    cached messages doesn't need the full messages.
+    """
+
+    id: int
+    author_id: int
+    channel_id: int
+    # The times the message was created and last edited at, as POSIX timestamps.
+    timestamp: float
+    edited_timestamp: float | None
+    content: str
+    attachment_count: int
+    embed_count: int
+    mention_ids: tuple[int, ...]
+    role_mention_ids: tuple[int, ...] = ()
+    mention_everyone: bool = False
+    # None if the message isn't a reply, or if the message replied to wasn't available when the snapshot was taken.
+    reply_author_id: int | None = None
+
+    @classmethod
+    def from_message(cls, message: Message) -> MessageSnapshot:
+        """Take a snapshot of the given message."""
+        reply_author_id = None
+        if message.type == MessageType.reply and message.reference:
+            replied_to = message.reference.resolved
+            if isinstance(replied_to, Message):
+                reply_author_id = replied_to.author.id
+        return cls(
+            message.id,
+            message.author.id,
+            message.channel.id,
+            message.created_at.timestamp(),
+            message.edited_at.timestamp() if message.edited_at else None,
+            message.content,
+            len(message.attachments),
+            len(message.embeds),
+            tuple(user.id for user in message.mentions),
+            tuple(role.id for role in message.role_mentions),
+            message.mention_everyone,
+            reply_author_id,
+        )
+
+    @property
+    def created_at(self) -> datetime:
+        """The time the message was created at."""
+        return datetime.fromtimestamp(self.timestamp, UTC)
+
+    def resolve(self, bot: Bot) -> Message | PartialMessage | None:
+        """
+        Return the full message if the bot still has it cached, or a partial message otherwise.
+
+        A partial message is enough to delete the message. None is returned if the channel of the message isn't cached.
+        """
+        if message := bot.message_index.get(self.id):
+            return message
+        if channel := bot.get_channel(self.channel_id):
+            return channel.get_partial_message(self.id)
+        return None
+
+    async def fetch(self, bot: Bot) -> Message | None:
+        """Return the full message, fetching it if the bot doesn't have it cached, or None if it can't be found."""
+        message = self.resolve(bot)
+        if isinstance(message, PartialMessage):
+            try:
+                message = await message.fetch()
+            except NotFound:
+                return None
+        return message
+
+
+# A cached message, which is a snapshot of it if the cache is compact.
+CachedMessage = Message | MessageSnapshot
 
 
 class MessageCache:
@@ -15,6 +109,18 @@ class MessageCache:
     The object additionally holds a mapping from Discord message ID's to the index in which the corresponding message
     is stored, to allow for constant time lookup by message ID.
 
+    If a `feature_extractor` is provided, it's called once for each message as it's added or updated, and its result
+    is stored alongside the message, so that consumers needing derived data don't have to recompute it every time.
+
+    If `compact` is True, a `MessageSnapshot` of each message is cached instead of the message itself, and returned
+    wherever the message would be. The feature extractor still receives the full message.
+
+    The IDs of the cached messages are also indexed by their author, in the same order as the cache. Since messages are
+    only ever added or removed at the edges of the cache, the per-author queues are updated in constant time as well.
+
+    The creation times of the cached messages are kept in a parallel array, as POSIX timestamps. Assuming messages are
+    cached in the order they were created, the messages created after a given time are found with a binary search.
+
     The cache has a size limit operating the same as with a collections.deque, and most of its method names mirror those
     of a deque.
 
@@ -22,70 +128,127 @@ class MessageCache:
     only as many elements as were inserted (meaning, without any pre-allocated placeholder values).
     """
 
-    def __init__(self, maxlen: int, *, newest_first: bool = False):
+    def __init__(
+        self,
+        maxlen: int,
+        *,
+        newest_first: bool = False,
+        feature_extractor: t.Callable[[Message], t.Any] | None = None,
+        compact: bool = False
+    ):
         if maxlen <= 0:
             raise ValueError("maxlen must be positive")
         self.maxlen = maxlen
         self.newest_first = newest_first
+        self.feature_extractor = feature_extractor
+        self.compact = compact
 
         self._start = 0
         self._end = 0
 
-        self._messages: list[Message | None] = [None] * self.maxlen
+        self._messages: list[CachedMessage | None] = [None] * self.maxlen
+        self._timestamps: list[float] = [0.0] * self.maxlen
         self._message_id_mapping = {}
         self._message_metadata = {}
+        self._message_features = {}
+        self._author_index: dict[int, deque[int]] = {}
 
     def append(self, message: Message, *, metadata: dict | None = None) -> None:
         """Add the received message to the cache, depending on the order of messages defined by `newest_first`."""
+        features = self.feature_extractor(message) if self.feature_extractor else None
+        if self.compact:
+            message = MessageSnapshot.from_message(message)
+
         if self.newest_first:
             self._appendleft(message)
         else:
             self._appendright(message)
         self._message_metadata[message.id] = metadata
+        if self.feature_extractor:
+            self._message_features[message.id] = features
 
-    def _appendright(self, message: Message) -> None:
+    def _appendright(self, message: CachedMessage) -> None:
         """Add the received message to the end of the cache."""
         if self._is_full():
+            self._remove_from_author_index(self._messages[self._start], left=True)
             del self._message_id_mapping[self._messages[self._start].id]
             del self._message_metadata[self._messages[self._start].id]
+            self._message_features.pop(self._messages[self._start].id, None)
             self._start = (self._start + 1) % self.maxlen
 
         self._messages[self._end] = message
+        self._timestamps[self._end] = self._timestamp(message)
         self._message_id_mapping[message.id] = self._end
+        self._add_to_author_index(message, left=False)
         self._end = (self._end + 1) % self.maxlen
 
-    def _appendleft(self, message: Message) -> None:
+    def _appendleft(self, message: CachedMessage) -> None:
         """Add the received message to the beginning of the cache."""
         if self._is_full():
             self._end = (self._end - 1) % self.maxlen
+            self._remove_from_author_index(self._messages[self._end], left=False)
             del self._message_id_mapping[self._messages[self._end].id]
             del self._message_metadata[self._messages[self._end].id]
+            self._message_features.pop(self._messages[self._end].id, None)
 
         self._start = (self._start - 1) % self.maxlen
         self._messages[self._start] = message
+        self._timestamps[self._start] = self._timestamp(message)
         self._message_id_mapping[message.id] = self._start
+        self._add_to_author_index(message, left=True)
+
+    def _timestamp(self, message: CachedMessage) -> float:
+        """Return the time the cached message was created at, as a POSIX timestamp."""
+        return message.timestamp if self.compact else message.created_at.timestamp()
 
-    def pop(self) -> Message:
+    def _author_id(self, message: CachedMessage) -> int:
+        """Return the ID of the author of the cached message."""
+        return message.author_id if self.compact else message.author.id
+
+    def _add_to_author_index(self, message: CachedMessage, *, left: bool) -> None:
+        """Add the message to the queue of its author, at the beginning if `left` is True or the end otherwise."""
+        message_ids = self._author_index.setdefault(self._author_id(message), deque())
+        if left:
+            message_ids.appendleft(message.id)
+        else:
+            message_ids.append(message.id)
+
+    def _remove_from_author_index(self, message: CachedMessage, *, left: bool) -> None:
+        """Remove the message from the queue of its author, where it's at the beginning if `left` is True or the end."""
+        author_id = self._author_id(message)
+        message_ids = self._author_index[author_id]
+        if left:
+            message_ids.popleft()
+        else:
+            message_ids.pop()
+        if not message_ids:
+            del self._author_index[author_id]
+
+    def pop(self) -> CachedMessage:
         """Remove the last message in the cache and return it."""
         if self._is_empty():
             raise IndexError("pop from an empty cache")
 
         self._end = (self._end - 1) % self.maxlen
         message = self._messages[self._end]
+        self._remove_from_author_index(message, left=False)
         del self._message_id_mapping[message.id]
         del self._message_metadata[message.id]
+        self._message_features.pop(message.id, None)
         self._messages[self._end] = None
 
         return message
 
-    def popleft(self) -> Message:
+    def popleft(self) -> CachedMessage:
         """Return the first message in the cache and return it."""
         if self._is_empty():
             raise IndexError("pop from an empty cache")
 
         message = self._messages[self._start]
+        self._remove_from_author_index(message, left=True)
         del self._message_id_mapping[message.id]
         del self._message_metadata[message.id]
+        self._message_features.pop(message.id, None)
         self._messages[self._start] = None
         self._start = (self._start + 1) % self.maxlen
 
@@ -94,21 +257,82 @@ class MessageCache:
     def clear(self) -> None:
         """Remove all messages from the cache."""
         self._messages = [None] * self.maxlen
+        self._timestamps = [0.0] * self.maxlen
         self._message_id_mapping = {}
         self._message_metadata = {}
+        self._message_features = {}
+        self._author_index = {}
 
         self._start = 0
         self._end = 0
 
-    def get_message(self, message_id: int) -> Message | None:
+    def get_message(self, message_id: int) -> CachedMessage | None:
         """Return the message that has the given message ID, if it is cached."""
         index = self._message_id_mapping.get(message_id, None)
         return self._messages[index] if index is not None else None
 
+    def get_author_messages(self, author_id: int, *, after: datetime | Arrow | None = None) -> list[CachedMessage]:
+        """
+        Return the cached messages sent by the author with the given ID, in the order they appear in the cache.
+
+        If `after` is provided, only messages created after that time are returned, as found by `since`.
+        """
+        if after is not None:
+            return list(self.since(after, author_id=author_id))
+
+        message_ids = self._author_index.get(author_id, ())
+        return [self._messages[self._message_id_mapping[message_id]] for message_id in message_ids]
+
+    def since(self, time: datetime | Arrow | float, *, author_id: int | None = None) -> t.Iterator[CachedMessage]:
+        """
+        Return an iterator over the cached messages created after the given time, in the order of the cache.
+
+        The time can be given as a datetime, an Arrow, or a POSIX timestamp. If `author_id` is given, only the messages
+        of that author are returned, going over just the author's messages. This assumes messages are cached in the
+        order they were created, so the first or last message which is too old is found with a binary search, and the
+        messages aren't copied. The cache shouldn't be changed while iterating.
+        """
+        if not isinstance(time, int | float):
+            time = time.timestamp()
+
+        if author_id is None:
+            length = len(self)
+
+            def index_at(i: int) -> int:
+                return (i + self._start) % self.maxlen
+        else:
+            message_ids = self._author_index.get(author_id, ())
+            length = len(message_ids)
+
+            def index_at(i: int) -> int:
+                return self._message_id_mapping[message_ids[i]]
+
+        def timestamp_at(i: int) -> float:
+            return self._timestamps[index_at(i)]
+
+        if self.newest_first:
+            # The newest messages are at the beginning, so the ones created after the time are a prefix of the cache.
+            start = 0
+            stop = bisect.bisect_left(range(length), -time, key=lambda i: -timestamp_at(i))
+        else:
+            start = bisect.bisect_right(range(length), time, key=timestamp_at)
+            stop = length
+
+        return (self._messages[index_at(i)] for i in range(start, stop))
+
+    def get_message_timestamp(self, message_id: int) -> float | None:
+        """Return the time the message that has the given message ID was created at as a timestamp, if it is cached."""
+        index = self._message_id_mapping.get(message_id, None)
+        return self._timestamps[index] if index is not None else None
+
     def get_message_metadata(self, message_id: int) -> dict | None:
         """Return the metadata of the message that has the given message ID, if it is cached."""
         return self._message_metadata.get(message_id, None)
 
+    def get_message_features(self, message_id: int) -> t.Any | None:
+        """Return the extracted features of the message that has the given message ID, if it is cached."""
+        return self._message_features.get(message_id, None)
+
     def update(self, message: Message, *, metadata: dict | None = None) -> bool:
         """
         Update a cached message with new contents.
@@ -118,7 +342,18 @@ class MessageCache:
         index = self._message_id_mapping.get(message.id, None)
         if index is None:
             return False
-        self._messages[index] = message
+        cached = self._messages[index]
+        if self.compact:
+            # A snapshot is taken of each version of the message, so it's told apart by when it was last edited.
+            is_new_version = cached.edited_timestamp != (message.edited_at.timestamp() if message.edited_at else None)
+            if is_new_version:
+                self._messages[index] = MessageSnapshot.from_message(message)
+        else:
+            is_new_version = message is not cached
+            self._messages[index] = message
+        # The features only need to be extracted again if this is a new version of the message.
+        if self.feature_extractor and is_new_version:
+            self._message_features[message.id] = self.feature_extractor(message)
         if metadata is not None:
             self._message_metadata[message.id] = metadata
         return True
@@ -127,7 +362,7 @@ class MessageCache:
         """Return True if the cache contains a message with the given ID ."""
         return message_id in self._message_id_mapping
 
-    def __getitem__(self, item: int | slice) -> Message | list[Message]:
+    def __getitem__(self, item: int | slice) -> CachedMessage | list[CachedMessage]:
         """
         Return the message(s) in the index or slice provided.
 
@@ -181,7 +416,7 @@ class MessageCache:
 
         raise TypeError(f"cache indices must be integers or slices, not {type(item)}")
 
-    def __iter__(self) -> t.Iterator[Message]:
+    def __iter__(self) -> t.Iterator[CachedMessage]:
         if self._is_empty():
             return
 
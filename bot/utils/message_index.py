@@ -0,0 +1,97 @@
+import typing as t
+from datetime import datetime
+
+from discord import Message
+
+
+class MessageIndex:
+    """
+    An index of the recent messages the bot received, shared by the cogs which look them up.
+
+    The messages are kept in the order they were received, which is assumed to be the order they were created in, up to
+    a maximum number of messages after which the oldest ones are dropped. Deleted messages are removed from the index.
+    Given the same limit, it holds the same message objects as discord.py's message cache, so the memory of the messages
+    themselves is only paid once.
+
+    The messages are also indexed by their channel and by their author, in the same order, so that the recent messages
+    of a channel or an author are found without going over any other messages.
+    """
+
+    def __init__(self, maxlen: int):
+        if maxlen <= 0:
+            raise ValueError("maxlen must be positive")
+        self.maxlen = maxlen
+
+        self._messages: dict[int, Message] = {}
+        self._channel_index: dict[int, dict[int, Message]] = {}
+        self._author_index: dict[int, dict[int, Message]] = {}
+
+    def add(self, message: Message) -> None:
+        """Add the received message to the index, dropping the oldest message if the index is full."""
+        if message.id in self._messages:
+            return
+        if len(self._messages) >= self.maxlen:
+            self.remove(next(iter(self._messages)))
+
+        self._messages[message.id] = message
+        self._channel_index.setdefault(message.channel.id, {})[message.id] = message
+        self._author_index.setdefault(message.author.id, {})[message.id] = message
+
+    def remove(self, message_id: int) -> Message | None:
+        """Remove the message with the given ID from the index and return it, if it's indexed."""
+        message = self._messages.pop(message_id, None)
+        if message is None:
+            return None
+
+        for index, key in ((self._channel_index, message.channel.id), (self._author_index, message.author.id)):
+            messages = index[key]
+            del messages[message_id]
+            if not messages:
+                del index[key]
+        return message
+
+    def get(self, message_id: int) -> Message | None:
+        """Return the message with the given ID, if it's indexed."""
+        return self._messages.get(message_id)
+
+    @property
+    def oldest(self) -> Message | None:
+        """The oldest message in the index, or None if it's empty."""
+        return next(iter(self._messages.values()), None)
+
+    def covers(self, time: datetime) -> bool:
+        """
+        Tell whether all the messages received since the given time are in the index.
+
+        That's the case if the index already has a message from before that time, since only the oldest messages are
+        dropped.
+        """
+        oldest = self.oldest
+        return oldest is not None and oldest.created_at <= time
+
+    def channel_messages(self, channel_id: int, *, after: datetime | None = None) -> t.Iterator[Message]:
+        """Iterate over the messages of the channel with the given ID from the newest, stopping at `after` if given."""
+        return self._newest(self._channel_index.get(channel_id, {}), after)
+
+    def author_messages(self, author_id: int, *, after: datetime | None = None) -> t.Iterator[Message]:
+        """Iterate over the messages of the author with the given ID from the newest, stopping at `after` if given."""
+        return self._newest(self._author_index.get(author_id, {}), after)
+
+    @staticmethod
+    def _newest(messages: dict[int, Message], after: datetime | None) -> t.Iterator[Message]:
+        """Iterate over the messages from the newest, until one which was created at or before `after`."""
+        for message in reversed(messages.values()):
+            if after is not None and message.created_at <= after:
+                return
+            yield message
+
+    def __contains__(self, message_id: int) -> bool:
+        """Return True if the index contains a message with the given ID."""
+        return message_id in self._messages
+
+    def __iter__(self) -> t.Iterator[Message]:
+        """Iterate over the messages from the oldest."""
+        return iter(self._messages.values())
+
+    def __len__(self) -> int:
+        return len(self._messages)
@@ -0,0 +1,331 @@
+"""
+A benchmark of the filtering hot path.
+
+The filter lists are loaded from a fixture shaped like the `bot/filter/filter_lists` API response, and synthetic message
+corpora are replayed through the same steps `Filtering.on_message` takes before acting on the result. Discord is never
+contacted, every Discord object is mocked.
+
+Run it with `python -m tests.benchmarks.filtering`, using the same environment variables as the tests.
+Use `--help` for the available options.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import string
+import sys
+import time
+import tracemalloc
+import warnings
+import zlib
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import bot
+from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering.filtering import Filtering
+from tests.helpers import MockAttachment, MockBot, MockMember, MockMessage, MockTextChannel
+
+FIXTURE = Path(__file__).parent / "resources" / "filter_lists.json"
+
+WORDS = (
+    "python", "function", "class", "import", "error", "list", "dict", "help", "thanks", "anyone", "know", "how",
+    "loop", "async", "await", "module", "package", "install", "pip", "venv", "the", "a", "is", "it", "why", "does",
+    "this", "not", "work", "when", "i", "try", "to", "run", "my", "code", "what", "should", "use", "instead",
+)
+ZALGO_MARKS = "".join(chr(codepoint) for codepoint in range(0x300, 0x36F))
+
+
+@dataclass
+class CorpusResult:
+    """The measurements of replaying a single corpus."""
+
+    corpus: str
+    messages: int
+    messages_per_second: float
+    p50_ms: float
+    p99_ms: float
+    # The mean peak memory allocated while filtering a single message.
+    mean_peak_alloc_kib: float
+    list_p50_ms: dict[str, float] = field(default_factory=dict)
+    list_p99_ms: dict[str, float] = field(default_factory=dict)
+
+
+# region: corpora
+
+def _sentence(rng: random.Random, min_words: int = 3, max_words: int = 25) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(min_words, max_words)))
+
+
+def _authors(count: int) -> list[MockMember]:
+    return [MockMember(id=1000 + i, bot=False) for i in range(count)]
+
+
+def _message(id_: int, author: MockMember, channel: MockTextChannel, content: str, **kwargs) -> MockMessage:
+    return MockMessage(
+        id=id_, author=author, channel=channel, content=content, webhook_id=None, embeds=[], mentions=[],
+        role_mentions=[], reference=None, **kwargs
+    )
+
+
+def plain_chat(rng: random.Random, count: int) -> list[MockMessage]:
+    """Ordinary conversation between many users, with the occasional link and code block."""
+    authors = _authors(50)
+    channel = MockTextChannel(id=1)
+    messages = []
+    for i in range(count):
+        content = _sentence(rng)
+        roll = rng.random()
+        if roll < 0.1:
+            content += f" https://docs.python.org/3/library/{rng.choice(WORDS)}.html"
+        elif roll < 0.15:
+            content += f"\n```py\n{_sentence(rng)}\n{_sentence(rng)}\n```"
+        messages.append(_message(i, rng.choice(authors), channel, content))
+    return messages
+
+
+def spam_bursts(rng: random.Random, count: int) -> list[MockMessage]:
+    """A few users repeatedly sending the same messages, mixed with regular chat."""
+    authors = _authors(20)
+    spammers = authors[:3]
+    channel = MockTextChannel(id=1)
+    spam = ["FREE NITRO " * 10, "@everyone check this out", ":fire: " * 30, "\n" * 40 + "hi"]
+    messages = []
+    for i in range(count):
+        if rng.random() < 0.6:
+            messages.append(_message(i, rng.choice(spammers), channel, rng.choice(spam)))
+        else:
+            messages.append(_message(i, rng.choice(authors), channel, _sentence(rng)))
+    return messages
+
+
+def invite_floods(rng: random.Random, count: int) -> list[MockMessage]:
+    """Messages advertising a mix of known and unknown guild invites."""
+    authors = _authors(20)
+    channel = MockTextChannel(id=1)
+    messages = []
+    for i in range(count):
+        codes = [
+            "".join(rng.choices(string.ascii_letters + string.digits, k=rng.randint(6, 10)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        content = " ".join(f"join discord.gg/{code}" for code in codes) + " " + _sentence(rng, 0, 5)
+        messages.append(_message(i, rng.choice(authors), channel, content))
+    return messages
+
+
+def zalgo_text(rng: random.Random, count: int) -> list[MockMessage]:
+    """Messages stuffed with combining marks, invisible characters, and URL quoting, which are removed by cleaning."""
+    authors = _authors(20)
+    channel = MockTextChannel(id=1)
+    messages = []
+    for i in range(count):
+        content = "".join(
+            char + "".join(rng.choices(ZALGO_MARKS, k=rng.randint(0, 8))) for char in _sentence(rng)
+        )
+        content += "​%20" * rng.randint(0, 10) + " ||" + _sentence(rng, 1, 3) + "||"
+        messages.append(_message(i, rng.choice(authors), channel, content))
+    return messages
+
+
+def large_attachments(rng: random.Random, count: int) -> list[MockMessage]:
+    """Messages with large text file attachments and images, the text of which is filtered as well."""
+    authors = _authors(20)
+    channel = MockTextChannel(id=1)
+    messages = []
+    for i in range(count):
+        attachments = []
+        for _ in range(rng.randint(1, 3)):
+            if rng.random() < 0.5:
+                data = "\n".join(_sentence(rng, 10, 30) for _ in range(rng.randint(100, 2000))).encode()
+                attachment = MockAttachment(
+                    filename=f"log{i}.txt", content_type="text/plain; charset=utf-8", size=len(data),
+                    url=f"https://cdn.example.com/{i}/{len(attachments)}/log{i}.txt"
+                )
+                attachment.read = AsyncMock(return_value=data)
+            else:
+                attachment = MockAttachment(filename=f"image{i}.png", content_type="image/png", size=2_000_000)
+            attachments.append(attachment)
+        messages.append(_message(i, rng.choice(authors), channel, _sentence(rng), attachments=attachments))
+    return messages
+
+
+CORPORA: dict[str, Callable[[random.Random, int], list[MockMessage]]] = {
+    "plain_chat": plain_chat,
+    "spam_bursts": spam_bursts,
+    "invite_floods": invite_floods,
+    "zalgo_text": zalgo_text,
+    "large_attachments": large_attachments,
+}
+
+# endregion
+# region: replay
+
+
+async def _fetch_invite(code: str) -> MagicMock:
+    """Return a mock invite to one of a few guilds, some of which appear in the fixture."""
+    guild = MagicMock(id=267624335836053506 + zlib.crc32(code.encode()) % 60, features=[], icon=None)
+    guild.name = f"Guild {guild.id}"
+    return MagicMock(code=code, guild=guild, approximate_member_count=100, approximate_presence_count=10)
+
+
+class _AttachmentSession:
+    """An HTTP session serving the data of mock attachments by URL, which respects range requests."""
+
+    def __init__(self, attachments: dict[str, MockAttachment]):
+        self.attachments = attachments
+
+    @asynccontextmanager
+    async def get(self, url: str, *, headers: dict[str, str], **_) -> AsyncIterator[SimpleNamespace]:
+        data = await self.attachments[url].read()
+        start, end = map(int, headers["Range"].removeprefix("bytes=").split("-"))
+        data = data[start:end + 1]
+
+        async def iter_chunked(size: int) -> AsyncIterator[bytes]:
+            for i in range(0, len(data), size):
+                yield data[i:i + size]
+
+        yield SimpleNamespace(content=SimpleNamespace(iter_chunked=iter_chunked))
+
+
+def load_cog(fixture: Path, messages: list[MockMessage] = ()) -> Filtering:
+    """Create a filtering cog holding the filter lists in the fixture, which can download the messages' attachments."""
+    cog = Filtering(MockBot())
+    cog.bot.http_session = _AttachmentSession({a.url: a for msg in messages for a in msg.attachments})
+    for raw_filter_list in json.loads(fixture.read_text()):
+        cog._load_raw_filter_list(raw_filter_list)
+    return cog
+
+
+def _time_filter_lists(cog: Filtering, timings: dict[str, list[float]]) -> None:
+    """Record how long each call to each filter list in the cog takes."""
+    for filter_list in cog.filter_lists.values():
+        async def timed_actions_for(ctx: FilterContext, original=filter_list.actions_for, name=filter_list.name):
+            start = time.perf_counter()
+            try:
+                return await original(ctx)
+            finally:
+                timings[name].append(time.perf_counter() - start)
+
+        filter_list.actions_for = timed_actions_for
+
+
+async def _filter_message(cog: Filtering, msg: MockMessage) -> None:
+    """Run the message through the steps `Filtering.on_message` takes before acting on the result."""
+    msg.created_at = datetime.now(tz=UTC)
+    cog.message_cache.append(msg)
+    ctx = FilterContext.from_message(Event.MESSAGE, msg, None, cog.message_cache)
+
+    text_contents = await cog._extract_attachments_content(msg.attachments)
+    if text_contents:
+        attachment_content = "\n\n".join(text_contents)
+        ctx = ctx.replace(content=f"{ctx.content}\n\n{attachment_content}")
+
+    _, _, triggers = await cog._resolve_action(ctx, short_circuit=True)
+    cog.message_cache.update(msg, metadata=triggers)
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    """Return the value at the given percentile, in milliseconds."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)] * 1000
+
+
+async def replay(corpus: str, messages: list[MockMessage], fixture: Path = FIXTURE) -> CorpusResult:
+    """Filter each of the messages, first for latency and throughput, and then again for allocations."""
+    timings = defaultdict(list)
+    cog = load_cog(fixture, messages)
+    _time_filter_lists(cog, timings)
+    latencies = []
+    start = time.perf_counter()
+    for msg in messages:
+        msg_start = time.perf_counter()
+        await _filter_message(cog, msg)
+        latencies.append(time.perf_counter() - msg_start)
+    elapsed = time.perf_counter() - start
+
+    # Tracing allocations slows everything down, so it's done separately on a fresh cog.
+    cog = load_cog(fixture, messages)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for msg in messages:
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await _filter_message(cog, msg)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+
+    return CorpusResult(
+        corpus=corpus,
+        messages=len(messages),
+        messages_per_second=len(messages) / elapsed if elapsed else 0.0,
+        p50_ms=_percentile(latencies, 50),
+        p99_ms=_percentile(latencies, 99),
+        mean_peak_alloc_kib=sum(peaks) / len(peaks) / 1024 if peaks else 0.0,
+        list_p50_ms={name: _percentile(values, 50) for name, values in sorted(timings.items())},
+        list_p99_ms={name: _percentile(values, 99) for name, values in sorted(timings.items())},
+    )
+
+
+async def run(corpora: list[str], count: int, seed: int, fixture: Path = FIXTURE) -> list[CorpusResult]:
+    """Generate and replay each of the corpora."""
+    bot.instance = MockBot()
+    bot.instance.fetch_invite = AsyncMock(side_effect=_fetch_invite)
+
+    results = []
+    for corpus in corpora:
+        messages = CORPORA[corpus](random.Random(seed), count)
+        results.append(await replay(corpus, messages, fixture))
+    return results
+
+# endregion
+
+
+def _format(results: list[CorpusResult]) -> str:
+    lines = []
+    for result in results:
+        lines.append(
+            f"{result.corpus}: {result.messages} messages, {result.messages_per_second:,.0f} msg/s, "
+            f"p50 {result.p50_ms:.3f} ms, p99 {result.p99_ms:.3f} ms, "
+            f"mean peak allocation {result.mean_peak_alloc_kib:,.1f} KiB/msg"
+        )
+        for name, p50 in result.list_p50_ms.items():
+            lines.append(f"    {name:<10} p50 {p50:.3f} ms, p99 {result.list_p99_ms[name]:.3f} ms")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Parse the arguments, run the benchmark, and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "-c", "--corpus", action="append", choices=list(CORPORA), help="A corpus to replay. Defaults to all of them."
+    )
+    parser.add_argument("-n", "--messages", type=int, default=1000, help="The number of messages in each corpus.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the corpus generation.")
+    parser.add_argument("--fixture", type=Path, default=FIXTURE, help="A JSON file of filter lists to load.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    # The mocks of the discord.py objects emit deprecation warnings which drown out the results.
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    results = asyncio.run(run(args.corpus or list(CORPORA), args.messages, args.seed, args.fixture))
+    if args.json:
+        sys.stdout.write(json.dumps([asdict(result) for result in results], indent=2) + "\n")
+    else:
+        sys.stdout.write(_format(results) + "\n")
+
+
+if __name__ == "__main__":
+    main()
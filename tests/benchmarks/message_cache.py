@@ -0,0 +1,163 @@
+"""
+A benchmark of the memory held by the message cache of the filtering cog.
+
+Messages are built by discord.py from synthetic gateway payloads, with the same kinds of authors, mentions, embeds and
+attachments as in regular chat, and the memory they keep allocated is measured once they're only referenced by the
+cache. The cache is measured both when it keeps the messages themselves, and when it keeps compact snapshots of them.
+Discord is never contacted.
+
+Run it with `python -m tests.benchmarks.message_cache`, using the same environment variables as the tests.
+Use `--help` for the available options.
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+from dataclasses import asdict, dataclass
+from unittest.mock import MagicMock
+
+import discord
+from discord.state import ConnectionState
+
+from bot.exts.filtering._message_features import MessageFeatures
+from bot.utils.message_cache import MessageCache
+from tests.benchmarks.filtering import _sentence
+
+GUILD_ID = 1
+CHANNEL_ID = 2
+
+
+@dataclass
+class CacheResult:
+    """The memory held by a cache of messages."""
+
+    compact: bool
+    messages: int
+    bytes_per_message: float
+
+
+def _state() -> tuple[ConnectionState, discord.TextChannel]:
+    """Create a connection state which doesn't connect anywhere, and a channel for the messages."""
+    state = ConnectionState(dispatch=lambda *_: None, handlers={}, hooks={}, http=MagicMock())
+    guild = discord.Guild(
+        state=state,
+        data={
+            "id": GUILD_ID, "name": "Guild", "roles": [], "channels": [], "emojis": [], "stickers": [], "features": []
+        }
+    )
+    channel = discord.TextChannel(
+        state=state, guild=guild, data={"id": CHANNEL_ID, "type": 0, "name": "channel", "position": 0}
+    )
+    return state, channel
+
+
+def _user(id_: int) -> dict:
+    return {"id": id_, "username": f"user{id_}", "discriminator": "0", "global_name": None, "avatar": None}
+
+
+def _member() -> dict:
+    return {"roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0}
+
+
+def payloads(rng: random.Random, count: int) -> list[dict]:
+    """Generate message payloads as sent by the gateway, some of them with mentions, embeds and attachments."""
+    messages = []
+    for i in range(count):
+        mentions = [_user(1000 + rng.randrange(50)) | {"member": _member()} for _ in range(rng.choice((0, 0, 0, 1, 2)))]
+        embeds = []
+        if rng.random() < 0.1:
+            embeds.append({
+                "type": "article",
+                "url": "https://docs.python.org/3/library/asyncio.html",
+                "title": "asyncio — Asynchronous I/O",
+                "description": _sentence(rng, 10, 40),
+                "thumbnail": {"url": "https://docs.python.org/3/_static/og-image.png", "width": 200, "height": 200},
+            })
+        attachments = []
+        if rng.random() < 0.05:
+            attachments.append({
+                "id": i,
+                "filename": "image.png",
+                "size": rng.randrange(10_000, 1_000_000),
+                "url": f"https://cdn.discordapp.com/attachments/{CHANNEL_ID}/{i}/image.png",
+                "proxy_url": f"https://media.discordapp.net/attachments/{CHANNEL_ID}/{i}/image.png",
+                "content_type": "image/png",
+                "width": 800,
+                "height": 600,
+            })
+        messages.append({
+            "id": discord.utils.time_snowflake(discord.utils.utcnow()) + i,
+            "channel_id": CHANNEL_ID,
+            "guild_id": GUILD_ID,
+            "author": _user(1000 + rng.randrange(50)),
+            "member": _member(),
+            "content": _sentence(rng),
+            "timestamp": "2024-01-01T00:00:00+00:00",
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": mentions,
+            "mention_roles": [],
+            "attachments": attachments,
+            "embeds": embeds,
+            "pinned": False,
+            "type": 0,
+        })
+    return messages
+
+
+def measure(messages: list[dict], *, compact: bool) -> CacheResult:
+    """Measure the memory held by a filtering message cache for each of the messages, once they're created."""
+    state, channel = _state()
+    cache = MessageCache(
+        len(messages), newest_first=True, feature_extractor=MessageFeatures.from_message, compact=compact
+    )
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for data in messages:
+            cache.append(discord.Message(state=state, channel=channel, data=data))
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return CacheResult(compact=compact, messages=len(messages), bytes_per_message=(after - before) / len(messages))
+
+
+def run(count: int, seed: int) -> list[CacheResult]:
+    """Measure the cache with and without compact snapshots, for the same messages."""
+    messages = payloads(random.Random(seed), count)
+    return [measure(messages, compact=compact) for compact in (False, True)]
+
+
+def _format(results: list[CacheResult]) -> str:
+    return "\n".join(
+        f"{'compact' if result.compact else 'full'}: {result.messages} messages, "
+        f"{result.bytes_per_message:,.0f} bytes/msg"
+        for result in results
+    )
+
+
+def main() -> None:
+    """Parse the arguments, run the benchmark, and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--messages", type=int, default=1000, help="The number of messages to cache.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the message generation.")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args()
+
+    results = run(args.messages, args.seed)
+    if args.json:
+        sys.stdout.write(json.dumps([asdict(result) for result in results], indent=2) + "\n")
+    else:
+        sys.stdout.write(_format(results) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import unittest
+from unittest.mock import patch
+
+from tests.benchmarks.filtering import CORPORA, run
+
+
+class FilteringBenchmarkTests(unittest.IsolatedAsyncioTestCase):
+    """Make sure the filtering benchmark keeps working as the filtering system changes."""
+
+    @patch("bot.instance", None)
+    async def test_every_corpus_is_replayed(self):
+        """Each corpus should be replayed through all the filter lists in the fixture."""
+        results = await run(list(CORPORA), count=5, seed=0)
+
+        self.assertListEqual([result.corpus for result in results], list(CORPORA))
+        for result in results:
+            with self.subTest(corpus=result.corpus):
+                self.assertEqual(result.messages, 5)
+                self.assertGreater(result.messages_per_second, 0)
+                self.assertSetEqual(
+                    set(result.list_p50_ms), {"antispam", "domain", "extension", "invite", "token", "unique"}
+                )
@@ -0,0 +1,16 @@
+import unittest
+
+from tests.benchmarks.message_cache import run
+
+
+class MessageCacheBenchmarkTests(unittest.TestCase):
+    """Make sure the message cache benchmark keeps working as the cache changes."""
+
+    def test_compact_cache_holds_less_memory(self):
+        """Both kinds of caches should be measured, and the compact one should hold less memory per message."""
+        full, compact = run(count=50, seed=0)
+
+        self.assertFalse(full.compact)
+        self.assertTrue(compact.compact)
+        self.assertEqual(full.messages, 50)
+        self.assertLess(compact.bytes_per_message, full.bytes_per_message)
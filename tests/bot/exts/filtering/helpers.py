@@ -0,0 +1,53 @@
+"""Factories for the site data of filters and filter lists, and for the contexts they're checked in."""
+
+from bot.exts.filtering._filter_context import Event, FilterContext
+from tests.helpers import MockMember, MockMessage, MockTextChannel
+
+
+def filter_data(
+    id_: int,
+    content: str,
+    description: str | None = None,
+    *,
+    settings: dict | None = None,
+    additional_settings: dict | None = None,
+    created_at: float | str = 0,
+    updated_at: float | str = 0,
+) -> dict:
+    """Return the data of a filter as the site sends it, with no overrides unless they're given."""
+    return {
+        "id": id_,
+        "content": content,
+        "description": description,
+        "settings": settings or {},
+        "additional_settings": additional_settings or {},
+        "created_at": created_at,
+        "updated_at": updated_at,
+    }
+
+
+def list_data(
+    filters: list[dict],
+    *,
+    id_: int = 1,
+    list_type: int = 0,
+    settings: dict | None = None,
+    created_at: float | str = 0,
+    updated_at: float | str = 0,
+) -> dict:
+    """Return the data of a filter list as the site sends it, with no default settings unless they're given."""
+    return {
+        "id": id_,
+        "list_type": list_type,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "settings": settings or {},
+        "filters": filters,
+    }
+
+
+def message_context(content: str = "", *, member: MockMember | None = None) -> FilterContext:
+    """Return the context of a message sent by a member in a text channel, with the given content."""
+    member = member or MockMember(id=123)
+    channel = MockTextChannel(id=345)
+    return FilterContext(Event.MESSAGE, member, channel, content, MockMessage(author=member, channel=channel))
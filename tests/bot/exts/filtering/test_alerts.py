@@ -0,0 +1,173 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+
+from bot.exts.filtering._alerts import AlertDispatcher
+from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering._ui.ui import AlertView, CombinedAlertView, PhishHandlingButton
+from tests.helpers import MockMember
+
+
+def alert_view(author_id: int) -> AlertView:
+    """Return the alert view of a message by the user with the given ID."""
+    author = MockMember(id=author_id, name=f"user{author_id}")
+    return AlertView(FilterContext(Event.MESSAGE, author, None, "", None))
+
+
+class AlertDispatcherTests(unittest.IsolatedAsyncioTestCase):
+    """Test the batching of alerts sent through the filtering webhook."""
+
+    def setUp(self):
+        """Sets up a dispatcher with a mock webhook."""
+        self.stats = MagicMock()
+        self.dispatcher = AlertDispatcher(self.stats, batch_delay=0.01)
+        self.dispatcher.webhook = MagicMock(send=AsyncMock())
+
+    def put(self, author_id: int, description: str = "alert", content: str = "", embeds: int = 1) -> None:
+        """Queue an alert for the user with the given ID."""
+        self.dispatcher.put(
+            "Message Filter", content, [discord.Embed(description=description) for _ in range(embeds)],
+            alert_view(author_id)
+        )
+
+    def test_batches_respect_message_limits(self):
+        """A batch shouldn't exceed 10 embeds, 6000 embed characters, or 5 offenders."""
+        test_cases = (
+            ("embeds", [dict(author_id=1, embeds=4)] * 3, [2, 1]),
+            ("length", [dict(author_id=1, description="a" * 4000)] * 2, [1, 1]),
+            ("offenders", [dict(author_id=i) for i in range(7)], [5, 2]),
+        )
+
+        for limit, alerts, batch_sizes in test_cases:
+            with self.subTest(limit=limit):
+                for alert in alerts:
+                    self.put(**alert)
+
+                self.assertListEqual(
+                    [len(self.dispatcher.next_batch()) for _ in batch_sizes], batch_sizes
+                )
+                self.assertEqual(len(self.dispatcher), 0)
+
+    def test_alerts_which_dont_fit_dont_block_later_ones(self):
+        """Alerts further down the queue should fill the space left in the batch."""
+        self.put(1, embeds=6)
+        self.put(2, embeds=6)
+        self.put(3, embeds=4)
+
+        batch = self.dispatcher.next_batch()
+
+        self.assertListEqual([alert.view.ctx.author.id for alert in batch], [1, 3])
+
+    def test_pinged_alerts_are_taken_first(self):
+        """Alerts with pings should go ahead of the ones queued before them."""
+        self.put(1, embeds=10)
+        self.put(2, content="<@&123>")
+
+        batch = self.dispatcher.next_batch()
+
+        self.assertListEqual([alert.view.ctx.author.id for alert in batch], [2])
+
+    async def test_alerts_are_sent_together_and_grouped_by_offender(self):
+        """Alerts queued close together should be sent in one message, with each offender's embeds in a row."""
+        self.put(1, "first")
+        self.put(2, "second", content="<@&123>")
+        self.put(1, "third", content="<@&123> <@&456>")
+
+        self.dispatcher.start()
+        await asyncio.sleep(0.05)
+        self.dispatcher.stop()
+
+        self.dispatcher.webhook.send.assert_awaited_once()
+        kwargs = self.dispatcher.webhook.send.await_args.kwargs
+        self.assertEqual(kwargs["content"], "<@&123> <@&456>")
+        self.assertListEqual([embed.description for embed in kwargs["embeds"]], ["second", "third", "first"])
+        self.assertIsInstance(kwargs["view"], CombinedAlertView)
+        self.assertListEqual(
+            [(item.row, getattr(item, "label", None)) for item in kwargs["view"].children][::3],
+            [(0, "ID: user2"), (1, "ID: user1")]
+        )
+        self.stats.timing.assert_called_once()
+
+    async def test_single_offender_keeps_its_view(self):
+        """When all the alerts are for the same offender, their view should be used as is."""
+        self.put(1)
+        view = self.dispatcher._unpinged[0].view
+
+        self.dispatcher.start()
+        await asyncio.sleep(0.05)
+        self.dispatcher.stop()
+
+        self.assertIs(self.dispatcher.webhook.send.await_args.kwargs["view"], view)
+
+    async def test_full_batches_are_sent_without_waiting(self):
+        """When the queue holds more than a message's worth of alerts, they shouldn't wait for the batch delay."""
+        self.dispatcher.batch_delay = 10
+        for author_id in range(12):
+            self.put(author_id)
+
+        self.dispatcher.start()
+        await asyncio.sleep(0.05)
+        self.dispatcher.stop()
+
+        self.assertListEqual(
+            [len(call.kwargs["embeds"]) for call in self.dispatcher.webhook.send.await_args_list], [5, 5]
+        )
+        self.assertEqual(len(self.dispatcher), 2)
+
+    async def test_failed_batches_are_sent_one_by_one(self):
+        """If a batch can't be sent, each of its alerts should be sent on its own."""
+        async def send(**kwargs):
+            if len(kwargs["embeds"]) > 1 or kwargs["embeds"][0].description == "broken":
+                raise discord.HTTPException(MagicMock(status=400), "Invalid Form Body")
+
+        self.dispatcher.webhook.send.side_effect = send
+        self.put(1, "first")
+        self.put(2, "broken")
+        self.put(3, "third")
+
+        self.dispatcher.start()
+        await asyncio.sleep(0.05)
+        self.dispatcher.stop()
+
+        self.assertListEqual(
+            [call.kwargs["embeds"][0].description for call in self.dispatcher.webhook.send.await_args_list],
+            ["first", "first", "broken", "third"]
+        )
+        self.stats.timing.assert_called_once()
+
+
+class PhishHandlingButtonTests(unittest.IsolatedAsyncioTestCase):
+    """Test the button offering to handle a phishing attempt."""
+
+    async def test_lock_is_per_alert(self):
+        """Alerts sharing a message shouldn't block each other's button, but the same button can't be pressed twice."""
+        message = MagicMock(id=1)
+        released = asyncio.Event()
+
+        async def wait_for_release(*_, **__) -> None:
+            await released.wait()
+
+        def interaction() -> MagicMock:
+            """Return an interaction on the shared message, whose response waits until released."""
+            response = MagicMock(send_message=AsyncMock(side_effect=wait_for_release))
+            return MagicMock(message=message, response=response)
+
+        first, second = (
+            PhishHandlingButton(FilterContext(Event.MESSAGE, MockMember(id=id_), None, "", None), "phish", MagicMock())
+            for id_ in (1, 2)
+        )
+        first_press, second_press, repeated_press = interaction(), interaction(), interaction()
+        pressed = [
+            asyncio.create_task(first.callback(first_press)),
+            asyncio.create_task(second.callback(second_press)),
+        ]
+        await asyncio.sleep(0)
+        await first.callback(repeated_press)
+        released.set()
+        await asyncio.gather(*pressed)
+
+        first_press.response.send_message.assert_awaited_once()
+        second_press.response.send_message.assert_awaited_once()
+        repeated_press.response.send_message.assert_not_awaited()
@@ -0,0 +1,56 @@
+import unittest
+from datetime import UTC, datetime, timedelta
+
+from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering._filter_lists.antispam import AntispamList
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from bot.exts.filtering._message_features import MessageFeatures
+from bot.exts.filtering.filtering import Filtering
+from bot.utils.message_cache import MessageCache
+from tests.bot.exts.filtering.helpers import filter_data, list_data
+from tests.helpers import MockBot, MockMember, MockMessage, MockTextChannel
+
+ANTISPAM_SETTINGS = {
+    "infraction_and_notification": {
+        "dm_content": "", "dm_embed": "", "infraction_type": "TIMEOUT", "infraction_reason": "",
+        "infraction_duration": 0.0, "infraction_channel": 0
+    }
+}
+
+
+class AntispamListTests(unittest.IsolatedAsyncioTestCase):
+    """Test the antispam rules against the messages of the filtering message cache."""
+
+    def setUp(self):
+        """Sets up a list with a burst rule, and a cache like the cog's."""
+        self.filter_list = AntispamList(Filtering(MockBot()))
+        self.burst = self.filter_list.add_list(list_data(
+            [filter_data(1, "burst", additional_settings={"interval": 10, "threshold": 2})],
+            settings=ANTISPAM_SETTINGS,
+        )).filters[1]
+        self.cache = MessageCache(10, newest_first=True, feature_extractor=MessageFeatures.from_message)
+        self.author = MockMember(id=123)
+        self.channel = MockTextChannel(id=345)
+
+    async def send(self, id_: int, seconds_ago: float) -> list:
+        """Cache a message from the author, and return the antispam rules it triggers."""
+        message = MockMessage(
+            id=id_, author=self.author, channel=self.channel, content="spam",
+            created_at=datetime.now(tz=UTC) - timedelta(seconds=seconds_ago), mentions=[], role_mentions=[]
+        )
+        self.cache.append(message)
+        ctx = FilterContext.from_message(Event.MESSAGE, message, None, self.cache)
+        _, _, triggers = await self.filter_list.actions_for(ctx)
+        return triggers.get(ListType.DENY, [])
+
+    async def test_burst_rule_triggers_on_recent_messages(self):
+        """The rule should trigger once the author sent more messages than the threshold within its interval."""
+        self.assertListEqual(await self.send(1, 2), [])
+        self.assertListEqual(await self.send(2, 1), [])
+        self.assertListEqual(await self.send(3, 0), [self.burst])
+
+    async def test_old_messages_are_not_counted(self):
+        """Messages sent before the interval of the rule shouldn't count towards its threshold."""
+        self.assertListEqual(await self.send(1, 30), [])
+        self.assertListEqual(await self.send(2, 20), [])
+        self.assertListEqual(await self.send(3, 0), [])
@@ -0,0 +1,130 @@
+import unittest
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import aiohttp
+
+from bot.exts.filtering import filtering
+from bot.exts.filtering.filtering import Filtering, _extract_text_file_content
+from tests.helpers import MockAttachment, MockBot
+
+
+class FakeSession:
+    """An HTTP session serving fixed data by URL, which records the requests and how much of each body was read."""
+
+    def __init__(self, files: dict[str, bytes], *, ignore_range: bool = False):
+        self.files = files
+        self.ignore_range = ignore_range
+        self.requests = []
+        self.read = {}
+
+    @asynccontextmanager
+    async def get(self, url: str, *, headers: dict[str, str], **_):
+        self.requests.append((url, headers["Range"]))
+        data = self.files[url]
+        if isinstance(data, Exception):
+            raise data
+        if not self.ignore_range:
+            end = int(headers["Range"].rsplit("-", 1)[1])
+            data = data[:end + 1]
+        self.read[url] = 0
+
+        async def iter_chunked(size: int):
+            for i in range(0, len(data), size):
+                self.read[url] = i + size
+                yield data[i:i + size]
+
+        yield SimpleNamespace(content=SimpleNamespace(iter_chunked=iter_chunked))
+
+
+def text_attachment(name: str, size: int, charset: str = "utf-8") -> MockAttachment:
+    """Return a mock text attachment of the given size."""
+    return MockAttachment(
+        filename=name, url=f"https://cdn.example.com/{name}", content_type=f"text/plain; charset={charset}", size=size
+    )
+
+
+class ExtractTextFileContentTests(unittest.IsolatedAsyncioTestCase):
+    """Test reading the start of a text attachment."""
+
+    async def test_excerpt_matches_reading_the_whole_file(self):
+        """The excerpt should be the same as the one taken from the entire file."""
+        test_cases = (
+            "short file",
+            "\n".join(f"line {i}" for i in range(100)),
+            "x" * 10_000,
+            "\r\n".join("é" * 50 for _ in range(100)),
+            "",
+        )
+
+        for text in test_cases:
+            with self.subTest(text=text[:20]):
+                data = text.encode()
+                attachment = text_attachment("file.txt", len(data))
+                session = FakeSession({attachment.url: data})
+
+                content = await _extract_text_file_content(attachment, session, filtering.MAX_ATTACHMENT_BYTES)
+
+                expected = "\n".join(text.splitlines()[:30])[:2_000]
+                self.assertEqual(content, f"file.txt: {expected}")
+
+    async def test_reading_stops_once_the_excerpt_is_complete(self):
+        """Even if the server sends the entire file, only the start of it should be read."""
+        data = "\n".join(f"line {i}" for i in range(100_000)).encode()
+        attachment = text_attachment("big.txt", len(data))
+        session = FakeSession({attachment.url: data}, ignore_range=True)
+
+        await _extract_text_file_content(attachment, session, filtering.MAX_ATTACHMENT_BYTES)
+
+        self.assertEqual(session.requests, [(attachment.url, f"bytes=0-{filtering.MAX_ATTACHMENT_BYTES - 1}")])
+        self.assertLessEqual(session.read[attachment.url], filtering.ATTACHMENT_CHUNK_SIZE)
+
+    async def test_undecodable_content_is_tolerated(self):
+        """Invalid bytes should be replaced, and an unknown charset should fall back to UTF-8."""
+        attachment = text_attachment("bad.txt", 7, charset="not-a-charset")
+        session = FakeSession({attachment.url: b"ok \xff ok"})
+
+        content = await _extract_text_file_content(attachment, session, 100)
+
+        self.assertEqual(content, "bad.txt: ok � ok")
+
+
+class ExtractAttachmentsContentTests(unittest.IsolatedAsyncioTestCase):
+    """Test reading the text attachments of a message."""
+
+    def setUp(self):
+        """Sets up a fresh cog for each test."""
+        self.cog = Filtering(MockBot())
+
+    async def test_attachments_share_a_byte_budget(self):
+        """Each attachment should be limited by what's left of the budget, and the rest shouldn't be requested."""
+        attachments = [text_attachment(f"{i}.txt", 3_000) for i in range(4)]
+        image = MockAttachment(filename="image.png", content_type="image/png", size=10_000)
+        session = FakeSession({attachment.url: b"a" * 3_000 for attachment in attachments})
+        self.cog.bot.http_session = session
+
+        with patch("bot.constants.Filtering.attachment_read_budget", 7_000):
+            contents = await self.cog._extract_attachments_content([image, *attachments])
+
+        self.assertListEqual(
+            session.requests,
+            [
+                (attachments[0].url, "bytes=0-2999"),
+                (attachments[1].url, "bytes=0-2999"),
+                (attachments[2].url, "bytes=0-999"),
+            ]
+        )
+        self.assertListEqual(contents, ["0.txt: " + "a" * 2_000, "1.txt: " + "a" * 2_000, "2.txt: " + "a" * 1_000])
+
+    async def test_failed_downloads_are_skipped(self):
+        """An attachment which can't be downloaded shouldn't prevent the others from being filtered."""
+        attachments = [text_attachment("missing.txt", 10), text_attachment("found.txt", 5)]
+        self.cog.bot.http_session = FakeSession(
+            {attachments[0].url: aiohttp.ClientError(), attachments[1].url: b"hello"}
+        )
+
+        with self.assertLogs(filtering.log, "WARNING"):
+            contents = await self.cog._extract_attachments_content(attachments)
+
+        self.assertListEqual(contents, ["found.txt: hello"])
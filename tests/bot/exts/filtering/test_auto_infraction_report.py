@@ -0,0 +1,167 @@
+from unittest.mock import patch
+
+import arrow
+from async_rediscache import RedisCache
+
+from bot.exts.filtering._auto_infraction_report import AutoInfractionReport, REPORT_WEEKS, RecordedFilter, iso_week
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from bot.exts.filtering._filter_lists.token import TokensList
+from bot.exts.filtering.filtering import Filtering
+from tests.base import RedisTestCase
+from tests.bot.exts.filtering.helpers import filter_data, list_data
+from tests.helpers import MockBot, MockTextChannel
+
+# The site sends all the fields of an entry, with None for the ones which aren't overridden.
+BAN_SETTINGS = {
+    "infraction_and_notification": {
+        "dm_content": None, "dm_embed": None, "infraction_type": "BAN", "infraction_reason": None,
+        "infraction_duration": None, "infraction_channel": None
+    }
+}
+
+
+class ReportOwner:
+    """A class to give the report's cache a namespace, as it would get from a cog."""
+
+    cache = RedisCache()
+
+
+def record(changed_at: arrow.Arrow, list_label: str = "denied token", text: str = "filter") -> RecordedFilter:
+    """Return a record of a filter which applies a ban."""
+    return RecordedFilter(changed_at.timestamp(), list_label, text, "BAN")
+
+
+class AutoInfractionReportTests(RedisTestCase):
+    """Test the weekly records of auto-infraction filters."""
+
+    async def test_filters_are_kept_in_the_week_they_last_changed(self):
+        """A filter edited in a later week should be moved to that week."""
+        now = arrow.utcnow()
+        report = AutoInfractionReport(ReportOwner.cache)
+
+        await report.record(1, record(now.shift(weeks=-2)))
+        await report.record(2, record(now.shift(weeks=-2)))
+        await report.record(1, record(now))
+
+        counts = dict(await report.weekly_counts())
+        self.assertEqual(counts[iso_week(now.shift(weeks=-2))], 1)
+        self.assertEqual(counts[iso_week(now)], 1)
+        self.assertEqual(sum(counts.values()), 2)
+
+    async def test_records_since(self):
+        """Only the filters changed since the given time should be returned, as they were recorded."""
+        now = arrow.utcnow()
+        report = AutoInfractionReport(ReportOwner.cache)
+        await report.record(1, record(now.shift(days=-10)))
+        await report.record(2, record(now.shift(days=-6)))
+        await report.record(3, record(now, text="latest"))
+
+        records = await report.records_since(now.shift(days=-7))
+
+        self.assertListEqual(sorted(records), [2, 3])
+        self.assertEqual(records[3], record(now, text="latest"))
+
+    async def test_filters_before_the_report_are_pruned(self):
+        """Filters last changed before the earliest week of the report should be forgotten."""
+        now = arrow.utcnow()
+        report = AutoInfractionReport(ReportOwner.cache)
+        await report.record(1, record(now.shift(weeks=-REPORT_WEEKS)))
+        await report.record(2, record(now))
+
+        await report.prune()
+
+        self.assertListEqual(list(await report.records_since(arrow.get(0))), [2])
+
+    async def test_syncing_lists_replaces_their_records(self):
+        """The records of a synced list should be replaced, in a single write, and other lists shouldn't change."""
+        now = arrow.utcnow()
+        report = AutoInfractionReport(ReportOwner.cache)
+        await report.record(1, record(now, "denied token"))
+        await report.record(2, record(now, "denied token"))
+        await report.record(3, record(now, "denied domain"))
+
+        with patch.object(ReportOwner.cache, "update", wraps=ReportOwner.cache.update) as update:
+            await report.sync_lists({"denied token": {2: record(now, "denied token", "edited")}})
+
+        update.assert_awaited_once()
+        records = await report.records_since(arrow.get(0))
+        self.assertDictEqual(records, {2: record(now, "denied token", "edited"), 3: record(now, "denied domain")})
+
+
+class WeeklyReportTests(RedisTestCase):
+    """Test building the weekly report from the records."""
+
+    async def asyncSetUp(self):
+        """Sets up a cog with a token list, and a mod channel to report to."""
+        await super().asyncSetUp()
+        self.cog = Filtering(MockBot())
+        self.filter_list = TokensList(self.cog)
+        self.cog.filter_lists[self.filter_list.name] = self.filter_list
+        self.filter_list.add_list(list_data([], settings={
+            "infraction_and_notification": {
+                "dm_content": "", "dm_embed": "", "infraction_type": "NONE", "infraction_reason": "",
+                "infraction_duration": 0, "infraction_channel": 0
+            }
+        }))
+        self.channel = MockTextChannel()
+
+    def recent_filter(self, id_: int, content: str, settings: dict | None = None) -> dict:
+        """Return the data of a filter which was just added."""
+        return filter_data(id_, content, settings=settings, created_at=arrow.utcnow().isoformat())
+
+    async def test_report_is_built_from_the_records(self):
+        """The recorded filters should be reported without looking the filters up, and only they should be."""
+        self.filter_list.add_filter(ListType.DENY, self.recent_filter(1, "banned", BAN_SETTINGS))
+        self.filter_list.add_filter(ListType.DENY, self.recent_filter(2, "not-banned"))
+        self.filter_list.add_filter(ListType.DENY, filter_data(3, "banned-long-ago", settings=BAN_SETTINGS))
+        await self.cog._record_recent_auto_infraction_filters([self.filter_list[ListType.DENY]])
+
+        with (
+            patch("bot.exts.filtering.filtering.is_mod_channel", return_value=True),
+            patch.object(self.cog, "_get_filter_by_id") as get_filter_by_id,
+        ):
+            await self.cog.send_weekly_auto_infraction_report(self.channel)
+
+        get_filter_by_id.assert_not_called()
+        report = self.channel.send.call_args.args[0]
+        self.assertIn("`banned` (BAN)", report)
+        self.assertIn("**Denied Token**", report)
+        self.assertNotIn("not-banned", report)
+        self.assertNotIn("banned-long-ago", report)
+        self.assertIn(f"{iso_week(arrow.utcnow())}: 1", report)
+
+    async def test_filters_edited_to_not_auto_infract_are_forgotten(self):
+        """A filter edited through the bot to no longer apply an auto-infraction should be removed from the report."""
+        filter_ = self.filter_list.add_filter(ListType.DENY, self.recent_filter(1, "banned", BAN_SETTINGS))
+        mock_bot = MockBot()
+        mock_bot.get_channel.return_value = MockTextChannel()
+        with patch("bot.exts.filtering.filtering.bot.instance", mock_bot):
+            await self.cog._maybe_alert_auto_infraction(self.filter_list, ListType.DENY, filter_)
+            self.assertListEqual(list(await self.cog.auto_infraction_report.records_since(arrow.get(0))), [1])
+
+            edited_filter = self.filter_list.add_filter(ListType.DENY, self.recent_filter(1, "banned"))
+            await self.cog._maybe_alert_auto_infraction(self.filter_list, ListType.DENY, edited_filter, filter_)
+
+        self.assertDictEqual(await self.cog.auto_infraction_report.records_since(arrow.get(0)), {})
+
+    async def test_recent_filters_of_loaded_lists_are_recorded_in_one_write(self):
+        """Auto-infraction filters changed in the recent weeks should be recorded, in case they were added directly."""
+        self.filter_list.add_filter(ListType.DENY, filter_data(1, "old", settings=BAN_SETTINGS))
+        self.filter_list.add_filter(ListType.DENY, self.recent_filter(2, "recent", BAN_SETTINGS))
+
+        with patch.object(
+            self.cog.auto_infraction_filters, "update", wraps=self.cog.auto_infraction_filters.update
+        ) as update:
+            await self.cog._record_recent_auto_infraction_filters([self.filter_list[ListType.DENY]])
+
+        update.assert_awaited_once()
+        self.assertListEqual(list(await self.cog.auto_infraction_report.records_since(arrow.get(0))), [2])
+
+    async def test_records_of_removed_lists_are_forgotten(self):
+        """Once a list is removed, its filters shouldn't be reported."""
+        self.filter_list.add_filter(ListType.DENY, self.recent_filter(1, "banned", BAN_SETTINGS))
+        await self.cog._record_recent_auto_infraction_filters([self.filter_list[ListType.DENY]])
+
+        await self.cog._record_recent_auto_infraction_filters([], [self.filter_list.pop(ListType.DENY)])
+
+        self.assertDictEqual(await self.cog.auto_infraction_report.records_since(arrow.get(0)), {})
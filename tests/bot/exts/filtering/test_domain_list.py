@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import MagicMock
+
+from bot.exts.filtering._filter_lists.domain import DomainsList
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from tests.bot.exts.filtering.helpers import filter_data, list_data, message_context
+
+
+def domain_data(id_: int, content: str, *, only_subdomains: bool = False) -> dict:
+    """Return the data of a domain filter with no setting overrides."""
+    return filter_data(id_, content, additional_settings={"only_subdomains": only_subdomains})
+
+
+class DomainsListTests(unittest.IsolatedAsyncioTestCase):
+    """Test the DomainsList class and its domain index."""
+
+    def setUp(self):
+        """Sets up fresh objects for each test."""
+        self.filter_list = DomainsList(MagicMock())
+        self.filter_list.add_list(list_data([
+            domain_data(1, "bad.com"),
+            domain_data(2, "evil.co.uk"),
+            domain_data(3, "sub.only.net", only_subdomains=True),
+            domain_data(4, "only.net", only_subdomains=True),
+            domain_data(5, "bad.com/specific-path"),
+        ]))
+        self.ctx = message_context()
+
+    async def full_scan(self, content: str) -> tuple[list, list[str]]:
+        """Return the filters triggered by checking the URLs in the content against every filter, and the matches."""
+        urls = {url.lower().rstrip("/") for url in content.replace("https://", "").split() if "." in url}
+        ctx = self.ctx.replace(content=urls, matches=[])
+        triggers = [
+            filter_ for filter_ in self.filter_list[ListType.DENY].filters.values() if await filter_.triggered_on(ctx)
+        ]
+        return triggers, ctx.matches
+
+    async def test_triggers_match_full_scan(self):
+        """The list should trigger the same filters as checking every filter against every URL."""
+        test_cases = (
+            "https://bad.com",
+            "https://www.BAD.com/somewhere",
+            "https://notbad.com",
+            "https://bad.com/specific-path/more",
+            "https://evil.co.uk https://good.co.uk",
+            "https://only.net",
+            "https://only.net/path",
+            "https://a.sub.only.net",
+            "https://example.org",
+        )
+
+        for content in test_cases:
+            with self.subTest(content=content):
+                ctx = self.ctx.replace(content=content, matches=[])
+                expected_triggers, expected_matches = await self.full_scan(content)
+
+                _, _, triggers = await self.filter_list.actions_for(ctx)
+
+                self.assertListEqual(triggers[ListType.DENY], expected_triggers)
+                self.assertListEqual(ctx.matches, expected_matches)
+
+    async def test_unknown_urls_are_potential_phish(self):
+        """URLs which didn't trigger a filter should be recorded as potential phishing."""
+        ctx = self.ctx.replace(content="https://bad.com https://example.org/")
+
+        await self.filter_list.actions_for(ctx)
+
+        self.assertSetEqual(ctx.potential_phish[self.filter_list], {"example.org"})
+
+    async def test_index_is_updated_on_filter_changes(self):
+        """Adding, editing, and removing filters should be reflected in the next evaluation."""
+        ctx = self.ctx.replace(content="https://example.org")
+        _, _, triggers = await self.filter_list.actions_for(ctx)
+        self.assertListEqual(triggers[ListType.DENY], [])
+
+        new_filter = self.filter_list.add_filter(ListType.DENY, domain_data(100, "example.org"))
+        _, _, triggers = await self.filter_list.actions_for(ctx.replace(matches=[]))
+        self.assertListEqual(triggers[ListType.DENY], [new_filter])
+
+        self.filter_list.add_filter(ListType.DENY, domain_data(100, "example.net"))
+        _, _, triggers = await self.filter_list.actions_for(ctx.replace(matches=[]))
+        self.assertListEqual(triggers[ListType.DENY], [])
+
+        self.filter_list.remove_filter(ListType.DENY, 100)
+        _, _, triggers = await self.filter_list.actions_for(ctx.replace(content="https://example.net", matches=[]))
+        self.assertListEqual(triggers[ListType.DENY], [])
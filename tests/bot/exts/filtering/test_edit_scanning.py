@@ -0,0 +1,152 @@
+import random
+import re
+import unittest
+from unittest.mock import MagicMock
+
+from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering._filter_lists.domain import DomainsList, _urls_in
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from bot.exts.filtering._filter_lists.token import TokenMatcher, TokensList
+from bot.exts.filtering._filters.token import TokenFilter, match_bounds
+from bot.exts.filtering._utils import changed_span
+from tests.bot.exts.filtering.helpers import filter_data, list_data
+from tests.helpers import MockMember, MockMessage, MockTextChannel
+
+TOKEN_PATTERNS = (
+    r"ab", r"\bcat\b", r"x$", r"^ab", r"(?<=a)b c", r"c(?!a)", "a\nb", r"\Ab", r"b\Z", r"[ab]{2,3}c", r"(?m)^x",
+    r"a.*c", r"\w+x",
+)
+
+
+def random_edit(rng: random.Random, text: str, alphabet: str) -> str:
+    """Replace a random span of the text with random characters."""
+    start = rng.randint(0, len(text))
+    end = rng.randint(start, min(len(text), start + 5))
+    insertion = "".join(rng.choices(alphabet, k=rng.randint(0, 5)))
+    return text[:start] + insertion + text[end:]
+
+
+def token_filter(id_: int, pattern: str) -> TokenFilter:
+    """Return a token filter with no overrides."""
+    return TokenFilter(filter_data(id_, pattern))
+
+
+class ChangedSpanTests(unittest.TestCase):
+    """Test finding where an edit changed a string."""
+
+    def test_changed_span(self):
+        """The parts before and after the span should be identical in both strings."""
+        test_cases = (
+            ("hello world", "hello there world", (6, 6, 12)),
+            ("hello world", "hello", (5, 11, 5)),
+            ("same", "same", (4, 4, 4)),
+            ("aaa", "aaaa", (3, 3, 4)),
+            ("", "new", (0, 0, 3)),
+            ("abc", "xyz", (0, 3, 3)),
+        )
+
+        for old, new, span in test_cases:
+            with self.subTest(old=old, new=new):
+                self.assertTupleEqual(changed_span(old, new), span)
+
+
+class TokenEditScanningTests(unittest.TestCase):
+    """Test that searching around an edit is equivalent to searching the entire text."""
+
+    def test_match_bounds(self):
+        """The bounds should account for lookarounds and anchors, and be None for unbounded patterns."""
+        test_cases = (
+            ("hi", (2, 0)),
+            (r"bla\d{2,4}", (7, 0)),
+            (r"\bfoo", (3, 2)),
+            (r"(?<=abc)d", (1, 3)),
+            (r"a+", None),
+            (r"a(?=b*)", None),
+            (r"(unclosed", None),
+        )
+
+        for pattern, bounds in test_cases:
+            with self.subTest(pattern=pattern):
+                self.assertEqual(match_bounds(pattern), bounds)
+
+    def test_edits_are_equivalent_to_full_scans(self):
+        """After random edits, the local patterns should be found exactly when they would be in the entire text."""
+        filters = [token_filter(i, pattern) for i, pattern in enumerate(TOKEN_PATTERNS)]
+        matcher = TokenMatcher(filters)
+        rng = random.Random(0)
+
+        for _ in range(200):
+            text = "".join(rng.choices("abcx \n", k=rng.randint(0, 40)))
+            local_found = matcher.search(text)[1]
+            for _ in range(10):
+                new_text = random_edit(rng, text, "abcx \n")
+                full_candidates, full_found = matcher.search(new_text)
+                if local_found:
+                    # The differential search only applies when the previous text was clean.
+                    text, local_found = new_text, full_found
+                    continue
+
+                start, _, end = changed_span(text, new_text)
+                candidates, found = matcher.search(new_text, (start, end))
+                with self.subTest(text=text, new_text=new_text):
+                    self.assertIs(found, full_found)
+                    self.assertListEqual(candidates, full_candidates)
+                    for filter_ in filters:
+                        if re.search(filter_.content, new_text, re.IGNORECASE):
+                            self.assertIn(filter_, candidates)
+                text, local_found = new_text, found
+
+
+class TokensListEditTests(unittest.IsolatedAsyncioTestCase):
+    """Test that the tokens list remembers clean scans of messages."""
+
+    def setUp(self):
+        """Sets up a token list and a message."""
+        self.filter_list = TokensList(MagicMock())
+        self.filter_list.add_list(list_data([filter_data(1, "spam")]))
+        self.member = MockMember(id=123)
+        self.channel = MockTextChannel(id=345)
+        self.message = MockMessage(id=1, author=self.member, channel=self.channel)
+
+    def ctx(self, event: Event, content: str) -> FilterContext:
+        """Return a context of the message with the given content."""
+        return FilterContext(event, self.member, self.channel, content, self.message, message_cache=MagicMock())
+
+    async def test_edits_of_clean_messages_are_scanned_around_the_edit(self):
+        """Once a message was scanned clean, an edit should only be scanned around the changed span."""
+        await self.filter_list.actions_for(self.ctx(Event.MESSAGE, "hello there"))
+        self.assertEqual(self.filter_list._edit_span(self.ctx(Event.MESSAGE_EDIT, ""), "hello spam there"), (6, 11))
+
+        _, _, triggers = await self.filter_list.actions_for(self.ctx(Event.MESSAGE_EDIT, "hello spam there"))
+        self.assertListEqual([filter_.content for filter_ in triggers[ListType.DENY]], ["spam"])
+        self.assertIsNone(self.filter_list._clean_scans.get(self.message.id))
+
+    async def test_scans_are_discarded_when_the_list_changes(self):
+        """A scan made with different filters can't be used."""
+        await self.filter_list.actions_for(self.ctx(Event.MESSAGE, "hello there"))
+        self.filter_list.remove_filter(ListType.DENY, 1)
+
+        self.assertIsNone(self.filter_list._edit_span(self.ctx(Event.MESSAGE_EDIT, ""), "hello spam there"))
+
+
+class DomainEditScanningTests(unittest.IsolatedAsyncioTestCase):
+    """Test that rescanning only the edited part of a message finds the same URLs as scanning the entire text."""
+
+    def test_random_edits(self):
+        """After random edits, the same URLs should be found as when scanning the entire text."""
+        filter_list = DomainsList(MagicMock())
+        member = MockMember(id=123)
+        channel = MockTextChannel(id=345)
+        message = MockMessage(id=1, author=member, channel=channel)
+        rng = random.Random(0)
+        words = ["https://", "http://", "bad.com", "/", ")", "(", " ", "x", ".", "evil", "\t"]
+
+        text = ""
+        for _ in range(1000):
+            start = rng.randint(0, len(text))
+            end = rng.randint(start, min(len(text), start + 10))
+            text = text[:start] + "".join(rng.choices(words, k=rng.randint(0, 4))) + text[end:]
+            ctx = FilterContext(Event.MESSAGE_EDIT, member, channel, text, message)
+
+            with self.subTest(text=text):
+                self.assertListEqual(filter_list._find_urls(ctx, text), _urls_in(text))
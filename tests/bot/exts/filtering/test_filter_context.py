@@ -0,0 +1,50 @@
+import unittest
+from unittest.mock import patch
+
+from bot.exts.filtering import _filter_context
+from bot.exts.filtering._utils import clean_input, expand_spoilers
+from tests.bot.exts.filtering.helpers import message_context
+
+
+class FilterContextTests(unittest.TestCase):
+    """Test the FilterContext class."""
+
+    def setUp(self):
+        """Sets up a fresh context for each test."""
+        self.ctx = message_context()
+
+    def test_normalized_content_matches_clean_input(self):
+        """Each variant of the normalized content should be the same as cleaning the content directly."""
+        test_cases = (
+            "plain text",
+            "multiple\nlines\\n with%0Aquoted​ newlines",
+            "z̀ál̂g̃o",
+            "a ||spoilered\nword|| and ||another||",
+        )
+
+        for content in test_cases:
+            ctx = self.ctx.replace(content=content)
+            expanded = expand_spoilers(content) if "||" in content else content
+            for keep_newlines in (False, True):
+                with self.subTest(content=content, keep_newlines=keep_newlines):
+                    self.assertEqual(
+                        ctx.normalized_content(keep_newlines=keep_newlines),
+                        clean_input(content, keep_newlines=keep_newlines)
+                    )
+                    self.assertEqual(
+                        ctx.normalized_content(keep_newlines=keep_newlines, expand_spoilers=True),
+                        clean_input(expanded, keep_newlines=keep_newlines)
+                    )
+
+    def test_normalized_content_is_computed_once(self):
+        """Replaced contexts should share the normalized variants, but a new content should be normalized again."""
+        ctx = self.ctx.replace(content="some\ncontent")
+
+        with patch.object(_filter_context, "clean_input", wraps=clean_input) as clean:
+            ctx.normalized_content(keep_newlines=True)
+            ctx.replace(matches=[]).normalized_content()
+            ctx.normalized_content(expand_spoilers=True)
+            self.assertEqual(clean.call_count, 1)
+
+            ctx.replace(content="other content").normalized_content()
+            self.assertEqual(clean.call_count, 2)
@@ -0,0 +1,148 @@
+import random
+import unittest
+from unittest.mock import MagicMock
+
+from bot.exts.filtering._filter_index import IndexedFilters
+from bot.exts.filtering._filter_lists.domain import DomainsList
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from bot.exts.filtering._filters.token import TokenFilter
+from bot.exts.filtering._utils import repr_equals
+from bot.exts.filtering.filtering import Filtering
+from tests.bot.exts.filtering.helpers import filter_data, list_data
+from tests.helpers import MockBot
+
+
+def matches(text: str, query: str) -> bool:
+    """Check whether the text matches the query the slow way."""
+    text, query = text.casefold(), query.casefold()
+    if query.startswith("*") and len(query) > 1 and query.endswith("*"):
+        return query[1:-1] in text
+    if query.startswith("*"):
+        return text.endswith(query[1:])
+    if query.endswith("*"):
+        return text.startswith(query[:-1])
+    return text == query
+
+
+class IndexedFiltersTests(unittest.TestCase):
+    """Test searching the text of filters through the index."""
+
+    def test_search_text(self):
+        """The index should find the same filters as checking each one, as filters are added, replaced and removed."""
+        rng = random.Random(0)
+        filters = IndexedFilters()
+
+        def random_text(max_length: int) -> str:
+            return "".join(rng.choices("abAB.", k=rng.randint(0, max_length)))
+
+        for _ in range(300):
+            id_ = rng.randint(1, 60)
+            if rng.random() < 0.3:
+                filters.pop(id_, None)
+            else:
+                description = random_text(8) if rng.random() < 0.8 else None
+                filters[id_] = TokenFilter(filter_data(id_, random_text(6), description))
+
+            query = random_text(4)
+            query = rng.choice((query, f"{query}*", f"*{query}", f"*{query}*"))
+            for field in ("content", "description"):
+                with self.subTest(query=query, field=field):
+                    expected = {
+                        filter_.id for filter_ in filters.values() if matches(getattr(filter_, field) or "", query)
+                    }
+                    self.assertSetEqual(filters.search_text(field, query), expected)
+
+    def test_update_and_clear_keep_the_index_consistent(self):
+        """Filters added with `update` should be found, and none should be found after clearing."""
+        filters = IndexedFilters({1: TokenFilter(filter_data(1, "discord"))})
+        filters.update({2: TokenFilter(filter_data(2, "discordapp"))})
+
+        self.assertSetEqual(filters.search_text("content", "disc*"), {1, 2})
+        filters.clear()
+        self.assertSetEqual(filters.search_text("content", "disc*"), set())
+
+
+    def test_every_mutator_keeps_the_index_consistent(self):
+        """Filters should be found by the index after any change, exactly when they're in the mapping."""
+        def assert_consistent(filters: IndexedFilters) -> None:
+            expected = {id_ for id_, filter_ in filters.items() if filter_.content.startswith("disc")}
+            self.assertSetEqual(filters.search_text("content", "disc*"), expected)
+            self.assertSetEqual(filters.search_text("content", "*cord*"), expected)
+
+        filters = IndexedFilters({1: TokenFilter(filter_data(1, "discord"))})
+        mutations = (
+            lambda: filters.setdefault(2, TokenFilter(filter_data(2, "discordapp"))),
+            lambda: filters.setdefault(2, TokenFilter(filter_data(2, "unused"))),
+            lambda: filters.__ior__({3: TokenFilter(filter_data(3, "discord.gg"))}),
+            lambda: filters.update([(1, TokenFilter(filter_data(1, "other")))]),
+            lambda: filters.pop(3),
+            lambda: filters.pop(3, None),
+            filters.popitem,
+        )
+        for mutation in mutations:
+            mutation()
+            assert_consistent(filters)
+
+        filters |= {4: TokenFilter(filter_data(4, "discord.com"))}
+        assert_consistent(filters)
+        copied = filters.copy()
+        del copied[4]
+        assert_consistent(copied)
+        assert_consistent(filters)
+        self.assertIn(4, filters)
+
+
+class SearchFilterListTests(unittest.TestCase):
+    """Test that searching a filter list with the index finds the same filters as checking each filter."""
+
+    def test_sequence_overrides_are_compared_regardless_of_order(self):
+        """Sequences with the same items in a different order should be equal, and different items shouldn't."""
+        self.assertTrue(repr_equals(["2", "1"], {1, 2}))
+        self.assertTrue(repr_equals({"a", "b", "c"}, ["c", "b", "a"]))
+        self.assertFalse(repr_equals(["2", "3"], {1, 2}))
+        self.assertFalse(repr_equals(["1"], {1, 2}))
+
+    def test_search_matches_linear_scan(self):
+        """The search results should be the filters matching the query, regardless of the index."""
+        rng = random.Random(0)
+        cog = Filtering(MockBot())
+        filter_list = DomainsList(MagicMock())
+        atomic_list = filter_list.add_list(list_data([], settings={"filter_dm": True, "bypass_roles": ["1"]}))
+        for id_ in range(200):
+            settings = {}
+            if rng.random() < 0.5:
+                settings["filter_dm"] = rng.choice((True, False))
+            if rng.random() < 0.5:
+                settings["bypass_roles"] = rng.choice((["1"], ["2"], ["1", "2"]))
+            filter_list.add_filter(ListType.DENY, filter_data(
+                id_, f"{rng.choice(('a', 'b'))}{id_}.com", rng.choice(("phishing", "spam", None)), settings=settings,
+                additional_settings={"only_subdomains": rng.choice((True, False))}
+            ))
+
+        queries = (
+            ({"filter_dm": False}, {}, {}),
+            ({"filter_dm": True}, {}, {}),
+            ({"bypass_roles": ["2", "1"]}, {"only_subdomains": True}, {}),
+            ({"filter_dm": False}, {}, {"description": "*ish*"}),
+            ({}, {}, {"content": "a1*"}),
+            ({}, {}, {}),
+        )
+        for settings, filter_settings, text_query in queries:
+            with self.subTest(settings=settings, filter_settings=filter_settings, text_query=text_query):
+                expected = []
+                for filter_ in atomic_list.filters.values():
+                    if any(
+                        not matches(getattr(filter_, field) or "", query) for field, query in text_query.items()
+                    ):
+                        continue
+                    differ_by_default = {
+                        name for name, value in settings.items()
+                        if not repr_equals(atomic_list.defaults.dict()[name], value)
+                    }
+                    if cog._filter_match_query(filter_, settings, filter_settings, differ_by_default):
+                        expected.append(filter_)
+
+                results = cog._search_filter_list(atomic_list, None, settings, filter_settings, text_query)
+
+                self.assertTrue(expected)
+                self.assertListEqual(results, sorted(expected, key=lambda filter_: filter_.id))
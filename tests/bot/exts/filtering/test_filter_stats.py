@@ -0,0 +1,43 @@
+import unittest
+from unittest.mock import MagicMock
+
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from bot.exts.filtering._filter_lists.token import TokensList
+from bot.exts.filtering._filter_stats import FilterStats
+from tests.bot.exts.filtering.helpers import filter_data, list_data, message_context
+
+
+class FilterStatsTests(unittest.IsolatedAsyncioTestCase):
+    """Test the measurement of filter evaluations."""
+
+    def setUp(self):
+        """Sets up fresh objects for each test."""
+        self.filter_list = TokensList(MagicMock())
+        self.filter_list.add_list(list_data([filter_data(1, "spam"), filter_data(2, "eggs"), filter_data(3, "ham")]))
+        self.atomic_list = self.filter_list[ListType.DENY]
+        self.ctx = message_context()
+
+    async def test_evaluations_are_only_recorded_when_sampled(self):
+        """Filters should only be measured when the context holds the stats."""
+        stats = FilterStats(MagicMock(), sample_rate=1)
+
+        await self.atomic_list.filter_list_result(self.ctx.replace(content="spam"))
+        self.assertDictEqual(stats.filters, {})
+
+        await self.atomic_list.filter_list_result(self.ctx.replace(content="spam", filter_stats=stats))
+        await self.atomic_list.filter_list_result(self.ctx.replace(content="spam and eggs", filter_stats=stats))
+
+        self.assertListEqual([stats.filters[id_].calls for id_ in (1, 2, 3)], [2, 2, 2])
+        self.assertListEqual([stats.filters[id_].hits for id_ in (1, 2, 3)], [2, 1, 0])
+        self.assertListEqual([filter_id for filter_id, _ in stats.noisiest(5)], [1, 2])
+        self.assertEqual(len(stats.slowest(2)), 2)
+        stats.stats.incr.assert_any_call("filters.hits.token.1")
+
+    def test_sample_rate(self):
+        """A sample rate of 0 should never sample, and a rate of 1 should always sample."""
+        disabled = FilterStats(MagicMock(), sample_rate=0)
+        enabled = FilterStats(MagicMock(), sample_rate=1)
+
+        self.assertFalse(any(disabled.sample() for _ in range(100)))
+        self.assertTrue(all(enabled.sample() for _ in range(100)))
+        self.assertEqual(enabled.sampled_events, 100)
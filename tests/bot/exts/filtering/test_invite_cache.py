@@ -0,0 +1,111 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from discord import NotFound
+
+from bot.exts.filtering._filter_lists.invite import InviteCache, ResolvedInvite
+from tests.helpers import MockBot
+
+BOT = MockBot()
+
+
+@patch("bot.instance", BOT)
+class InviteCacheTests(unittest.IsolatedAsyncioTestCase):
+    """Test the InviteCache class."""
+
+    def setUp(self):
+        """Sets up a fresh cache and request mock for each test."""
+        self.cache = InviteCache(ttl=60, not_found_ttl=10, maxsize=2)
+        BOT.fetch_invite = AsyncMock(side_effect=lambda code: MagicMock(code=code))
+
+    async def test_resolved_invites_are_cached(self):
+        """A code should only be fetched once while its entry hasn't expired."""
+        first = await self.cache.fetch("python")
+        second = await self.cache.fetch("python")
+
+        self.assertIs(first, second)
+        BOT.fetch_invite.assert_awaited_once_with("python")
+
+    async def test_not_found_invites_are_cached(self):
+        """Codes which don't resolve should be cached as None."""
+        BOT.fetch_invite.side_effect = NotFound(MagicMock(status=404), "Unknown Invite")
+
+        self.assertIsNone(await self.cache.fetch("bad"))
+        self.assertIsNone(await self.cache.fetch("bad"))
+        BOT.fetch_invite.assert_awaited_once_with("bad")
+
+    async def test_expired_entries_are_fetched_again(self):
+        """An expired entry should cause the code to be fetched again."""
+        with patch("bot.exts.filtering._filter_lists.invite.monotonic", return_value=0):
+            await self.cache.fetch("python")
+        with patch("bot.exts.filtering._filter_lists.invite.monotonic", return_value=61):
+            await self.cache.fetch("python")
+
+        self.assertEqual(BOT.fetch_invite.await_count, 2)
+
+    async def test_concurrent_lookups_share_a_request(self):
+        """Concurrent lookups of the same code should only make one request."""
+        release = asyncio.Event()
+
+        async def slow_fetch(code):
+            await release.wait()
+            return MagicMock(code=code)
+
+        BOT.fetch_invite.side_effect = slow_fetch
+        lookups = [asyncio.create_task(self.cache.fetch("python")) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*lookups)
+
+        self.assertIsNotNone(results[0])
+        self.assertTrue(all(result is results[0] for result in results))
+        BOT.fetch_invite.assert_awaited_once_with("python")
+
+    async def test_least_recently_used_entry_is_evicted(self):
+        """When the cache is full, the least recently used code should be evicted."""
+        await self.cache.fetch("first")
+        await self.cache.fetch("second")
+        await self.cache.fetch("first")
+        await self.cache.fetch("third")
+
+        await self.cache.fetch("first")
+        self.assertEqual(BOT.fetch_invite.await_count, 3)
+        await self.cache.fetch("second")
+        self.assertEqual(BOT.fetch_invite.await_count, 4)
+
+    async def test_only_the_parts_used_for_filtering_are_cached(self):
+        """The cache should hold a small record of the invite rather than the invite itself."""
+        guild = MagicMock(id=42, features=["PARTNERED"], icon=None)
+        guild.name = "Python"
+        BOT.fetch_invite.side_effect = lambda code: MagicMock(
+            code=code, guild=guild, approximate_member_count=10, approximate_presence_count=5
+        )
+
+        invite = await self.cache.fetch("python")
+
+        self.assertEqual(
+            invite,
+            ResolvedInvite(
+                "python", group_dm=False, guild_id=42, features=frozenset({"PARTNERED"}), guild_name="Python",
+                member_count=10, presence_count=5
+            )
+        )
+
+    async def test_group_dm_invites(self):
+        """Invites without a guild should be recorded as group DMs."""
+        BOT.fetch_invite.side_effect = lambda code: MagicMock(code=code, guild=None)
+
+        invite = await self.cache.fetch("friends")
+
+        self.assertTrue(invite.group_dm)
+        self.assertIsNone(invite.guild_id)
+
+    async def test_failed_lookups_raise_and_are_not_cached(self):
+        """Errors other than the invite not being found should reach the callers, and not be cached."""
+        BOT.fetch_invite.side_effect = [RuntimeError("Discord is down"), MagicMock(code="python")]
+
+        with self.assertRaises(RuntimeError):
+            await self.cache.fetch("python")
+        self.assertIsNotNone(await self.cache.fetch("python"))
+        self.assertEqual(BOT.fetch_invite.await_count, 2)
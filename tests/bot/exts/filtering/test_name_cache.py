@@ -0,0 +1,106 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import arrow
+
+from bot.exts.filtering._filter_context import Event, FilterContext
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from bot.exts.filtering._filter_lists.token import TokensList
+from bot.exts.filtering.filtering import Filtering
+from tests.bot.exts.filtering.helpers import filter_data, list_data
+from tests.helpers import MockBot, MockCategoryChannel, MockMember, MockRole, MockTextChannel
+
+
+class NameVerdictCacheTests(unittest.IsolatedAsyncioTestCase):
+    """Test skipping the filtering of display names which were already found clean."""
+
+    def setUp(self):
+        """Sets up a cog with a token list, and mocks the alert and its rate limit."""
+        self.cog = Filtering(MockBot())
+        self.filter_list = TokensList(self.cog)
+        self.cog.filter_lists[self.filter_list.name] = self.filter_list
+        self.filter_list.add_list(list_data([filter_data(1, "badname")], updated_at=arrow.utcnow().timestamp()))
+        self.cog._send_alert = AsyncMock()
+        self.cog._recently_alerted_name = AsyncMock(return_value=False)
+        self.member = MockMember(id=123, roles=[MockRole(id=1)])
+
+    async def check_name(
+        self, name: str, member: MockMember | None = None, channel: MockTextChannel | None = None
+    ) -> None:
+        """Check the display name of the member, or of the default member if one isn't given."""
+        ctx = FilterContext(Event.NICKNAME, member or self.member, channel, name, None)
+        await self.cog._check_bad_display_name(ctx)
+
+    async def test_clean_names_are_only_filtered_once(self):
+        """A name which didn't trigger anything shouldn't be filtered, or checked against Redis, again."""
+        with patch.object(self.cog, "_resolve_action", wraps=self.cog._resolve_action) as resolve_action:
+            await self.check_name("goodname")
+            await self.check_name("goodname")
+
+        resolve_action.assert_awaited_once()
+        self.cog._recently_alerted_name.assert_awaited_once()
+
+    async def test_triggering_names_are_filtered_every_time(self):
+        """A name which triggered a filter shouldn't be remembered."""
+        with patch.object(self.cog, "_resolve_action", wraps=self.cog._resolve_action) as resolve_action:
+            await self.check_name("badname")
+            await self.check_name("badname")
+
+        self.assertEqual(resolve_action.await_count, 2)
+        self.assertEqual(len(self.cog._clean_names), 0)
+
+    async def test_verdicts_are_discarded_when_the_list_changes(self):
+        """Once a filter is added, names found clean before it should be filtered again."""
+        await self.check_name("sneakyname")
+        self.assertEqual(len(self.cog._clean_names), 1)
+        self.filter_list.add_filter(ListType.DENY, filter_data(2, "sneaky"))
+
+        with patch.object(self.cog, "_resolve_action", wraps=self.cog._resolve_action) as resolve_action:
+            await self.check_name("sneakyname")
+
+        resolve_action.assert_awaited_once()
+        self.assertEqual(len(self.cog._clean_names), 1)
+
+    async def test_verdicts_depend_on_roles(self):
+        """The same name should be filtered again for a member with different roles."""
+        await self.check_name("goodname")
+
+        with patch.object(self.cog, "_resolve_action", wraps=self.cog._resolve_action) as resolve_action:
+            await self.check_name("goodname", MockMember(id=456, roles=[MockRole(id=2)]))
+
+        resolve_action.assert_awaited_once()
+
+    async def test_verdicts_depend_on_the_channel(self):
+        """A name found clean where the list is disabled should still be filtered in other channels."""
+        self.filter_list.add_list(list_data(
+            [filter_data(1, "badname")],
+            settings={
+                "channel_scope": {
+                    "disabled_channels": ["1"], "disabled_categories": [], "enabled_channels": [],
+                    "enabled_categories": []
+                }
+            },
+            updated_at=arrow.utcnow().timestamp(),
+        ))
+        category = MockCategoryChannel(id=10)
+        disabled = MockTextChannel(id=1, category=category)
+        enabled = MockTextChannel(id=2, category=category)
+
+        await self.check_name("badname", channel=disabled)
+        self.assertEqual(len(self.cog._clean_names), 1)
+
+        with patch.object(self.cog, "_resolve_action", wraps=self.cog._resolve_action) as resolve_action:
+            await self.check_name("badname", channel=enabled)
+
+        resolve_action.assert_awaited_once()
+        self.assertEqual(len(self.cog._clean_names), 1)
+
+    async def test_cache_is_bounded(self):
+        """The least recently used names should be discarded once the cache is full."""
+        with patch("bot.constants.Filtering.name_cache_size", 2):
+            await self.check_name("first")
+            await self.check_name("second")
+            await self.check_name("first")
+            await self.check_name("third")
+
+        self.assertListEqual([key[0] for key in self.cog._clean_names], ["first", "third"])
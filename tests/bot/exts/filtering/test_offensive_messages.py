@@ -0,0 +1,96 @@
+import asyncio
+import datetime
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+import arrow
+import discord
+
+from bot.exts.filtering._offensive_messages import OffensiveMessageDeleter
+from tests.helpers import MockBot, MockTextChannel
+
+
+def record(id_: int, channel_id: int, delete_at: datetime.datetime) -> dict:
+    """Return a record of an offensive message as returned by the site."""
+    return {"id": id_, "channel_id": channel_id, "delete_date": delete_at.isoformat()}
+
+
+def message_id(age: datetime.timedelta) -> int:
+    """Return the ID of a message sent the given time ago."""
+    return discord.utils.time_snowflake(arrow.utcnow().datetime - age)
+
+
+class OffensiveMessageDeleterTests(unittest.IsolatedAsyncioTestCase):
+    """Test the scheduled deletion of offensive messages."""
+
+    def setUp(self):
+        """Sets up a deleter with two channels."""
+        self.bot = MockBot()
+        self.channels = {id_: MockTextChannel(id=id_) for id_ in (1, 2)}
+        for channel in self.channels.values():
+            channel.get_partial_message.return_value.delete = AsyncMock()
+        self.bot.get_channel.side_effect = self.channels.get
+        self.deleter = OffensiveMessageDeleter(self.bot)
+        self.now = arrow.utcnow().datetime
+
+    def test_due_messages_are_popped_in_order(self):
+        """Messages due by the given time, or shortly after it, should be popped by their deletion date."""
+        self.deleter.schedule(record(3, 1, self.now + datetime.timedelta(seconds=30)))
+        self.deleter.schedule(record(1, 1, self.now - datetime.timedelta(days=1)))
+        self.deleter.schedule(record(2, 2, self.now))
+        self.deleter.schedule(record(2, 2, self.now))
+        self.deleter.schedule(record(4, 1, self.now + datetime.timedelta(hours=1)))
+
+        due = self.deleter.pop_due(self.now)
+
+        self.assertListEqual([message.id for message in due], [1, 2, 3])
+        self.assertEqual(len(self.deleter), 1)
+
+    async def test_messages_are_bulk_deleted_per_channel(self):
+        """Recent messages should be bulk deleted in each channel, and older ones deleted one by one."""
+        recent = [message_id(datetime.timedelta(days=7, seconds=i)) for i in range(150)]
+        old = message_id(datetime.timedelta(days=20))
+        for id_ in recent:
+            self.deleter.schedule(record(id_, 1, self.now))
+        self.deleter.schedule(record(old, 1, self.now))
+        self.deleter.schedule(record(recent[0] + 1, 2, self.now))
+
+        await self.deleter.delete(self.deleter.pop_due(self.now))
+
+        bulk_deleted = [
+            [message.id for message in call.args[0]] for call in self.channels[1].delete_messages.await_args_list
+        ]
+        self.assertListEqual([len(batch) for batch in bulk_deleted], [100, 50])
+        self.assertCountEqual([id_ for batch in bulk_deleted for id_ in batch], recent)
+        self.channels[1].get_partial_message.assert_called_once_with(old)
+        self.channels[1].get_partial_message.return_value.delete.assert_awaited_once()
+        self.channels[2].delete_messages.assert_awaited_once()
+        self.assertCountEqual(
+            [call.args[0] for call in self.bot.api_client.delete.await_args_list],
+            [f"bot/offensive-messages/{id_}" for id_ in (*recent, old, recent[0] + 1)]
+        )
+
+    async def test_failed_deletions_still_remove_the_records(self):
+        """The record should be removed from the site even if the message couldn't be deleted."""
+        self.channels[1].delete_messages.side_effect = discord.NotFound(MagicMock(status=404), "Unknown Message")
+        self.deleter.schedule(record(message_id(datetime.timedelta(days=7)), 1, self.now))
+
+        with self.assertLogs("bot.exts.filtering._offensive_messages", "WARNING"):
+            await self.deleter.delete(self.deleter.pop_due(self.now))
+
+        self.bot.api_client.delete.assert_awaited_once()
+
+    async def test_timer_waits_for_the_earliest_message(self):
+        """Scheduling an earlier message should wake up the timer waiting for a later one."""
+        self.deleter.delete = AsyncMock()
+        self.deleter.schedule(record(1, 1, self.now + datetime.timedelta(days=1)))
+        self.deleter.start()
+        self.addCleanup(self.deleter.stop)
+        await asyncio.sleep(0)
+
+        self.deleter.schedule(record(2, 1, self.now))
+        await asyncio.sleep(0.01)
+
+        self.deleter.delete.assert_awaited_once()
+        self.assertListEqual([message.id for message in self.deleter.delete.await_args.args[0]], [2])
+        self.assertEqual(len(self.deleter), 1)
@@ -0,0 +1,133 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from bot.exts.filtering._filter_context import Event
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from bot.exts.filtering._filter_lists.token import TokensList
+from bot.exts.filtering._settings import ActionSettings
+from bot.exts.filtering.filtering import Filtering
+from tests.bot.exts.filtering.helpers import filter_data, list_data, message_context
+from tests.helpers import MockBot
+
+
+def mock_list(
+    name: str,
+    *,
+    io_bound: bool = False,
+    match: str | None = None,
+    delay: float = 0,
+    actions=None,
+    possible_actions=None,
+):
+    """Return a mock filter list which adds `match` to the context's matches after `delay` seconds."""
+    filter_list = MagicMock(io_bound=io_bound)
+    filter_list.name = name
+    filter_list.possible_actions.return_value = possible_actions if possible_actions is not None else actions
+
+    async def actions_for(ctx):
+        await asyncio.sleep(delay)
+        if match:
+            ctx.matches.append(match)
+        return actions, [match] if match else [], {ListType.DENY: [match] if match else []}
+
+    filter_list.actions_for = AsyncMock(side_effect=actions_for)
+    return filter_list
+
+
+class ResolveActionTests(unittest.IsolatedAsyncioTestCase):
+    """Test the evaluation of the subscribed filter lists."""
+
+    def setUp(self):
+        """Sets up a fresh cog and context for each test."""
+        self.cog = Filtering(MockBot())
+        self.ctx = message_context()
+
+    async def test_io_bound_lists_are_merged_in_subscription_order(self):
+        """The outputs of concurrently evaluated lists should be merged in subscription order, not completion order."""
+        lists = [
+            mock_list("slow", io_bound=True, match="slow", delay=0.02),
+            mock_list("cpu", match="cpu"),
+            mock_list("fast", io_bound=True, match="fast"),
+        ]
+        for filter_list in lists:
+            self.cog.subscribe(filter_list, Event.MESSAGE)
+
+        _, messages, _ = await self.cog._resolve_action(self.ctx)
+
+        self.assertListEqual(self.ctx.matches, ["cpu", "slow", "fast"])
+        self.assertListEqual(list(messages), [lists[0], lists[1], lists[2]])
+
+    async def test_failing_lists_are_isolated(self):
+        """A list which raises or times out shouldn't prevent the results of the other lists."""
+        failing = mock_list("failing", io_bound=True)
+        failing.actions_for.side_effect = ValueError
+        slow = mock_list("slow", io_bound=True, match="slow", delay=1)
+        working = mock_list("working", io_bound=True, match="working")
+        for filter_list in (failing, slow, working):
+            self.cog.subscribe(filter_list, Event.MESSAGE)
+
+        with (
+            patch("bot.exts.filtering.filtering.constants.Filtering.list_evaluation_timeout", 0.01),
+            patch("bot.exts.filtering.filtering.bot.instance", MockBot()),
+        ):
+            _, messages, _ = await self.cog._resolve_action(self.ctx)
+
+        self.assertListEqual(self.ctx.matches, ["working"])
+        self.assertListEqual(list(messages), [working])
+
+    async def test_cancelled_lists_are_skipped(self):
+        """A list whose evaluation is cancelled should be skipped, rather than its result being unpacked."""
+        cancelled = mock_list("cancelled", io_bound=True, match="cancelled")
+        cancelled.actions_for.side_effect = asyncio.CancelledError
+        working = mock_list("working", io_bound=True, match="working")
+        for filter_list in (cancelled, working):
+            self.cog.subscribe(filter_list, Event.MESSAGE)
+
+        _, messages, _ = await self.cog._resolve_action(self.ctx)
+
+        self.assertListEqual(self.ctx.matches, ["working"])
+        self.assertListEqual(list(messages), [working])
+
+    async def test_io_bound_lists_are_skipped_when_deleting(self):
+        """When short circuiting, network bound lists shouldn't be evaluated if the message is deleted anyway."""
+        deletion = ActionSettings.create({"remove_context": True})
+        cpu = mock_list("cpu", match="cpu", actions=deletion)
+        io = mock_list("io", io_bound=True, match="io", actions=deletion)
+        for filter_list in (io, cpu):
+            self.cog.subscribe(filter_list, Event.MESSAGE)
+
+        await self.cog._resolve_action(self.ctx, short_circuit=True)
+        io.actions_for.assert_not_awaited()
+
+        await self.cog._resolve_action(self.ctx)
+        io.actions_for.assert_awaited_once()
+
+    async def test_io_bound_lists_which_could_add_actions_are_evaluated_when_deleting(self):
+        """Network bound lists which could ping, or alert with their triggers, should be evaluated anyway."""
+        deletion = ActionSettings.create({"remove_context": True})
+        test_cases = (
+            {"remove_context": True, "mentions": {"guild_pings": ["Moderators"], "dm_pings": []}},
+            {"remove_context": True, "send_alert": True},
+        )
+
+        for possible_actions in test_cases:
+            with self.subTest(possible_actions=possible_actions):
+                self.cog._subscriptions.clear()
+                cpu = mock_list("cpu", match="cpu", actions=deletion)
+                io = mock_list("io", io_bound=True, possible_actions=ActionSettings.create(possible_actions))
+                for filter_list in (io, cpu):
+                    self.cog.subscribe(filter_list, Event.MESSAGE)
+
+                await self.cog._resolve_action(self.ctx, short_circuit=True)
+                io.actions_for.assert_awaited_once()
+
+    def test_possible_actions_follow_the_list(self):
+        """The possible actions of a list should include every filter's overrides, including those added later."""
+        filter_list = TokensList(MagicMock())
+        defaults = {"remove_context": True, "send_alert": False}
+        filter_list.add_list(list_data([filter_data(1, "spam")], settings=defaults))
+        self.assertFalse(filter_list.possible_actions()["send_alert"].send_alert)
+
+        filter_list.add_filter(ListType.DENY, filter_data(2, "eggs", settings={"send_alert": True}))
+        self.assertTrue(filter_list.possible_actions()["send_alert"].send_alert)
@@ -7,7 +7,7 @@ from bot.exts.filtering._settings_types.actions.infraction_and_notification impo
     InfractionDuration,
 )
 from bot.exts.filtering._settings_types.validations.bypass_roles import RoleBypass
-from bot.exts.filtering._settings_types.validations.channel_scope import ChannelScope
+from bot.exts.filtering._settings_types.validations.channel_scope import ChannelScope, invalidate_channel_verdicts
 from bot.exts.filtering._settings_types.validations.filter_dm import FilterDM
 from tests.helpers import MockCategoryChannel, MockDMChannel, MockMember, MockMessage, MockRole, MockTextChannel
 
@@ -135,6 +135,37 @@ class FilterTests(unittest.TestCase):
 
         self.assertFalse(result)
 
+    def test_channel_scope_matches_names(self):
+        """Channels and categories should also be matched by their names."""
+        channel = MockTextChannel(id=123, name="off-topic", category=MockCategoryChannel(id=234, name="Topical"))
+        scope = ChannelScope(
+            disabled_channels=["off-topic"], disabled_categories=None, enabled_channels=None, enabled_categories=None
+        )
+        self.ctx.channel = channel
+
+        self.assertFalse(scope.triggers_on(self.ctx))
+
+        scope = ChannelScope(
+            disabled_channels=None, disabled_categories=None, enabled_channels=None, enabled_categories=["Topical"]
+        )
+        self.assertTrue(scope.triggers_on(self.ctx))
+
+    def test_channel_scope_verdict_is_invalidated_when_channels_change(self):
+        """A memoized verdict should be reevaluated once channels were invalidated."""
+        category = MockCategoryChannel(id=234)
+        channel = MockTextChannel(id=123, category=category)
+        scope = ChannelScope(
+            disabled_channels=None, disabled_categories=["234"], enabled_channels=None, enabled_categories=None
+        )
+        self.ctx.channel = channel
+        self.assertFalse(scope.triggers_on(self.ctx))
+
+        channel.category = MockCategoryChannel(id=789)
+        self.assertFalse(scope.triggers_on(self.ctx))
+
+        invalidate_channel_verdicts()
+        self.assertTrue(scope.triggers_on(self.ctx))
+
     def test_filtering_dms_when_necessary(self):
         """A filter correctly ignores or triggers in a channel depending on the value of FilterDM."""
         cases = (
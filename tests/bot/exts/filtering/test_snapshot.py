@@ -0,0 +1,90 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import arrow
+
+from bot.exts.filtering import _snapshot
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from bot.exts.filtering._filter_lists.token import TokensList
+from tests.bot.exts.filtering.helpers import filter_data, list_data
+
+
+def token_list_data(updated_at: float | str, stamps: list[tuple[int, float | str]]) -> dict:
+    """Return the data of a token filter list holding filters with the given IDs and update stamps."""
+    filters = [filter_data(id_, f"spam{id_}", updated_at=filter_updated_at) for id_, filter_updated_at in stamps]
+    return list_data(filters, updated_at=updated_at) | {"name": "token"}
+
+
+class SnapshotTests(unittest.TestCase):
+    """Test the local snapshot of the filter lists."""
+
+    def setUp(self):
+        """Sets up a snapshot path in a fresh temporary directory."""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = Path(temp_dir.name) / "cache" / "filter_lists.json"
+
+    def test_written_snapshot_is_read_back(self):
+        """The raw filter lists should be read back as they were written, creating the directory if needed."""
+        raw_filter_lists = [token_list_data(10, [(1, 5), (2, 6)])]
+
+        _snapshot.write_snapshot(self.path, raw_filter_lists)
+
+        self.assertEqual(_snapshot.read_snapshot(self.path), raw_filter_lists)
+        self.assertFalse(self.path.with_name(f"{self.path.name}.tmp").exists())
+
+    def test_missing_snapshot(self):
+        """There's no snapshot to use if the file doesn't exist."""
+        self.assertIsNone(_snapshot.read_snapshot(self.path))
+
+    def test_unusable_snapshots_are_ignored(self):
+        """Corrupt snapshots and snapshots of other versions shouldn't be used."""
+        self.path.parent.mkdir(parents=True)
+        contents = (
+            "{not json",
+            json.dumps([token_list_data(10, [])]),
+            json.dumps({"version": _snapshot.SNAPSHOT_VERSION + 1, "filter_lists": [token_list_data(10, [])]}),
+        )
+
+        for content in contents:
+            with self.subTest(content=content):
+                self.path.write_text(content)
+                self.assertIsNone(_snapshot.read_snapshot(self.path))
+
+    def test_failed_write_is_tolerated(self):
+        """Failing to write the snapshot shouldn't raise."""
+        self.path.parent.mkdir(parents=True)
+        self.path.with_name(f"{self.path.name}.tmp").mkdir()
+
+        with self.assertLogs(_snapshot.log, "ERROR"):
+            _snapshot.write_snapshot(self.path, [token_list_data(10, [])])
+        self.assertFalse(self.path.exists())
+
+    def test_is_list_changed(self):
+        """A list has changed if its stamp, or any of its filters' stamps or IDs, are different."""
+        filter_list = TokensList(MagicMock())
+        filter_list.add_list(token_list_data(10, [(1, 5), (2, 6)]))
+        loaded_list = filter_list[ListType.DENY]
+
+        test_cases = (
+            (token_list_data(10, [(1, 5), (2, 6)]), False),
+            (token_list_data(11, [(1, 5), (2, 6)]), True),
+            (token_list_data(10, [(1, 5), (2, 7)]), True),
+            (token_list_data(10, [(1, 5)]), True),
+            (token_list_data(10, [(1, 5), (2, 6), (3, 6)]), True),
+        )
+
+        for raw_filter_list, changed in test_cases:
+            with self.subTest(raw_filter_list=raw_filter_list, changed=changed):
+                self.assertIs(_snapshot.is_list_changed(raw_filter_list, loaded_list), changed)
+
+    def test_stamps_are_compared_as_times(self):
+        """Differently formatted stamps of the same time shouldn't count as a change."""
+        filter_list = TokensList(MagicMock())
+        filter_list.add_list(token_list_data(10, [(1, 5)]))
+        raw_filter_list = token_list_data(arrow.get(10).isoformat(), [(1, arrow.get(5).isoformat())])
+
+        self.assertFalse(_snapshot.is_list_changed(raw_filter_list, filter_list[ListType.DENY]))
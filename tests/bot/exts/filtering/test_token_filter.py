@@ -1,10 +1,12 @@
 import unittest
+from unittest.mock import MagicMock, patch
 
 import arrow
+from discord.ext.commands import BadArgument
 
 from bot.exts.filtering._filter_context import Event, FilterContext
-from bot.exts.filtering._filters.token import TokenFilter
-from tests.helpers import MockMember, MockMessage, MockTextChannel
+from bot.exts.filtering._filters.token import TokenFilter, is_pathological, match_bounds
+from tests.helpers import MockBot, MockMember, MockMessage, MockTextChannel
 
 
 class TokenFilterTests(unittest.IsolatedAsyncioTestCase):
@@ -47,3 +49,62 @@ class TokenFilterTests(unittest.IsolatedAsyncioTestCase):
                 self.ctx.content = content
                 result = await filter_.triggered_on(self.ctx)
                 self.assertEqual(result, expected)
+
+    def test_is_pathological(self):
+        """Patterns with unbounded quantifiers nested in unbounded quantifiers should be detected."""
+        test_cases = (
+            (r"(a+)+b", True),
+            (r"(\w+\s?)*$", True),
+            (r"(?:x|(y*))+", True),
+            (r"(?=(a+)+)", True),
+            (r"a+b+", False),
+            (r"(ab){2,5}c*", False),
+            (r"(\d{3}-?)+", False),
+            (r"bla\d{2,4}", False),
+        )
+
+        for pattern, expected in test_cases:
+            with self.subTest(pattern=pattern):
+                self.assertEqual(is_pathological(pattern), expected)
+
+    def test_pattern_analysis_fails_safely(self):
+        """If the parser of `re` is unavailable or fails unexpectedly, patterns should be treated as unanalyzable."""
+        with patch("bot.exts.filtering._filters.token.sre_parse", None):
+            self.assertFalse(is_pathological(r"(a+)+b"))
+            self.assertIsNone(match_bounds(r"abc"))
+
+        with patch("bot.exts.filtering._filters.token.sre_parse.parse", side_effect=AttributeError):
+            self.assertFalse(is_pathological(r"(a+)+b"))
+            self.assertIsNone(match_bounds(r"abc"))
+
+    async def test_process_input_rejects_pathological_patterns(self):
+        """Adding a pattern which fails the static check should raise a BadArgument."""
+        with self.assertRaises(BadArgument):
+            await TokenFilter.process_input(r"(a+)+b", "")
+        self.assertEqual(await TokenFilter.process_input(r"a+b", "desc"), (r"a+b", "desc"))
+
+    @patch("bot.instance", MockBot())
+    async def test_filter_is_skipped_after_repeated_timeouts(self):
+        """A filter whose search keeps timing out should be skipped once it reaches the limit."""
+        now = arrow.utcnow().timestamp()
+        filter_ = TokenFilter({
+            "id": 1,
+            "content": "hi",
+            "description": None,
+            "settings": {},
+            "additional_settings": {},
+            "created_at": now,
+            "updated_at": now
+        })
+        filter_.pattern = MagicMock()
+        filter_.pattern.search.side_effect = TimeoutError
+        self.ctx.content = "hi"
+
+        with patch("bot.exts.filtering._filters.token.constants.Filtering.token_timeout_limit", 2):
+            self.assertFalse(await filter_.triggered_on(self.ctx))
+            self.assertFalse(filter_.skipped)
+            self.assertFalse(await filter_.triggered_on(self.ctx))
+            self.assertTrue(filter_.skipped)
+            self.assertFalse(await filter_.triggered_on(self.ctx))
+
+        self.assertEqual(filter_.pattern.search.call_count, 2)
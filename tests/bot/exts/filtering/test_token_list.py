@@ -0,0 +1,125 @@
+import unittest
+from unittest.mock import MagicMock
+
+import arrow
+
+from bot.exts.filtering._filter_lists.filter_list import ListType
+from bot.exts.filtering._filter_lists.token import TokenMatcher, TokensList
+from tests.bot.exts.filtering.helpers import filter_data, list_data, message_context
+
+
+class TokensListTests(unittest.IsolatedAsyncioTestCase):
+    """Test the TokensList class and its compiled matcher."""
+
+    def setUp(self):
+        """Sets up fresh objects for each test."""
+        self.filter_list = TokensList(MagicMock())
+        self.patterns = [r"hi", r"bla\d{2,4}", r"(ab)\1", r"(?i)caps", r"over", r"verlap"]
+        self.filter_list.add_list(
+            list_data([filter_data(i, pattern) for i, pattern in enumerate(self.patterns, start=1)])
+        )
+        self.ctx = message_context()
+
+    def test_non_combinable_patterns_are_always_candidates(self):
+        """Patterns with groups or mid-pattern global flags should be searched for individually."""
+        matcher = self.filter_list._matchers[ListType.DENY]
+
+        self.assertListEqual([filter_.content for filter_ in matcher.fallback], [r"(ab)\1", r"(?i)caps"])
+        self.assertListEqual(matcher.candidates("goodbye"), matcher.fallback)
+
+    async def test_triggers_match_individual_search(self):
+        """The list should trigger the same filters, with the same matches, as searching each pattern separately."""
+        test_cases = (
+            "oh HI there",
+            "bla18 and abab",
+            "overlap",
+            "CAPS",
+            "goodbye",
+            "",
+        )
+
+        for content in test_cases:
+            with self.subTest(content=content):
+                ctx = self.ctx.replace(content=content, matches=[])
+                expected_ctx = self.ctx.replace(content=content, matches=[])
+                expected = [
+                    filter_ for filter_ in self.filter_list[ListType.DENY].filters.values()
+                    if await filter_.triggered_on(expected_ctx)
+                ]
+
+                _, _, triggers = await self.filter_list.actions_for(ctx)
+
+                self.assertListEqual(triggers.get(ListType.DENY, []), expected)
+                self.assertListEqual(ctx.matches, expected_ctx.matches)
+
+    async def test_matcher_is_rebuilt_on_filter_changes(self):
+        """Adding or removing a filter should be reflected in the next evaluation."""
+        ctx = self.ctx.replace(content="a brand new token")
+        _, _, triggers = await self.filter_list.actions_for(ctx)
+        self.assertListEqual(triggers[ListType.DENY], [])
+
+        new_filter = self.filter_list.add_filter(ListType.DENY, filter_data(100, "new token"))
+        _, _, triggers = await self.filter_list.actions_for(ctx.replace(matches=[]))
+        self.assertListEqual(triggers[ListType.DENY], [new_filter])
+
+        self.filter_list.remove_filter(ListType.DENY, 100)
+        _, _, triggers = await self.filter_list.actions_for(ctx.replace(matches=[]))
+        self.assertListEqual(triggers[ListType.DENY], [])
+
+    def test_empty_matcher_has_no_candidates(self):
+        """A matcher with no filters shouldn't return any candidates."""
+        self.assertListEqual(TokenMatcher().candidates("anything"), [])
+
+    def test_editing_a_filter_only_recompiles_on_pattern_changes(self):
+        """Editing anything but the pattern shouldn't recompile the matcher, and the edited filter should be used."""
+        matcher = self.filter_list._matchers[ListType.DENY]
+        matcher.candidates("warm up")
+        combined = matcher.local_pattern
+
+        edited_filter = self.filter_list.add_filter(ListType.DENY, filter_data(1, "hi") | {"description": "edited"})
+        self.assertListEqual(matcher.candidates("hi"), list(self.filter_list[ListType.DENY].filters.values()))
+        self.assertIs(matcher.local_pattern, combined)
+        self.assertIn(edited_filter, matcher.filters)
+
+        self.filter_list.add_filter(ListType.DENY, filter_data(1, "hello"))
+        self.assertIsNot(matcher.candidates("hello"), matcher.fallback)
+        self.assertIsNot(matcher.local_pattern, combined)
+        self.assertListEqual(matcher.candidates("hi"), matcher.fallback)
+
+
+class FilterListUpdateTests(unittest.TestCase):
+    """Test applying an edited list to a loaded filter list."""
+
+    def setUp(self):
+        """Sets up a filter list with a filter which overrides a default setting, and one which doesn't."""
+        self.filter_list = TokensList(MagicMock())
+        self.list_data = list_data(
+            [filter_data(1, "spam"), filter_data(2, "eggs", settings={"remove_context": True})],
+            settings={"send_alert": True, "remove_context": False},
+        )
+        self.atomic_list = self.filter_list.add_list(self.list_data)
+
+    def test_unchanged_settings(self):
+        """Applying the same settings shouldn't change anything but the stamp."""
+        entries = dict(self.atomic_list.defaults.actions)
+        filters = dict(self.atomic_list.filters)
+
+        updated_list = self.filter_list.update_list(self.list_data | {"updated_at": 10})
+
+        self.assertIs(updated_list, self.atomic_list)
+        self.assertEqual(updated_list.updated_at, arrow.get(10))
+        self.assertDictEqual(dict(updated_list.defaults.actions), entries)
+        self.assertDictEqual(dict(updated_list.filters), filters)
+
+    def test_only_overriding_filters_are_recreated(self):
+        """Only filters which override a changed entry should be recreated, and the rest should use the new default."""
+        spam, eggs = self.atomic_list.filters[1], self.atomic_list.filters[2]
+
+        self.filter_list.update_list(self.list_data | {"settings": {"send_alert": False, "remove_context": False}})
+        self.assertIs(self.atomic_list.filters[2], eggs)
+        self.assertFalse(self.atomic_list.default("send_alert"))
+
+        self.filter_list.update_list(self.list_data | {"settings": {"send_alert": False, "remove_context": True}})
+        self.assertIs(self.atomic_list.filters[1], spam)
+        self.assertIsNot(self.atomic_list.filters[2], eggs)
+        self.assertTrue(self.atomic_list.default("remove_context"))
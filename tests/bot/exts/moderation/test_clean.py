@@ -1,7 +1,12 @@
+import asyncio
 import unittest
+from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from bot.exts.moderation.clean import Clean
+import discord
+
+from bot.exts.moderation.clean import Clean, CollectionProgress
+from bot.utils.message_index import MessageIndex
 from tests.helpers import MockBot, MockContext, MockGuild, MockMember, MockMessage, MockRole, MockTextChannel
 
 
@@ -102,3 +107,233 @@ class CleanTests(unittest.IsolatedAsyncioTestCase):
         sent_message = mocked_mods.send.await_args[0][0]
         self.assertIn(self.log_url, sent_message)
         self.assertIn("2 messages", sent_message)
+
+    async def test_deleted_messages_are_logged_when_the_search_fails(self):
+        """If searching fails after some messages were deleted, they should be logged, and the clean should end."""
+        deleted = [MockMessage(id=2), MockMessage(id=1)]
+
+        async def failing_search(*args) -> None:
+            found_batches = args[-1]
+            found_batches.put_nowait(None)
+            raise discord.HTTPException(MagicMock(status=500), "Server Error")
+
+        async def delete_found(found_batches: asyncio.Queue, deleted_messages: list) -> list:
+            await found_batches.get()
+            deleted_messages.extend(deleted)
+            return sorted(deleted_messages, key=lambda message: message.id)
+
+        self.cog._find_messages = AsyncMock(side_effect=failing_search)
+        self.cog._delete_found = AsyncMock(side_effect=delete_found)
+
+        with self.assertRaises(discord.HTTPException):
+            await self.cog._clean_messages(self.ctx, None, first_limit=MockMessage(), attempt_delete_invocation=False)
+
+        self.assertListEqual(self.cog._modlog_cleaned_messages.await_args.args[0], deleted[::-1])
+        self.assertFalse(self.cog.cleaning)
+
+    async def test_deleted_messages_are_logged_when_deleting_fails(self):
+        """If deleting fails after some messages were deleted, they should be logged, and the clean should end."""
+        deleted = MockMessage(id=1)
+
+        async def search(*args) -> None:
+            args[-1].put_nowait(None)
+
+        async def failing_delete_found(found_batches: asyncio.Queue, deleted_messages: list) -> list:
+            deleted_messages.append(deleted)
+            raise discord.HTTPException(MagicMock(status=500), "Server Error")
+
+        self.cog._find_messages = AsyncMock(side_effect=search)
+        self.cog._delete_found = AsyncMock(side_effect=failing_delete_found)
+
+        with self.assertRaises(discord.HTTPException):
+            await self.cog._clean_messages(self.ctx, None, first_limit=MockMessage(), attempt_delete_invocation=False)
+
+        self.assertListEqual(self.cog._modlog_cleaned_messages.await_args.args[0], [deleted])
+        self.assertFalse(self.cog.cleaning)
+
+    def test_messages_are_looked_up_in_the_message_index(self):
+        """Messages should be found in the index by their channel, or by their author if users are cleaned."""
+        now = datetime.now(tz=UTC)
+        channels = [MockTextChannel(id=1), MockTextChannel(id=2), MockTextChannel(id=3)]
+        authors = [MockMember(id=10), MockMember(id=20)]
+        messages = [
+            MockMessage(id=i, channel=channels[i % 3], author=authors[i % 2], created_at=now + timedelta(seconds=i))
+            for i in range(12)
+        ]
+        self.bot.message_index = MessageIndex(maxlen=100)
+        for message in messages:
+            self.bot.message_index.add(message)
+        self.cog.cleaning = True
+        cleaned_channels = {channels[0], channels[1]}
+
+        message_mappings, _ = self.cog._get_messages_from_cache(
+            cleaned_channels, lambda message: message.id != 7, now + timedelta(seconds=2)
+        )
+        self.assertDictEqual(message_mappings, {channels[0]: messages[9:2:-3], channels[1]: messages[10:3:-6]})
+
+        message_mappings, message_ids = self.cog._get_messages_from_cache(
+            cleaned_channels, lambda _: True, now, users=[authors[0]]
+        )
+        self.assertDictEqual(message_mappings, {channels[0]: [messages[6]], channels[1]: messages[10:3:-6]})
+        self.assertCountEqual(message_ids, [4, 6, 10])
+
+
+class HistorySearchTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for searching the histories of channels for messages to clean."""
+
+    def setUp(self):
+        self.cog = Clean(MockBot())
+        self.cog.cleaning = True
+        self.searching = 0
+        self.max_searching = 0
+
+    def channel(self, id_: int, message_count: int, delay: float = 0) -> MockTextChannel:
+        """Return a channel whose history has the given number of messages, each taking `delay` seconds to get."""
+        channel = MockTextChannel(id=id_)
+
+        async def history(**_):
+            self.searching += 1
+            self.max_searching = max(self.max_searching, self.searching)
+            try:
+                for i in range(message_count):
+                    await asyncio.sleep(delay)
+                    yield MockMessage(id=id_ * 100 + i, channel=channel)
+            finally:
+                self.searching -= 1
+
+        channel.history = history
+        return channel
+
+    @patch("bot.exts.moderation.clean.CleanMessages.history_concurrency", 2)
+    async def test_channels_are_searched_concurrently(self):
+        """Up to the configured number of channels should be searched at once, and the results merged per channel."""
+        channels = [self.channel(i, message_count=i) for i in range(1, 6)]
+        progress = MagicMock(spec=CollectionProgress)
+
+        message_mappings, message_ids = await self.cog._get_messages_from_channels(
+            channels, lambda message: message.id % 2 == 0, after=MagicMock(), progress=progress
+        )
+
+        self.assertEqual(self.max_searching, 2)
+        for channel in channels:
+            expected = [message.id for message in message_mappings[channel]]
+            self.assertListEqual(expected, [channel.id * 100 + i for i in range(0, channel.id, 2)])
+        self.assertEqual(len(message_ids), 9)
+        self.assertEqual(progress.channel_searched.await_count, 5)
+
+    async def test_cancelling_stops_the_searches(self):
+        """Cancelling the clean should stop the searches right away, and nothing should be found."""
+        channels = [self.channel(i, message_count=1000, delay=1) for i in range(1, 4)]
+        search = asyncio.create_task(self.cog._get_messages_from_channels(channels, lambda _: True, after=MagicMock()))
+        await asyncio.sleep(0.01)
+
+        with patch.object(self.cog, "_send_expiring_message"), patch.object(self.cog, "_delete_invocation"):
+            await self.cog.clean_cancel.callback(self.cog, MockContext())
+        message_mappings, message_ids = await asyncio.wait_for(search, 1)
+
+        self.assertEqual(self.searching, 0)
+        self.assertFalse(message_mappings)
+        self.assertListEqual(message_ids, [])
+
+    async def test_found_messages_are_batched_during_the_search(self):
+        """Messages should be put in batches for deletion as soon as there are enough, before the search ends."""
+        channel = self.channel(1, message_count=250)
+        found_batches = asyncio.Queue()
+        search = asyncio.create_task(self.cog._get_messages_from_channels(
+            [channel], lambda _: True, after=MagicMock(), found_batches=found_batches
+        ))
+
+        first_channel, first_batch = await found_batches.get()
+        self.assertEqual(self.searching, 1)
+        await search
+
+        batches = [first_batch] + [found_batches.get_nowait()[1] for _ in range(found_batches.qsize())]
+        self.assertIs(first_channel, channel)
+        self.assertListEqual([len(batch) for batch in batches], [100, 100, 50])
+        self.assertListEqual([message.id for batch in batches for message in batch], [100 + i for i in range(250)])
+
+
+class DeletionTests(unittest.IsolatedAsyncioTestCase):
+    """Tests for deleting the batches of messages found by a clean."""
+
+    def setUp(self):
+        self.cog = Clean(MockBot())
+        self.cog.cleaning = True
+        # Messages with odd IDs are too old to be deleted in bulk.
+        self.cog.is_older_than_14d = lambda message: message.id % 2 == 1
+        self.deleting = 0
+        self.max_deleting = 0
+        self.bulk_deleting = set()
+
+    async def deleting_request(self) -> None:
+        """Count a deletion request as ongoing while it waits for a response."""
+        self.deleting += 1
+        self.max_deleting = max(self.max_deleting, self.deleting)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.deleting -= 1
+
+    def channel(self, id_: int) -> MockTextChannel:
+        """Return a channel which records the bulk deletions of each of its messages, one request at a time."""
+        channel = MockTextChannel(id=id_)
+
+        async def delete_messages(messages: list) -> None:
+            self.assertNotIn(id_, self.bulk_deleting)
+            self.bulk_deleting.add(id_)
+            await asyncio.sleep(0.01)
+            self.bulk_deleting.remove(id_)
+
+        channel.delete_messages = AsyncMock(side_effect=delete_messages)
+        return channel
+
+    def message(self, id_: int, channel: MockTextChannel) -> MockMessage:
+        message = MockMessage(id=id_, channel=channel)
+        message.delete = AsyncMock(side_effect=self.deleting_request)
+        return message
+
+    @staticmethod
+    def found(batches: list[tuple]) -> asyncio.Queue:
+        """Return a queue of the given batches, as collected by a finished search."""
+        found_batches = asyncio.Queue()
+        for batch in batches:
+            found_batches.put_nowait(batch)
+        found_batches.put_nowait(None)
+        return found_batches
+
+    async def test_recent_messages_are_deleted_in_bulk_and_old_ones_individually(self):
+        """Recent messages should be bulk deleted per batch, and up to the configured number of old ones at once."""
+        self.cog._individual_deletes = asyncio.Semaphore(3)
+        channels = [self.channel(1), self.channel(2)]
+        batches = [
+            (channel, [self.message(channel.id * 1000 + start + i, channel) for i in range(10)])
+            for start in (0, 10) for channel in channels
+        ]
+
+        deleted = await self.cog._delete_found(self.found(batches))
+
+        for channel in channels:
+            bulk_deleted = [call.args[0] for call in channel.delete_messages.await_args_list]
+            expected = [
+                [message for message in batch if message.id % 2 == 0]
+                for batch_channel, batch in batches if batch_channel is channel
+            ]
+            self.assertListEqual(bulk_deleted, expected)
+        self.assertEqual(self.max_deleting, 3)
+        all_messages = [message for _, batch in batches for message in batch]
+        self.assertListEqual(deleted, sorted(all_messages, key=lambda message: message.id))
+        self.cog.mod_log.ignore.assert_called()
+
+    async def test_cancelling_stops_the_deletions(self):
+        """Batches shouldn't be deleted once the clean is cancelled, and the messages already deleted are returned."""
+        channel = self.channel(1)
+        batches = [(channel, [self.message(start + i, channel) for i in range(0, 10, 2)]) for start in (0, 10, 20)]
+
+        async def cancel_after_first_batch(_: list) -> None:
+            self.cog.cleaning = False
+
+        channel.delete_messages.side_effect = cancel_after_first_batch
+        deleted = await self.cog._delete_found(self.found(batches))
+
+        channel.delete_messages.assert_awaited_once()
+        self.assertListEqual(deleted, batches[0][1])
@@ -1,10 +1,12 @@
 import unittest
+from unittest.mock import MagicMock, patch
 
 import discord
 
 from bot.exts.moderation.modlog import ModLog
+from bot.utils.message_index import MessageIndex
 from bot.utils.modlog import send_log_message
-from tests.helpers import MockBot, MockTextChannel
+from tests.helpers import MockBot, MockMessage, MockTextChannel
 
 
 class ModLogTests(unittest.IsolatedAsyncioTestCase):
@@ -29,3 +31,14 @@ class ModLogTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(
             embed.description, ("foo bar" * 3000)[:4093] + "..."
         )
+
+    async def test_raw_edit_of_indexed_message_is_left_to_the_normal_event(self):
+        """A raw edit of an indexed message shouldn't fetch the message, as it's logged by `on_message_edit`."""
+        self.bot.message_index = MessageIndex(maxlen=10)
+        self.bot.message_index.add(MockMessage(id=1))
+        event = MagicMock(guild_id=1, message_id=1, data={"channel_id": "2"})
+
+        with patch("bot.exts.moderation.modlog.get_or_fetch_channel") as get_or_fetch_channel:
+            await self.cog.on_raw_message_edit(event)
+
+        get_or_fetch_channel.assert_not_called()
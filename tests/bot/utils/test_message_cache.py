@@ -1,7 +1,12 @@
 import unittest
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
 
-from bot.utils.message_cache import MessageCache
-from tests.helpers import MockMessage
+import arrow
+import discord
+
+from bot.utils.message_cache import MessageCache, MessageSnapshot
+from tests.helpers import MockBot, MockMember, MockMessage, MockRole, MockTextChannel, MockUser
 
 
 # noinspection SpellCheckingInspection
@@ -211,3 +216,260 @@ class TestMessageCache(unittest.TestCase):
             with self.subTest(current_loop=current_loop):
                 self.assertEqual(len(cache), min(current_loop, 5))
                 cache.append(MockMessage())
+
+    def test_get_author_messages_follows_cache_order(self):
+        """Test if only the author's messages are returned, in the order of the cache, for both orderings."""
+        authors = [MockMember(id=1), MockMember(id=2)]
+        messages = [MockMessage(id=i, author=authors[i % 2]) for i in range(10)]
+
+        for newest_first in (False, True):
+            cache = MessageCache(maxlen=10, newest_first=newest_first)
+            for msg in messages:
+                cache.append(msg)
+
+            with self.subTest(newest_first=newest_first):
+                expected = [msg for msg in cache if msg.author.id == 1]
+                self.assertListEqual(cache.get_author_messages(1), expected)
+                self.assertListEqual(cache.get_author_messages(3), [])
+
+    def test_author_index_follows_evictions(self):
+        """Test if messages evicted or popped from the cache are removed from the author's messages."""
+        author = MockMember(id=1)
+        other = MockMember(id=2)
+
+        for newest_first in (False, True):
+            cache = MessageCache(maxlen=3, newest_first=newest_first)
+            messages = [MockMessage(id=i, author=author if i != 2 else other) for i in range(5)]
+            for msg in messages:
+                cache.append(msg)
+
+            with self.subTest(newest_first=newest_first):
+                self.assertListEqual(cache.get_author_messages(1), [msg for msg in cache if msg.author.id == 1])
+                cache.pop()
+                cache.popleft()
+                self.assertListEqual(cache.get_author_messages(1), [msg for msg in cache if msg.author.id == 1])
+                self.assertListEqual(cache.get_author_messages(2), [msg for msg in cache if msg.author.id == 2])
+                cache.clear()
+                self.assertListEqual(cache.get_author_messages(1), [])
+
+    def test_get_author_messages_after(self):
+        """Test if only messages created after the given time are returned."""
+        author = MockMember(id=1)
+        now = datetime.now(tz=UTC)
+        messages = [
+            MockMessage(id=i, author=author, created_at=now - timedelta(seconds=10 - i)) for i in range(10)
+        ]
+
+        for newest_first in (False, True):
+            cache = MessageCache(maxlen=10, newest_first=newest_first)
+            for msg in messages:
+                cache.append(msg)
+
+            with self.subTest(newest_first=newest_first):
+                cutoff = now - timedelta(seconds=4)
+                expected = [msg for msg in cache if msg.created_at > cutoff]
+                self.assertListEqual(cache.get_author_messages(1, after=cutoff), expected)
+
+    def test_since(self):
+        """Test if the messages created after the given time are returned in the order of the cache, after wrapping."""
+        now = datetime.now(tz=UTC)
+        messages = [MockMessage(id=i, created_at=now - timedelta(seconds=20 - i)) for i in range(20)]
+
+        for newest_first in (False, True):
+            cache = MessageCache(maxlen=7, newest_first=newest_first)
+            for msg in messages:
+                cache.append(msg)
+
+            for seconds in (-1, 0, 1, 3, 6, 7, 10):
+                cutoff = now - timedelta(seconds=seconds)
+                with self.subTest(newest_first=newest_first, seconds=seconds):
+                    expected = [msg for msg in cache if msg.created_at > cutoff]
+                    self.assertListEqual(list(cache.since(cutoff)), expected)
+                    self.assertListEqual(list(cache.since(cutoff.timestamp())), expected)
+                    self.assertListEqual(list(cache.since(arrow.get(cutoff))), expected)
+
+    def test_since_author(self):
+        """Test if only the author's messages created after the given time are returned when an author is given."""
+        now = datetime.now(tz=UTC)
+        messages = [
+            MockMessage(id=i, author=MockUser(id=i % 2), created_at=now - timedelta(seconds=20 - i)) for i in range(20)
+        ]
+
+        for newest_first in (False, True):
+            cache = MessageCache(maxlen=7, newest_first=newest_first)
+            for msg in messages:
+                cache.append(msg)
+
+            for seconds in (-1, 0, 1, 3, 6, 7, 10):
+                cutoff = now - timedelta(seconds=seconds)
+                with self.subTest(newest_first=newest_first, seconds=seconds):
+                    expected = [msg for msg in cache if msg.author.id == 1 and msg.created_at > cutoff]
+                    self.assertListEqual(list(cache.since(cutoff, author_id=1)), expected)
+                    self.assertListEqual(list(cache.since(cutoff, author_id=2)), [])
+
+    def test_since_empty_cache(self):
+        """Test if no messages are returned from an empty cache."""
+        cache = MessageCache(maxlen=5)
+
+        self.assertListEqual(list(cache.since(0)), [])
+
+    def test_get_message_timestamp(self):
+        """Test if the creation time of a cached message is returned as a timestamp, and None otherwise."""
+        cache = MessageCache(maxlen=5)
+        message = MockMessage(id=1, created_at=datetime(2024, 1, 1, tzinfo=UTC))
+        cache.append(message)
+
+        self.assertEqual(cache.get_message_timestamp(1), message.created_at.timestamp())
+        self.assertIsNone(cache.get_message_timestamp(2))
+
+    def test_features_are_extracted_once_per_message(self):
+        """Test if the feature extractor runs once per added or updated message, and evicted features are dropped."""
+        calls = []
+
+        def extractor(message):
+            calls.append(message.id)
+            return len(message.content)
+
+        cache = MessageCache(maxlen=2, feature_extractor=extractor)
+        messages = [MockMessage(id=i, content="a" * i) for i in range(3)]
+        for msg in messages:
+            cache.append(msg)
+
+        self.assertListEqual(calls, [0, 1, 2])
+        self.assertIsNone(cache.get_message_features(0))
+        self.assertEqual(cache.get_message_features(2), 2)
+
+        cache.update(messages[2])
+        self.assertListEqual(calls, [0, 1, 2])
+
+        edited = MockMessage(id=2, content="edited")
+        cache.update(edited)
+        self.assertListEqual(calls, [0, 1, 2, 2])
+        self.assertEqual(cache.get_message_features(2), len("edited"))
+
+
+class TestCompactMessageCache(unittest.TestCase):
+    """Tests for the MessageCache class when it caches snapshots of the messages."""
+
+    def setUp(self):
+        self.now = datetime.now(tz=UTC).replace(microsecond=0)
+
+    def message(self, id_: int, author_id: int = 1, **kwargs) -> MockMessage:
+        """Return a message with the attributes which are snapshotted."""
+        return MockMessage(**{
+            "id": id_,
+            "author": MockMember(id=author_id),
+            "channel": MockTextChannel(id=10),
+            "created_at": self.now - timedelta(seconds=10 - id_),
+            "edited_at": None,
+            "content": "content",
+            "attachments": [],
+            "embeds": [],
+            "mentions": [],
+            "role_mentions": [],
+            "mention_everyone": False,
+            "type": discord.MessageType.default,
+            "reference": None,
+        } | kwargs)
+
+    def test_snapshots_are_cached(self):
+        """Test if a snapshot of the message is cached in place of the message."""
+        cache = MessageCache(maxlen=10, compact=True)
+        message = self.message(
+            1, content="hello", attachments=[MagicMock()], embeds=[MagicMock(), MagicMock()], mentions=[MockUser(id=5)],
+            role_mentions=[MockRole(id=7)], mention_everyone=True
+        )
+
+        cache.append(message)
+
+        self.assertEqual(
+            cache.get_message(1),
+            MessageSnapshot(1, 1, 10, message.created_at.timestamp(), None, "hello", 1, 2, (5,), (7,), True)
+        )
+        self.assertEqual(cache[0].created_at, message.created_at)
+
+    def test_snapshots_of_replies_keep_the_replied_to_author(self):
+        """Test if the author of the message replied to is kept, when the reference is resolved."""
+        replied_to = discord.Message.__new__(discord.Message)
+        replied_to.author = MockMember(id=3)
+        reference = MagicMock(resolved=replied_to)
+
+        reply = MessageSnapshot.from_message(self.message(1, type=discord.MessageType.reply, reference=reference))
+        unresolved = MessageSnapshot.from_message(
+            self.message(2, type=discord.MessageType.reply, reference=MagicMock(resolved=None))
+        )
+
+        self.assertEqual(reply.reply_author_id, 3)
+        self.assertIsNone(unresolved.reply_author_id)
+
+    def test_get_author_messages_returns_snapshots(self):
+        """Test if the author index works the same with snapshots, including after evictions."""
+        cache = MessageCache(maxlen=3, newest_first=True, compact=True)
+        for i in range(5):
+            cache.append(self.message(i, author_id=i % 2))
+
+        self.assertListEqual([msg.id for msg in cache.get_author_messages(0)], [4, 2])
+        self.assertListEqual([msg.id for msg in cache.get_author_messages(1)], [3])
+        after = self.now - timedelta(seconds=7)
+        self.assertListEqual([msg.id for msg in cache.get_author_messages(0, after=after)], [4])
+
+    def test_features_are_extracted_from_the_full_message_once_per_edit(self):
+        """Test if the features are extracted from the message itself, and only again when it's edited."""
+        calls = []
+
+        def extractor(message):
+            calls.append(message.id)
+            return message.embeds
+
+        cache = MessageCache(maxlen=2, feature_extractor=extractor, compact=True)
+        message = self.message(1, embeds=["embed"])
+        cache.append(message)
+        cache.update(message, metadata={"triggered": True})
+
+        self.assertListEqual(calls, [1])
+        self.assertListEqual(cache.get_message_features(1), ["embed"])
+        self.assertDictEqual(cache.get_message_metadata(1), {"triggered": True})
+
+        cache.update(self.message(1, content="edited", edited_at=self.now))
+        self.assertListEqual(calls, [1, 1])
+        self.assertEqual(cache.get_message(1).content, "edited")
+
+
+class TestMessageSnapshot(unittest.IsolatedAsyncioTestCase):
+    """Tests for resolving the messages of snapshots."""
+
+    def setUp(self):
+        self.bot = MockBot()
+        self.channel = MockTextChannel(id=10)
+        self.bot.get_channel.side_effect = {10: self.channel}.get
+        self.snapshot = MessageSnapshot(1, 1, 10, 0.0, None, "content", 0, 0, ())
+
+    def test_resolve_returns_the_cached_message(self):
+        """Test if the full message is returned when the client still has it cached."""
+        message = MockMessage(id=1)
+        self.bot.message_index.get.side_effect = {1: message}.get
+
+        self.assertIs(self.snapshot.resolve(self.bot), message)
+
+    def test_resolve_returns_a_partial_message(self):
+        """Test if a partial message is returned when the message isn't cached, and None if the channel isn't."""
+        self.bot.message_index.get.return_value = None
+
+        self.assertIs(self.snapshot.resolve(self.bot), self.channel.get_partial_message.return_value)
+        self.channel.get_partial_message.assert_called_once_with(1)
+
+        self.bot.get_channel.side_effect = None
+        self.bot.get_channel.return_value = None
+        self.assertIsNone(self.snapshot.resolve(self.bot))
+
+    async def test_fetch_returns_none_for_deleted_messages(self):
+        """Test if the message is fetched when it isn't cached, and None is returned if it doesn't exist anymore."""
+        self.bot.message_index.get.return_value = None
+        partial_message = MagicMock(spec=discord.PartialMessage)
+        partial_message.fetch = AsyncMock(return_value=MockMessage(id=1))
+        self.channel.get_partial_message.return_value = partial_message
+
+        self.assertIs(await self.snapshot.fetch(self.bot), partial_message.fetch.return_value)
+
+        partial_message.fetch.side_effect = discord.NotFound(MagicMock(status=404), "Unknown Message")
+        self.assertIsNone(await self.snapshot.fetch(self.bot))
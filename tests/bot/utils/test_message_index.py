@@ -0,0 +1,82 @@
+import unittest
+from datetime import UTC, datetime, timedelta
+
+from bot.utils.message_index import MessageIndex
+from tests.helpers import MockMember, MockMessage, MockTextChannel
+
+
+class MessageIndexTests(unittest.TestCase):
+    """Tests for the shared index of recent messages."""
+
+    def setUp(self):
+        self.now = datetime.now(tz=UTC)
+        self.channels = [MockTextChannel(id=10), MockTextChannel(id=11)]
+        self.authors = [MockMember(id=1), MockMember(id=2), MockMember(id=3)]
+
+    def message(self, id_: int) -> MockMessage:
+        """Return a message created `id_` seconds after the start, in a channel and by an author picked by the ID."""
+        return MockMessage(
+            id=id_,
+            channel=self.channels[id_ % 2],
+            author=self.authors[id_ % 3],
+            created_at=self.now + timedelta(seconds=id_),
+        )
+
+    def test_messages_are_indexed_by_channel_and_author(self):
+        """The messages of a channel or an author should be returned from the newest."""
+        index = MessageIndex(maxlen=10)
+        for i in range(6):
+            index.add(self.message(i))
+
+        self.assertListEqual([msg.id for msg in index.channel_messages(10)], [4, 2, 0])
+        self.assertListEqual([msg.id for msg in index.author_messages(2)], [4, 1])
+        self.assertListEqual(list(index.channel_messages(12)), [])
+
+    def test_after_stops_at_older_messages(self):
+        """Only the messages created after `after` should be returned."""
+        index = MessageIndex(maxlen=10)
+        for i in range(6):
+            index.add(self.message(i))
+
+        after = self.now + timedelta(seconds=2)
+        self.assertListEqual([msg.id for msg in index.channel_messages(10, after=after)], [4])
+        self.assertListEqual([msg.id for msg in index.author_messages(1, after=after)], [3])
+
+    def test_oldest_messages_are_dropped(self):
+        """Adding messages to a full index should drop the oldest ones from every index."""
+        index = MessageIndex(maxlen=3)
+        for i in range(5):
+            index.add(self.message(i))
+
+        self.assertListEqual([msg.id for msg in index], [2, 3, 4])
+        self.assertEqual(index.oldest.id, 2)
+        self.assertListEqual([msg.id for msg in index.channel_messages(11)], [3])
+        self.assertListEqual([msg.id for msg in index.author_messages(2)], [4])
+        self.assertNotIn(1, index)
+
+    def test_remove(self):
+        """Removed messages should be returned, and not be found anymore."""
+        index = MessageIndex(maxlen=10)
+        messages = [self.message(i) for i in range(3)]
+        for msg in messages:
+            index.add(msg)
+
+        self.assertIs(index.remove(1), messages[1])
+        self.assertIsNone(index.remove(1))
+        self.assertIsNone(index.get(1))
+        self.assertListEqual(list(index.channel_messages(11)), [])
+        self.assertListEqual([msg.id for msg in index], [0, 2])
+
+    def test_covers(self):
+        """The index should only cover times since its oldest message."""
+        index = MessageIndex(maxlen=10)
+        self.assertFalse(index.covers(self.now))
+
+        index.add(self.message(5))
+        self.assertTrue(index.covers(self.now + timedelta(seconds=5)))
+        self.assertFalse(index.covers(self.now))
+
+    def test_invalid_maxlen(self):
+        """The index should have room for at least one message."""
+        with self.assertRaises(ValueError):
+            MessageIndex(maxlen=0)